@@ -0,0 +1,305 @@
+"""
+效能基準測試
+
+在 stock_app 目錄下執行:
+    python -m benchmark.run --symbols 20 --years 5
+    python -m benchmark.run --symbols 20 --years 5 --save-baseline
+    python -m benchmark.run --symbols 20 --years 5 --compare
+"""
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import logging
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+from benchmark.synthetic import generate_panel, generate_ohlcv, \
+    generate_ticks
+from benchmark.provider import synthetic_provider
+from src.collect import Collector
+from src.process import Processor
+from src.analyze import Analyzer
+from src.visual import Visualizer
+from src.streaming import StreamPipeline, write_replay
+
+
+BENCHMARK_DIR = Path(__file__).parent
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """註冊基準測試，函數接收 context 並返回要計時的無參數函數"""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+class BenchmarkContext:
+    def __init__(self, n_symbols: int, years: float, seed: int):
+        """準備合成數據、臨時價格存儲與各組件"""
+        self.panel = generate_panel(n_symbols, years, seed)
+        self.symbols = list(self.panel)
+        self.rows = sum(len(df) for df in self.panel.values())
+
+        # 收集器的價格存儲、清單與調整因子表都位於臨時目錄
+        self.temp_dir = Path(tempfile.mkdtemp(prefix='stock_bench_'))
+        self.collector = Collector(data_dir=self.temp_dir)
+        self.store = self.collector.store
+        for symbol, df in self.panel.items():
+            self.store.save(symbol, df)
+            # 以原始價格存儲時需要因子表，緩存讀取才會命中
+            self.collector.adjustments.update(symbol, df)
+        self.processor = Processor()
+        self.analyzer = Analyzer()
+        self.visualizer = Visualizer()
+
+        market = generate_ohlcv(len(next(iter(self.panel.values()))),
+                                seed=seed - 1)
+        self.analyzer.set_benchmark(market['close'])
+
+        self._processed = None
+        self._analysis = None
+
+    @property
+    def processed(self) -> Dict:
+        if self._processed is None:
+            self._processed = {symbol: self.processor.process(df)
+                               for symbol, df in self.panel.items()}
+        return self._processed
+
+    @property
+    def analysis(self) -> Dict:
+        if self._analysis is None:
+            self._analysis = {symbol: self.analyzer.analyze(df)
+                              for symbol, df in self.processed.items()}
+        return self._analysis
+
+    def close(self) -> None:
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+@benchmark('collector.cache_read')
+def bench_cache_read(ctx: BenchmarkContext) -> Callable:
+    # 以合成數據的最後日期判斷新鮮度，每支股票都命中緩存
+    end = max(df.index[-1] for df in ctx.panel.values())
+    end_date = (end + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def run():
+        for symbol in ctx.symbols:
+            ctx.collector._check_cache(symbol, end_date)
+    return run
+
+
+@benchmark('collector.collect')
+def bench_collect(ctx: BenchmarkContext) -> Callable:
+    start = min(df.index[0] for df in ctx.panel.values())
+    end = max(df.index[-1] for df in ctx.panel.values())
+    start_date = start.strftime('%Y-%m-%d')
+    end_date = (end + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def run():
+        with synthetic_provider(ctx.panel):
+            for symbol in ctx.symbols:
+                ctx.collector.collect(symbol, start_date, end_date)
+    return run
+
+
+@benchmark('processor.process')
+def bench_process(ctx: BenchmarkContext) -> Callable:
+    def run():
+        for df in ctx.panel.values():
+            ctx.processor.process(df)
+    return run
+
+
+@benchmark('analyzer.analyze')
+def bench_analyze(ctx: BenchmarkContext) -> Callable:
+    processed = ctx.processed
+
+    def run():
+        for df in processed.values():
+            ctx.analyzer.analyze(df)
+    return run
+
+
+@benchmark('analyzer._ma_dense')
+def bench_ma_dense(ctx: BenchmarkContext) -> Callable:
+    # _ma_dense 讀取 MA{天數} 列
+    periods = ctx.analyzer.config['technical_indicators']['ma'].values()
+    frames = []
+    for df in ctx.processed.values():
+        renamed = df.rename(columns={f'ma_{p}': f'MA{p}' for p in periods})
+        frames.append((renamed, float(renamed['close'].median() * 0.02)))
+
+    def run():
+        for df, dense_parameters in frames:
+            ctx.analyzer._ma_dense(df, dense_parameters)
+    return run
+
+
+@benchmark('visualizer.create_analysis_dashboard')
+def bench_dashboard(ctx: BenchmarkContext) -> Callable:
+    processed, analysis = ctx.processed, ctx.analysis
+
+    def run():
+        for symbol, df in processed.items():
+            ctx.visualizer.create_analysis_dashboard(df, analysis[symbol])
+    return run
+
+
+@benchmark('streaming.replay')
+def bench_stream_replay(ctx: BenchmarkContext) -> Callable:
+    # 每支股票 60 分鐘、每分鐘 4 筆，以最快速度回放
+    path = ctx.temp_dir / 'ticks.jsonl'
+    write_replay(path, generate_ticks(len(ctx.symbols), 60))
+
+    def run():
+        pipeline = StreamPipeline(sink=lambda signal: None)
+        asyncio.run(pipeline.run(
+            lambda queue: pipeline.replay(path, queue, 0)))
+    return run
+
+
+def time_benchmark(func: Callable, repeat: int) -> Dict:
+    """執行 repeat 次並返回耗時統計"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+        'repeat': repeat
+    }
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=BENCHMARK_DIR
+        ).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def run_benchmarks(n_symbols: int, years: float, seed: int, repeat: int,
+                   only: List[str] = None) -> Dict:
+    """執行所有 (或指定的) 基準測試"""
+    ctx = BenchmarkContext(n_symbols, years, seed)
+    results = {}
+    try:
+        for name, factory in BENCHMARKS.items():
+            if only and name not in only:
+                continue
+            func = factory(ctx)
+            stats = time_benchmark(func, repeat)
+            stats['per_symbol'] = stats['median'] / n_symbols
+            stats['rows_per_second'] = ctx.rows / stats['median'] \
+                if stats['median'] > 0 else None
+            results[name] = stats
+            print(f"{name:<42} 中位數 {stats['median']:.4f} 秒 "
+                  f"(每支 {stats['per_symbol'] * 1000:.2f} 毫秒)")
+    finally:
+        ctx.close()
+
+    return {
+        'commit': current_commit(),
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'params': {'symbols': n_symbols, 'years': years, 'seed': seed,
+                   'repeat': repeat, 'rows': ctx.rows},
+        'results': results
+    }
+
+
+def params_label(n_symbols: int, years: float) -> str:
+    return f"s{n_symbols}_y{years:g}"
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """比較中位數耗時，返回超過容許範圍的基準測試"""
+    regressions = []
+    for name, stats in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or base['median'] <= 0:
+            continue
+        ratio = stats['median'] / base['median']
+        flag = ratio > 1 + tolerance
+        if flag:
+            regressions.append(name)
+        print(f"{name:<42} {ratio:6.2f}x 相對 {baseline['commit']}"
+              f"{'  <-- 效能退化' if flag else ''}")
+    return regressions
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='效能基準測試')
+    parser.add_argument('--symbols', type=int, default=10,
+                        help='合成股票數量 (1 至 5000)')
+    parser.add_argument('--years', type=float, default=5,
+                        help='每支股票的年數 (1 至 30)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', type=str,
+                        help='只執行指定的基準測試，多個用逗號分隔')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='將結果保存為此參數組合的基準')
+    parser.add_argument('--compare', action='store_true',
+                        help='與已保存的基準比較')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='中位數耗時超過基準的比例視為退化')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    logging.getLogger('stock_analysis').setLevel(logging.WARNING)
+
+    only = args.only.split(',') if args.only else None
+    report = run_benchmarks(args.symbols, args.years, args.seed,
+                            args.repeat, only)
+
+    label = params_label(args.symbols, args.years)
+    results_dir = BENCHMARK_DIR / 'results'
+    results_dir.mkdir(exist_ok=True)
+    with open(results_dir / f"{report['commit']}_{label}.json", 'w',
+              encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    baseline_path = BENCHMARK_DIR / 'baselines' / f"{label}.json"
+    status = 0
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"找不到基準: {baseline_path}")
+            status = 1
+        else:
+            with open(baseline_path, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare(report, baseline, args.tolerance)
+            if regressions:
+                print(f"效能退化: {', '.join(regressions)}")
+                status = 1
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"基準已保存到: {baseline_path}")
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
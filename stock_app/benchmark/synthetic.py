@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, Optional, Tuple
+
+
+TRADING_DAYS_PER_YEAR = 250
+
+
+def generate_ohlcv(n_bars: int, seed: int = 0,
+                   start_price: Optional[float] = None,
+                   start_date: str = '1995-01-03') -> pd.DataFrame:
+    """
+    生成單支股票的合成日 K 線，格式與 Collector 緩存一致
+
+    價格為帶波動率狀態切換的幾何布朗運動，成交量與當日波動正相關，
+    並帶有少量跳空與季度股利欄位。
+
+    Args:
+        n_bars: K 線數量
+        seed: 隨機種子，相同種子生成相同數據
+        start_price: 起始價格，默認隨機
+        start_date: 第一根 K 線日期
+
+    Returns:
+        pd.DataFrame: Date 索引 (Asia/Taipei) 與 open/high/low/close/volume/
+        dividends/stock splits 列
+    """
+    rng = np.random.default_rng(seed)
+    if start_price is None:
+        start_price = float(rng.uniform(10, 800))
+
+    # 波動率狀態: 平靜與劇烈兩種，持續期間為幾何分佈
+    shocks = rng.random(n_bars) < 0.02
+    last_shock = np.maximum.accumulate(
+        np.where(shocks, np.arange(n_bars), 0))
+    high_vol = (np.arange(n_bars) - last_shock) < 20
+    daily_vol = np.where(high_vol, 0.03, 0.012) * rng.uniform(0.7, 1.3)
+
+    drift = rng.normal(0.0003, 0.0002)
+    log_returns = rng.normal(drift, daily_vol)
+    # 偶發跳空
+    gaps = rng.random(n_bars) < 0.01
+    log_returns[gaps] += rng.normal(0, 0.05, gaps.sum())
+
+    close = start_price * np.exp(np.cumsum(log_returns))
+    prev_close = np.concatenate([[start_price], close[:-1]])
+    open_ = prev_close * np.exp(rng.normal(0, daily_vol / 3))
+
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+    high = body_high * (1 + np.abs(rng.normal(0, daily_vol / 2)))
+    low = body_low * (1 - np.abs(rng.normal(0, daily_vol / 2)))
+
+    base_volume = rng.uniform(1e5, 5e7)
+    volume = base_volume * np.exp(
+        rng.normal(0, 0.3, n_bars) + 8 * np.abs(log_returns))
+
+    index = pd.bdate_range(start=start_date, periods=n_bars,
+                           tz='Asia/Taipei', name='Date')
+
+    # 每 63 根 K 線發放一次股利
+    dividends = np.zeros(n_bars)
+    dividends[62::63] = np.round(close[62::63] * 0.005, 2)
+
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume.astype(np.int64),
+        'dividends': dividends,
+        'stock splits': np.zeros(n_bars)
+    }, index=index)
+
+
+def symbol_name(i: int) -> str:
+    """合成股票代碼，與台股一樣為數字字符串"""
+    return f"{9000 + i:04d}" if i < 1000 else f"{10000 + i}"
+
+
+def iter_panel(n_symbols: int, years: float, seed: int = 0
+               ) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """逐支生成合成股票，避免一次佔用全部記憶體"""
+    n_bars = max(int(years * TRADING_DAYS_PER_YEAR), 2)
+    for i in range(n_symbols):
+        yield symbol_name(i), generate_ohlcv(n_bars, seed=seed * 100003 + i)
+
+
+def generate_panel(n_symbols: int, years: float,
+                   seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """生成多支股票的合成數據"""
+    return dict(iter_panel(n_symbols, years, seed))
+
+
+def generate_ticks(n_symbols: int, minutes: int, seed: int = 0,
+                   ticks_per_minute: int = 4,
+                   start: str = '2024-01-02 09:00:00+08:00'
+                   ) -> Iterator[Dict]:
+    """
+    按時間順序生成多支股票的合成逐筆記錄，供串流管線回放
+
+    Returns:
+        Iterator[Dict]: {'symbol', 'ts' (epoch 秒), 'price', 'volume'}
+    """
+    rng = np.random.default_rng(seed)
+    prices = rng.uniform(10, 800, n_symbols)
+    symbols = [symbol_name(i) for i in range(n_symbols)]
+    start_ts = pd.Timestamp(start).timestamp()
+    step = 60 / ticks_per_minute
+
+    for tick in range(minutes * ticks_per_minute):
+        prices *= np.exp(rng.normal(0, 0.001, n_symbols))
+        volumes = rng.integers(1, 50, n_symbols) * 1000
+        ts = start_ts + tick * step
+        for i in range(n_symbols):
+            yield {'symbol': symbols[i], 'ts': ts,
+                   'price': round(float(prices[i]), 2),
+                   'volume': int(volumes[i])}
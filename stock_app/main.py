@@ -1,17 +1,40 @@
 import sys
-import yaml
 import json
+import asyncio
+import yaml
 import logging
 import argparse
+import threading
+from functools import partial
 from datetime import datetime
 from pathlib import Path
 
+import pandas as pd
+
 from src.collect import Collector
 from src.process import Processor
 from src.analyze import Analyzer
 from src.visual import Visualizer
+from src.results_store import ResultStore, results_frame, \
+    trend_direction
+from src.stage_cache import StageCache, fingerprint_frame, fingerprint_config
+from src.service import StockService
+from src.batch import BatchRunner, load_universe
+from src.importer import BulkImporter, find_csv_files, symbol_from_path
+from src.chunked import ChunkedProcessor
+from src.alerts import AlertEngine
+from src.candles import decode_flags, pattern_mask, patterns_by_bias
+from src.portfolio import PortfolioRisk, load_weights
+from src.sectors import SectorIndexer
+from src.ranking import RelativeStrength
+from src.streaming import StreamPipeline
+from src.pipeline import Stage, StagedPipeline
+from src.timeframes import TimeframeStore, timeframe_key
+from src.utils.config_loader import ConfigLoader
+from src.utils.helpers import to_jsonable
 from src.utils.logger import setup_logging
 from src.utils.decorators import timing_decorator, error_handler
+from src.utils.profiler import get_profiler, span
 
 
 class StockAnalyzer:
@@ -27,67 +50,315 @@ class StockAnalyzer:
         self.processor = Processor()
         self.analyzer = Analyzer()
         self.visualizer = Visualizer()  # 移除參數，使用統一配置
+        self.result_store = ResultStore()
+        self.stage_cache = StageCache()
+        self.timeframes = TimeframeStore(self.collector.store)
+        self.alert_engine = AlertEngine()
+        self.portfolio_risk = PortfolioRisk()
+        self.sectors = SectorIndexer(self.collector.store)
+        self.relative_strength = RelativeStrength()
+        self.pending_results = []
+        self.results_lock = threading.Lock()
+        self.load_benchmark()
+
+    def load_benchmark(self):
+        """加載基準指數，每次執行只加載一次供所有股票共用"""
+        benchmark = self.collector.collect_benchmark(
+            start_date=self.config['data_collection']['default_start_date'],
+            end_date=self.config['data_collection']['default_end_date']
+        )
+        if benchmark is None:
+            self.logger.warning("基準指數加載失敗，貝塔係數將無法計算")
+            self.analyzer.set_benchmark(None)
+            self.benchmark_fingerprint = fingerprint_frame(None)
+            return
+        self.analyzer.set_benchmark(benchmark['close'])
+        self.benchmark_fingerprint = fingerprint_frame(benchmark[['close']])
+
+    def _config_fingerprint(self, *sections):
+        """
+        計算階段所讀取配置段落的指紋
+
+        處理、分析與視覺化組件讀取 ConfigLoader 的配置，而非 --config
+        傳入的配置，指紋須以前者計算
+        """
+        config = ConfigLoader().get_config()
+        return fingerprint_config({name: config.get(name)
+                                   for name in sections})
+
+    def _trend_period(self):
+        """分析器計算趨勢的期間 (日)，即 data_processing.time_range"""
+        return self.analyzer.config['data_processing']['time_range']
+
+    def prepare(self, symbol, timeframe='D'):
+        """
+        收集、處理並分析數據，返回中間結果供輸出或服務使用
+
+        timeframe 為 W/M 時以存儲的週/月 K 線計算指標與分析
+        """
+        collected = self.collect_stage(symbol, timeframe)
+        if collected is None:
+            return None
+        return self.compute_stage(collected)
+
+    def collect_stage(self, symbol, timeframe='D'):
+        """收集階段 (I/O): 下載或讀取 K 線、股票信息與產業指數"""
+        # 收集數據，週/月 K 線需要較長的日 K 線歷史
+        self.logger.info("開始收集 %s 的數據...", symbol)
+        collection = self.config['data_collection']
+        start_date = min(
+            collection['default_start_date'],
+            collection['timeframe_start_dates'].get(
+                timeframe, collection['default_start_date']))
+        stock_data = self.collector.collect(
+            symbol,
+            start_date=start_date,
+            end_date=collection['default_end_date']
+        )
+
+        if stock_data is None:
+            self.logger.error("收集 %s 的數據失敗", symbol)
+            return None
 
-    @timing_decorator
-    @error_handler
-    def run(self, symbol):
-        """執行分析流程"""
-        try:
-            # 收集數據
-            self.logger.info(f"開始收集 {symbol} 的數據...")
-            stock_data = self.collector.collect(
-                symbol,
-                start_date=self.config['data_collection']
-                ['default_start_date'],
-                end_date=self.config['data_collection']
-                ['default_end_date']
-            )
+        stock_info = self.collector.get_info(symbol)  # 修正方法名稱
+        if stock_info is None:
+            self.logger.error("獲取 %s 的信息失敗", symbol)
+            return None
 
+        if timeframe != 'D':
+            stock_data = self.timeframes.bars(symbol, stock_data, timeframe)
             if stock_data is None:
-                self.logger.error(f"收集 {symbol} 的數據失敗")
                 return None
 
-            stock_info = self.collector.get_info(symbol)  # 修正方法名稱
-            if stock_info is None:
-                self.logger.error(f"獲取 {symbol} 的信息失敗")
-                return None
+        # 所屬產業指數 (由 --sectors 建立)，只讀取一個存儲文件
+        sector = self.sectors.load(symbol) if timeframe == 'D' else None
+
+        return {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'data': stock_data,
+            'info': stock_info,
+            'sector': sector
+        }
+
+    def compute_stage(self, collected, sections=None, update_alerts=True,
+                      outputs=None):
+        """
+        計算階段 (CPU): 技術指標與分析
+
+        sections 只執行部分分析段落；update_alerts 為 False 時不更新
+        告警快照 (例如歷史時點的分析)；outputs 只計算指定的指標列，
+        默認全部 (圖表、告警與服務查詢需要完整的指標)
+        """
+        symbol = collected['symbol']
+        timeframe = collected['timeframe']
+        stock_data = collected['data']
+        sector = collected['sector']
+
+        # 處理數據
+        self.logger.info("處理數據...")
+        process_key = (
+            fingerprint_frame(stock_data),
+            self._config_fingerprint('technical_indicators',
+                                     'data_processing')
+        )
+        if outputs is not None:
+            process_key += (fingerprint_config(sorted(outputs)),)
+        with span('process', rows=len(stock_data)):
+            processed_data = self.stage_cache.memoize(
+                'process', process_key,
+                lambda: self.processor.process(stock_data, outputs)
+            )
+        if processed_data is None:
+            self.logger.error("數據處理失敗")
+            return None
+        if update_alerts:
+            self.alert_engine.update(
+                symbol if timeframe == 'D'
+                else timeframe_key(symbol, timeframe),
+                processed_data
+            )
 
-            # 處理數據
-            self.logger.info("處理數據...")
-            processed_data = self.processor.process(stock_data)
-            if processed_data is None:
-                self.logger.error("數據處理失敗")
-                return None
+        # 分析數據
+        self.logger.info("分析數據...")
+        analyze_key = (
+            fingerprint_frame(processed_data),
+            self._config_fingerprint('analysis', 'data_processing',
+                                     'technical_indicators', 'sectors'),
+            self.benchmark_fingerprint,
+            fingerprint_frame(None if sector is None else sector[['close']])
+        )
+        if sections is not None:
+            analyze_key += (fingerprint_config(sorted(sections)),)
+        with span('analyze', rows=len(processed_data)):
+            analysis_results = self.stage_cache.memoize(
+                'analyze', analyze_key,
+                lambda: self.analyzer.analyze(processed_data, sector,
+                                              sections)
+            )
+        if analysis_results is None:
+            self.logger.error("數據分析失敗")
+            return None
 
-            # 分析數據
-            self.logger.info("分析數據...")
-            analysis_results = self.analyzer.analyze(processed_data)
-            if analysis_results is None:
-                self.logger.error("數據分析失敗")
-                return None
+        return {
+            'symbol': symbol,
+            'info': collected['info'],
+            'processed': processed_data,
+            'analysis': analysis_results,
+            'analyze_key': analyze_key,
+            'timeframe': timeframe
+        }
 
-            # 視覺化
-            self.logger.info("生成視覺化結果...")
-            charts = self.visualizer.create_analysis_dashboard(
-                processed_data,
-                analysis_results
-            )
-            if charts is None:
-                self.logger.error("視覺化生成失敗")
+    @timing_decorator
+    @error_handler
+    def run(self, symbol, timeframe='D'):
+        """執行分析流程"""
+        try:
+            prepared = self.prepare(symbol, timeframe)
+            if prepared is None:
                 return None
-
-            # 輸出結果
-            self.output_results(symbol, stock_info, analysis_results, charts)
-            return True
+            return self.render_stage(prepared)
 
         except Exception as e:
-            self.logger.error(f"分析過程發生錯誤: {str(e)}")
+            self.logger.error("分析過程發生錯誤: %s", e)
+            return None
+
+    def render_stage(self, prepared):
+        """輸出階段 (I/O): 生成圖表並保存結果"""
+        symbol = prepared['symbol']
+        processed_data = prepared['processed']
+        analysis_results = prepared['analysis']
+
+        # 視覺化
+        self.logger.info("生成視覺化結果...")
+        visualize_key = prepared['analyze_key'] + (
+            self._config_fingerprint('visualization',
+                                     'technical_indicators'),
+        )
+        with span('visualize', rows=len(processed_data)):
+            charts = self.stage_cache.memoize(
+                'visualize', visualize_key,
+                lambda: self.visualizer.create_analysis_dashboard(
+                    processed_data,
+                    analysis_results
+                )
+            )
+        if charts is None:
+            self.logger.error("視覺化生成失敗")
             return None
 
-    def output_results(self, symbol, stock_info, results, charts):
-        """輸出分析結果"""
+        # 輸出結果
+        self.output_results(symbol, prepared['info'], analysis_results,
+                            charts, processed_data.index[-1],
+                            prepared['timeframe'])
+        return True
+
+    def run_pipeline(self, symbols, timeframe='D'):
+        """
+        以收集、計算、輸出三個階段的管線分析多支股票，下載、計算與
+        圖表寫入互相重疊；各階段的執行緒數與隊列長度見 pipeline 配置
+        """
+        pipeline = StagedPipeline.from_config({
+            'collect': lambda symbol: self.collect_stage(symbol, timeframe),
+            'compute': self.compute_stage,
+            'render': self.render_stage
+        }, self.config)
+        return pipeline.run(
+            symbols,
+            key_func=lambda item: item if isinstance(item, str)
+            else item['symbol'])
+
+    def analyze_many(self, symbols, stages=None, as_of=None,
+                     timeframe='D'):
+        """
+        分析多支股票並返回數值指標表格，供程式或筆記本直接使用
+
+        以收集與計算兩個階段的管線並行執行，不生成圖表、不格式化
+        輸出，也不寫入結果存儲。
+
+        Args:
+            symbols: 股票代碼列表
+            stages: 只執行的分析段落，例如 ['technical_analysis',
+                'volume_analysis']，默認全部；未知段落拋出 ValueError
+            as_of: 只使用此日期 (含) 之前的數據，即該日收盤後的分析
+            timeframe: 週期代碼 (D/W/M)
+
+        Returns:
+            pd.DataFrame: 每支股票一列 (以 symbol 為索引)，analysis_date
+            欄與所有數值指標欄 ('段落.指標')；失敗的股票不在表中，
+            列於 attrs['failed']
+        """
+        as_of = None if as_of is None else pd.Timestamp(as_of)
+        records = {}
+        # 只計算分析段落讀取的指標列，未知段落在此拋出 ValueError
+        indicator_columns = self.analyzer.columns(stages)
+
+        def collect(symbol):
+            collected = self.collect_stage(symbol, timeframe)
+            if collected is not None and as_of is not None:
+                collected['data'] = self._until(collected['data'], as_of)
+                if collected['sector'] is not None:
+                    collected['sector'] = self._until(collected['sector'],
+                                                      as_of)
+            return collected
+
+        def compute(collected):
+            prepared = self.compute_stage(collected, stages,
+                                          update_alerts=False,
+                                          outputs=indicator_columns)
+            if prepared is None:
+                return None
+            analysis_date = prepared['processed'].index[-1]
+            records[prepared['symbol']] = {
+                'symbol': prepared['symbol'],
+                'analysis_date': analysis_date.tz_localize(None)
+                if analysis_date.tz is not None else analysis_date,
+                'results': prepared['analysis']
+            }
+            return True
+
+        params = self.config['pipeline']['stages']
+        pipeline = StagedPipeline([
+            Stage(name, func, params[name]['workers'],
+                  params[name]['queue_size'])
+            for name, func in (('collect', collect), ('compute', compute))
+        ])
+        summary = pipeline.run(
+            symbols,
+            key_func=lambda item: item if isinstance(item, str)
+            else item['symbol'])
+
+        frame = results_frame([records[symbol] for symbol in symbols
+                               if symbol in records])
+        frame.attrs['failed'] = summary['failed']
+        return frame
+
+    @staticmethod
+    def _until(df, as_of):
+        """截取交易日 (無時區) 不晚於 as_of 的數據"""
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return df[index.normalize() <= as_of]
+
+    def output_results(self, symbol, stock_info, results, charts,
+                       analysis_date, timeframe='D'):
+        """
+        輸出分析結果，週/月 K 線的結果以 代碼@週期 分開保存
+
+        圖表保存於 output_dir/[週期/]代碼/，各股票互不覆蓋，管線中
+        多個輸出執行緒可同時寫入
+        """
         try:
+            output_dir = Path(self.config['base']['output_dir'])
+            chart_dir = output_dir / symbol
+            if timeframe != 'D':
+                chart_dir = output_dir / timeframe / symbol
+                symbol = timeframe_key(symbol, timeframe)
+                output_dir = output_dir / timeframe
+
             result_current = results['technical_analysis']['current_price']
+            volume = results.get('volume_analysis') or {}
             output = {
                 "股票代碼": symbol,
                 "股票名稱": stock_info.get('name', 'Unknown'),
@@ -95,37 +366,246 @@ class StockAnalyzer:
                 "20日均線": f"{results['technical_analysis'].get('ma20', 0):.2f}",
                 "RSI": f"{results['technical_analysis'].get('rsi', 0):.2f}",
                 "MACD": f"{results['technical_analysis'].get('macd', 0):.2f}",
-                "趨勢": results['trend_analysis'].get('direction', 'Unknown'),
+                "相對成交量": f"{volume.get('relative_volume', 0):.2f}",
+                "趨勢": trend_direction(results, self._trend_period()),
                 "分析時間": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
 
             # 保存結果
-            self.save_results(output)
-            self.visualizer.save_charts(charts, self.config['base']
-                                        ['output_dir'])
+            self.save_results({
+                'symbol': symbol,
+                'analysis_date': analysis_date,
+                'name': stock_info.get('name', 'Unknown'),
+                'trend': output['趨勢'],
+                'results': results
+            })
+            self.visualizer.save_charts(charts, str(chart_dir))
 
             # 打印結果
             for key, value in output.items():
-                self.logger.info(f"{key}: {value}")
+                self.logger.info("%s: %s", key, value)
 
         except Exception as e:
-            self.logger.error(f"輸出結果時發生錯誤: {str(e)}")
+            self.logger.error("輸出結果時發生錯誤: %s", e)
+
+    def save_results(self, record):
+        """暫存結果，累積到批次大小後寫入結果存儲"""
+        with self.results_lock:
+            self.pending_results.append(record)
+            full = len(self.pending_results) >= \
+                self.config['storage']['batch_size']
+        if full:
+            self.flush_results()
+
+    def log_summary(self):
+        """輸出執行摘要 (階段緩存命中情況與效能記錄)"""
+        for stage, counts in self.stage_cache.summary().items():
+            self.logger.info(
+                "%s 緩存: 命中 %s 次, 未命中 %s 次",
+                stage, counts['hits'], counts['misses']
+            )
+
+        profiler = get_profiler()
+        if not profiler.enabled:
+            return
+        for name, stats in profiler.summary().items():
+            # 只在主執行緒執行的區段才有峰值記憶體
+            memory = f"{stats['peak_memory_max'] / 1024 / 1024:.1f} MB" \
+                if stats['memory_samples'] else '未記錄'
+            self.logger.info(
+                "%s: %s 次, 牆鐘 %.3f 秒, CPU %.3f 秒, 峰值記憶體 %s",
+                name, stats['count'], stats['wall_total'],
+                stats['cpu_total'], memory
+            )
+        self.export_profile()
 
-    def save_results(self, results):
-        """保存結果到文件"""
+    def export_profile(self):
+        """輸出 JSON 與 Prometheus 格式的效能記錄"""
         try:
             output_dir = Path(self.config['base']['output_dir'])
             output_dir.mkdir(exist_ok=True)
+            prefix = self.config['profiling']['export_prefix']
+            stem = output_dir / f"{prefix}_{datetime.now():%Y%m%d_%H%M%S}"
+            profiler = get_profiler()
+            profiler.export_json(stem.with_suffix('.json'))
+            profiler.export_prometheus(stem.with_suffix('.prom'))
+            self.logger.info("效能記錄已保存到: %s.json / %s.prom", stem, stem)
 
-            filename = \
-                output_dir / f"analysis_{datetime.now():%Y%m%d_%H%M%S}.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.error("保存效能記錄失敗: %s", e)
 
-            self.logger.info(f"結果已保存到: {filename}")
+    def collect_many(self, symbols):
+        """收集多支股票的日 K 線，失敗的股票略過"""
+        frames = {}
+        for symbol in symbols:
+            stock_data = self.collector.collect(
+                symbol,
+                start_date=self.config['data_collection']
+                ['default_start_date'],
+                end_date=self.config['data_collection']['default_end_date']
+            )
+            if stock_data is not None:
+                frames[symbol] = stock_data
+        return frames
+
+    def run_portfolio(self, path):
+        """計算持倉文件的組合風險並保存為 JSON"""
+        weights = load_weights(path)
+        prices = {symbol: df['close']
+                  for symbol, df in self.collect_many(weights).items()}
+
+        with span('portfolio.risk', rows=len(prices)):
+            risk = self.portfolio_risk.analyze(prices, weights)
+        if risk is None:
+            return None
+
+        for key, value in risk.items():
+            if key != 'holdings':
+                self.logger.info("%s: %s", key, value)
+        self.logger.info("持倉風險貢獻:\n%s", risk['holdings'].to_string())
+
+        try:
+            output_dir = Path(self.config['base']['output_dir'])
+            output_dir.mkdir(exist_ok=True)
+            output_path = output_dir / \
+                f"portfolio_risk_{datetime.now():%Y%m%d_%H%M%S}.json"
+            report = dict(risk, holdings=risk['holdings'].to_dict('index'))
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(to_jsonable(report), f, ensure_ascii=False,
+                          indent=2)
+            self.logger.info("組合風險已保存到: %s", output_path)
 
         except Exception as e:
-            self.logger.error(f"保存結果失敗: {str(e)}")
+            self.logger.error("保存組合風險失敗: %s", e)
+        return risk
+
+    def scan_levels(self, symbols):
+        """對股票池批次偵測多次觸及的支撐阻力價位並保存為 CSV"""
+        frames = self.collect_many(symbols)
+        with span('levels.scan', rows=len(frames)):
+            levels = self.analyzer.level_detector.scan(frames)
+
+        try:
+            output_dir = Path(self.config['base']['output_dir'])
+            output_dir.mkdir(exist_ok=True)
+            output_path = output_dir / f"levels_{datetime.now():%Y%m%d}.csv"
+            levels.to_csv(output_path, index=False)
+            self.logger.info("價位已保存到: %s", output_path)
+
+        except Exception as e:
+            self.logger.error("保存價位失敗: %s", e)
+        return levels
+
+    def build_sectors(self, symbols):
+        """
+        建立或增量更新股票池的產業與行業指數，並以相同的指標與分析
+        流程處理每個指數，結果以指數鍵保存
+        """
+        frames = self.collect_many(symbols)
+        for symbol in frames:
+            self.collector.get_info(symbol)  # 緩存產業與市值
+
+        with span('sectors.build', rows=len(frames)):
+            indices = self.sectors.build(frames)
+
+        analysis_date = datetime.now().strftime("%Y-%m-%d")
+        for key, index in indices.items():
+            processed = self.processor.process(index)
+            if processed is None:
+                continue
+            results = self.analyzer.analyze(processed)
+            if results is None:
+                continue
+            self.save_results({
+                'symbol': key,
+                'analysis_date': analysis_date,
+                'name': key,
+                'trend': trend_direction(results, self._trend_period()),
+                'results': results
+            })
+            self.logger.info("%s: 收盤指數 %.2f, %s", key,
+                             index['close'].iloc[-1],
+                             results['trend_analysis'])
+        self.flush_results()
+        return indices
+
+    def rank_universe(self, symbols):
+        """計算股票池全部歷史的相對強度排名並寫入結果存儲"""
+        frames = self.collect_many(symbols)
+        if not frames:
+            return None
+        with span('ranking.rank', rows=len(frames)):
+            table = self.relative_strength.rank(frames)
+        self.result_store.write_ranks(table)
+        return self.show_top(self.config['ranking']['top_n'])
+
+    def show_top(self, n, date=None):
+        """查詢並輸出某日相對強度最強的 n 支股票"""
+        top = self.result_store.top_ranked(n, date)
+        if top.empty:
+            self.logger.warning("沒有相對強度排名")
+            return None
+        self.logger.info("%s 相對強度前 %s 名:\n%s", top['bar_date'].iloc[0],
+                         len(top), top.drop(columns='bar_date')
+                         .to_string(index=False))
+        return top
+
+    def find_patterns(self, symbols, names, days):
+        """
+        掃描股票池的全部 K 線形態並存儲旗標，返回最近 days 根 K 線內
+        出現指定形態的股票
+
+        names 可為形態名稱，或 bullish / bearish 代表該偏向的所有形態
+        """
+        expanded = []
+        for name in names:
+            expanded.extend(patterns_by_bias(name)
+                            if name in ('bullish', 'bearish') else [name])
+        mask = pattern_mask(expanded)
+
+        frames = self.collect_many(symbols)
+        if not frames:
+            return None
+        with span('patterns.scan', rows=len(frames)):
+            panel = self.analyzer.pattern_scanner.scan_many(frames)
+        self.result_store.write_pattern_flags(panel)
+
+        since = panel.index[-min(days, len(panel))].strftime("%Y-%m-%d")
+        hits = self.result_store.symbols_with_pattern(mask, since)
+        hits['patterns'] = [', '.join(n for n in decode_flags(flags)
+                                      if n in expanded)
+                            for flags in hits['flags']]
+        self.logger.info("%s 之後出現 %s 的股票: %s 支\n%s", since,
+                         ', '.join(names), hits['symbol'].nunique(),
+                         hits.drop(columns=['flags']).to_string(index=False))
+        return hits
+
+    def evaluate_alerts(self):
+        """評估本次有變化的股票的告警規則"""
+        try:
+            return self.alert_engine.evaluate()
+
+        except Exception as e:
+            self.logger.error("評估告警失敗: %s", e)
+            return []
+
+    def flush_results(self):
+        """將暫存的結果批次寫入結果存儲，寫入失敗時返回 False"""
+        with self.results_lock:
+            pending, self.pending_results = self.pending_results, []
+        if not pending:
+            return True
+        try:
+            with span('save.results', rows=len(pending)):
+                self.result_store.write_many(pending)
+            self.logger.info("結果已保存到: %s", self.result_store.db_path)
+            return True
+
+        except Exception as e:
+            self.logger.error("保存結果失敗: %s", e)
+            with self.results_lock:
+                self.pending_results = pending + self.pending_results
+            return False
 
 
 def load_config(config_path):
@@ -134,17 +614,34 @@ def load_config(config_path):
         # 使用絕對路徑
         config_path = Path(config_path).resolve()
         if not config_path.exists():
-            logging.error(f"找不到配置文件: {config_path}")
+            logging.error("找不到配置文件: %s", config_path)
             return None
 
         with open(config_path, 'r', encoding='utf-8') as f:
             return yaml.safe_load(f)
 
     except Exception as e:
-        logging.error(f"加載配置文件失敗: {str(e)}")
+        logging.error("加載配置文件失敗: %s", e)
         return None
 
 
+def analyze_many(symbols, stages=None, as_of=None, timeframe='D',
+                 config_path=None):
+    """
+    程式介面: 以配置文件建立分析器並返回多支股票的數值指標表格
+
+    參數與返回值見 StockAnalyzer.analyze_many；配置文件不存在或無法
+    解析時拋出 ValueError
+    """
+    config_path = config_path or \
+        Path(__file__).parent / 'config' / 'config.yaml'
+    config = load_config(config_path)
+    if config is None:
+        raise ValueError(f"無法加載配置文件: {config_path}")
+    analyzer = StockAnalyzer(config)
+    return analyzer.analyze_many(symbols, stages, as_of, timeframe)
+
+
 def parse_arguments():
     """解析命令行參數"""
     parser = argparse.ArgumentParser(description='股票分析程序')
@@ -153,9 +650,117 @@ def parse_arguments():
     default_config = str(Path(__file__).parent / 'config' / 'config.yaml')
     parser.add_argument('--config', type=str, default=default_config,
                         help='配置文件路徑')
+    parser.add_argument('--serve', action='store_true',
+                        help='以常駐服務模式啟動本地 HTTP API')
+    parser.add_argument('--host', type=str, help='服務監聽地址')
+    parser.add_argument('--port', type=int, help='服務監聽端口')
+    parser.add_argument('--batch', action='store_true',
+                        help='以可續跑的批次模式執行')
+    parser.add_argument('--universe', type=str,
+                        help='股票清單文件，每行一個代碼')
+    parser.add_argument('--batch-id', type=str,
+                        help='批次識別碼，相同識別碼會跳過已完成的股票')
+    parser.add_argument('--workers', type=int, help='批次並行數量')
+    parser.add_argument('--profile', action='store_true',
+                        help='記錄各階段的效能數據')
+    parser.add_argument('--timeframe', type=str, default='D',
+                        choices=['D', 'W', 'M'],
+                        help='分析週期: D (日), W (週), M (月)')
+    parser.add_argument('--replay', type=str, metavar='PATH',
+                        help='回放盤中逐筆或分鐘記錄文件並輸出訊號')
+    parser.add_argument('--stream', action='store_true',
+                        help='接收 TCP 行情並即時輸出訊號')
+    parser.add_argument('--speed', type=float,
+                        help='回放倍速，0 為不等待')
+    parser.add_argument('--levels', action='store_true',
+                        help='對股票池批次偵測支撐阻力價位')
+    parser.add_argument('--find-pattern', type=str, metavar='NAMES',
+                        help='查詢出現指定 K 線形態的股票，多個用逗號分隔，'
+                             '可用 bullish / bearish')
+    parser.add_argument('--days', type=int, default=5,
+                        help='形態查詢的 K 線數量')
+    parser.add_argument('--portfolio', type=str, metavar='PATH',
+                        help='持倉權重文件 (每行 代碼,權重)，計算組合風險')
+    parser.add_argument('--import-csv', type=str, nargs='+',
+                        metavar='PATH',
+                        help='將歷史 CSV 文件或目錄匯入價格存儲')
+    parser.add_argument('--raw-prices', action='store_true',
+                        help='匯入的 CSV 為未還原的原始價格')
+    parser.add_argument('--rank', action='store_true',
+                        help='計算股票池的橫截面相對強度排名')
+    parser.add_argument('--top', type=int, metavar='N',
+                        help='查詢已存儲的相對強度前 N 名')
+    parser.add_argument('--date', type=str,
+                        help='相對強度查詢日期 (YYYY-MM-DD)，默認為最近')
+    parser.add_argument('--sectors', action='store_true',
+                        help='建立股票池的產業與行業指數並分析')
+    parser.add_argument('--stale', action='store_true',
+                        help='列出股票池中需要更新數據的股票')
+    parser.add_argument('--chunked', type=str, nargs='+', metavar='PATH',
+                        help='以記憶體映射分塊計算超大歷史 CSV 的技術指標')
+    parser.add_argument('--chunk-rows', type=int, help='分塊計算的區塊行數')
     return parser.parse_args()
 
 
+def run_stream(config, args):
+    """執行盤中回放或 TCP 串流管線"""
+    stream_config = config['streaming']
+    pipeline = StreamPipeline()
+
+    if args.replay:
+        speed = stream_config['speed'] if args.speed is None else args.speed
+        summary = asyncio.run(pipeline.run(
+            lambda queue: pipeline.replay(args.replay, queue, speed)))
+    else:
+        stop = asyncio.Event()
+        host = args.host or config['service']['host']
+        port = args.port or stream_config['port']
+        try:
+            summary = asyncio.run(pipeline.run(
+                lambda queue: pipeline.listen(host, port, queue, stop)))
+        except KeyboardInterrupt:
+            return 0
+
+    for key, value in summary.items():
+        logging.getLogger('stock_analysis').info("%s: %s", key, value)
+    return 0
+
+
+def run_chunked(config, args):
+    """
+    分塊匯入並計算超大歷史 CSV 的技術指標，結果寫入記憶體映射輸出，
+    並以歷史末段 analysis_rows 行執行分析
+    """
+    logger = logging.getLogger('stock_analysis')
+    processor = ChunkedProcessor(chunk_rows=args.chunk_rows)
+    analyzer = Analyzer()
+    analysis_rows = config['chunked']['analysis_rows']
+
+    failed = 0
+    for path in find_csv_files(args.chunked):
+        symbol = symbol_from_path(path)
+        try:
+            processor.store.import_csv(symbol, str(path),
+                                       processor.chunk_rows)
+            summary = processor.process(symbol)
+            logger.info("%s: %s", symbol, summary)
+            if summary['valid_from'] is None:
+                logger.warning("%s 數據不足以計算所有指標", symbol)
+                continue
+
+            start = max(summary['valid_from'],
+                        summary['rows'] - analysis_rows)
+            results = analyzer.analyze(processor.store.frame(symbol, start))
+            if results:
+                logger.info("%s 趨勢: %s", symbol,
+                            results['trend_analysis'])
+
+        except Exception as e:
+            failed += 1
+            logger.error("分塊計算 %s 失敗: %s", symbol, e)
+    return 0 if not failed else 1
+
+
 def main():
     """主入口函數"""
     try:
@@ -167,27 +772,139 @@ def main():
         if config is None:
             return 1
 
+        # 效能記錄
+        profiling = config['profiling']
+        get_profiler().configure(args.profile or profiling['enabled'],
+                                 profiling['trace_memory'])
+
+        # 匯入歷史 CSV
+        if args.import_csv:
+            setup_logging()
+            summary = BulkImporter(
+                workers=args.workers,
+                raw_prices=True if args.raw_prices else None
+            ).import_paths(args.import_csv)
+            return 0 if not summary['failed'] else 1
+
+        # 分塊計算超大歷史
+        if args.chunked:
+            setup_logging()
+            return run_chunked(config, args)
+
+        # 盤中串流
+        if args.replay or args.stream:
+            setup_logging()
+            return run_stream(config, args)
+
         # 創建分析器實例
         analyzer = StockAnalyzer(config)
 
+        # 常駐服務模式
+        if args.serve:
+            service = StockService(analyzer, config)
+            try:
+                service.serve(args.host, args.port)
+            except KeyboardInterrupt:
+                service.shutdown()
+            return 0
+
+        # 組合風險
+        if args.portfolio:
+            try:
+                return 0 if analyzer.run_portfolio(args.portfolio) else 1
+            finally:
+                analyzer.log_summary()
+
+        # 相對強度查詢
+        if args.top:
+            return 0 if analyzer.show_top(args.top, args.date) is not None \
+                else 1
+
         # 獲取要分析的股票列表
-        symbols = args.symbol.split(',') if args.symbol \
-            else config.get('default_symbols', [])
+        if args.symbol:
+            symbols = args.symbol.split(',')
+        elif args.universe:
+            symbols = load_universe(args.universe)
+        else:
+            symbols = config.get('default_symbols', [])
         if not symbols:
             logging.error("未指定股票代碼且配置中沒有默認股票")
             return 1
 
-        # 執行分析
+        # 橫截面相對強度排名
+        if args.rank:
+            try:
+                return 0 if analyzer.rank_universe(symbols) is not None \
+                    else 1
+            finally:
+                analyzer.log_summary()
+
+        # 產業與行業指數
+        if args.sectors:
+            try:
+                return 0 if analyzer.build_sectors(symbols) else 1
+            finally:
+                analyzer.log_summary()
+
+        # 數據新鮮度檢查
+        if args.stale:
+            stale = analyzer.collector.stale_symbols(symbols)
+            analyzer.logger.info("需要更新 %s / %s 支股票: %s", len(stale),
+                                 len(symbols), ','.join(stale))
+            return 0
+
+        # K 線形態查詢
+        if args.find_pattern:
+            try:
+                hits = analyzer.find_patterns(
+                    symbols, args.find_pattern.split(','), args.days)
+                return 0 if hits is not None else 1
+            finally:
+                analyzer.log_summary()
+
+        # 支撐阻力價位
+        if args.levels:
+            try:
+                levels = analyzer.scan_levels(symbols)
+                return 0 if not levels.empty else 1
+            finally:
+                analyzer.log_summary()
+
+        # 批次模式
+        if args.batch:
+            runner = BatchRunner(partial(analyzer.run,
+                                         timeframe=args.timeframe),
+                                 batch_id=args.batch_id,
+                                 workers=args.workers,
+                                 commit_func=analyzer.flush_results)
+            try:
+                summary = runner.run(symbols)
+            finally:
+                analyzer.flush_results()
+                analyzer.evaluate_alerts()
+                analyzer.log_summary()
+            return 0 if not summary['failed'] else 1
+
+        # 執行分析，多支股票時以管線重疊下載、計算與輸出
         success = True
-        for symbol in symbols:
-            if analyzer.run(symbol) is None:
-                logging.error(f"分析股票 {symbol} 失敗")
-                success = False
+        try:
+            if len(symbols) > 1 and config['pipeline']['enabled']:
+                summary = analyzer.run_pipeline(symbols, args.timeframe)
+                success = not summary['failed']
+            else:
+                for symbol in symbols:
+                    if analyzer.run(symbol, args.timeframe) is None:
+                        logging.error("分析股票 %s 失敗", symbol)
+                        success = False
+        finally:
+            analyzer.flush_results()
+            analyzer.evaluate_alerts()
+            analyzer.log_summary()
 
         return 0 if success else 1
 
     except Exception as e:
-        logging.error(f"程序執行失敗: {str(e)}")
+        logging.error("程序執行失敗: %s", e)
         return 1
 
 
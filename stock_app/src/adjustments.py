@@ -0,0 +1,162 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from src.utils.config_loader import ConfigLoader
+from src.store import PriceStore
+
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+FACTOR_COLUMNS = ['dividend', 'split', 'price_factor', 'volume_factor']
+
+
+def _splits(df: pd.DataFrame) -> np.ndarray:
+    """分割比例，0 (無分割) 視為 1"""
+    if 'stock splits' not in df.columns:
+        return np.ones(len(df))
+    ratio = df['stock splits'].to_numpy(dtype=float)
+    return np.where(ratio > 0, ratio, 1.0)
+
+
+def _after(multipliers: np.ndarray) -> np.ndarray:
+    """每一行之後 (不含本行) 所有乘數的乘積"""
+    cumulative = np.cumprod(multipliers[::-1])[::-1]
+    return np.append(cumulative[1:], 1.0)
+
+
+def unadjust_splits(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    還原 Yahoo 已做分割調整的價格、成交量與股利
+
+    每一行的價格乘以其後所有分割比例的乘積，成交量則相除，
+    得到當時實際交易的數值。
+    """
+    ratio = _after(_splits(df))
+    if np.all(ratio == 1.0):
+        return df
+
+    df = df.copy()
+    for column in PRICE_COLUMNS:
+        df[column] = df[column] * ratio
+    df['volume'] = df['volume'] / ratio
+    if 'dividends' in df.columns:
+        df['dividends'] = df['dividends'] * ratio
+    return df
+
+
+def factor_table(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    由原始價格中的除權息事件建立調整因子表
+
+    每個事件以除權息日為索引，price_factor 為該日之前的價格需要乘上
+    的比例: 除息為 1 - 股利 / 前一日收盤價，分割為 1 / 比例；
+    volume_factor 為分割比例。
+    """
+    dividends = raw['dividends'].to_numpy(dtype=float) \
+        if 'dividends' in raw.columns else np.zeros(len(raw))
+    splits = _splits(raw)
+    events = np.flatnonzero((dividends > 0) | (splits != 1.0))
+
+    previous_close = raw['close'].shift(1).to_numpy(dtype=float)[events]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dividend_factor = np.where(previous_close > 0,
+                                   1 - dividends[events] / previous_close,
+                                   1.0)
+    return pd.DataFrame({
+        'dividend': dividends[events],
+        'split': splits[events],
+        'price_factor': dividend_factor / splits[events],
+        'volume_factor': splits[events]
+    }, index=raw.index[events].rename('Date'))
+
+
+def cumulative_factors(index: pd.DatetimeIndex,
+                       factors: pd.DataFrame) -> Tuple[np.ndarray,
+                                                       np.ndarray]:
+    """
+    將事件因子展開為每一行的累積價格與成交量因子
+
+    事件只影響除權息日之前的行，累積因子為該行之後所有事件的乘積。
+    """
+    price = np.ones(len(index) + 1)
+    volume = np.ones(len(index) + 1)
+    if factors is not None and not factors.empty:
+        event_index = pd.DatetimeIndex(factors.index)
+        if index.tz is not None and event_index.tz is not None:
+            event_index = event_index.tz_convert(index.tz)
+        positions = index.searchsorted(event_index)
+        np.multiply.at(price, positions,
+                       factors['price_factor'].to_numpy(dtype=float))
+        np.multiply.at(volume, positions,
+                       factors['volume_factor'].to_numpy(dtype=float))
+    return _after(price)[:len(index)], _after(volume)[:len(index)]
+
+
+def adjust(raw: pd.DataFrame, factors: pd.DataFrame) -> pd.DataFrame:
+    """以累積因子向量相乘產生還原價格，原始數據不變"""
+    price, volume = cumulative_factors(pd.DatetimeIndex(raw.index), factors)
+    adjusted = raw.copy()
+    for column in PRICE_COLUMNS:
+        adjusted[column] = raw[column] * price
+    adjusted['volume'] = raw['volume'] * volume
+    if 'dividends' in raw.columns:
+        adjusted['dividends'] = raw['dividends'] * price
+    return adjusted
+
+
+def factor_key(symbol: str) -> str:
+    """調整因子表在價格存儲中的鍵，例如 2330@factors"""
+    return f"{symbol}@factors"
+
+
+class AdjustmentStore:
+    def __init__(self, store: Optional[PriceStore] = None):
+        """
+        初始化調整因子存儲
+
+        價格存儲中 <代碼>.csv 為原始價格，<代碼>@factors.csv 為除權息
+        事件與調整因子；新的除權息事件只會改變因子表。
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.adjustments')
+        self.store = store or PriceStore()
+
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """讀取因子表，不存在時為 None (價格尚未以原始價格存儲)"""
+        path = self.store.path(factor_key(symbol))
+        if not path.exists():
+            return None
+        try:
+            factors = pd.read_csv(path, index_col=0,
+                                  float_precision='round_trip')
+            factors.index = pd.to_datetime(factors.index, utc=True)
+            factors.index.name = 'Date'
+            return factors.reindex(columns=FACTOR_COLUMNS)
+
+        except Exception as e:
+            self.logger.warning("讀取 %s 的調整因子失敗: %s", symbol, e)
+            return None
+
+    def update(self, symbol: str, raw: pd.DataFrame) -> pd.DataFrame:
+        """由原始價格重建因子表，事件有變化時才寫入"""
+        factors = factor_table(raw)
+        stored = self.load(symbol)
+        changed = stored is None or len(stored) != len(factors) or \
+            not np.allclose(stored.to_numpy(), factors.to_numpy(),
+                            rtol=1e-12, atol=0)
+        if changed:
+            self.store.save(factor_key(symbol), factors)
+            if stored is not None:
+                self.logger.info("%s 調整因子已更新: %s 個事件", symbol,
+                                 len(factors))
+        return factors
+
+    def discard(self, symbol: str) -> None:
+        """刪除因子表，價格文件回到舊版還原價格的狀態"""
+        if self.store.exists(factor_key(symbol)):
+            self.store.delete(factor_key(symbol))
+            self.logger.info("%s 的價格不是原始價格，已刪除調整因子", symbol)
+
+    def adjusted(self, symbol: str, raw: pd.DataFrame) -> pd.DataFrame:
+        """以已存儲的因子表產生還原價格"""
+        return adjust(raw, self.load(symbol))
@@ -0,0 +1,292 @@
+import sys
+import json
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from src.utils.config_loader import ConfigLoader
+from src.utils.helpers import parse_condition, to_jsonable
+from src.indicators import compile_plan
+
+
+# 快照固定保留的列 (版本判斷與衍生欄位使用)，其餘依規則引用的列決定
+BASE_COLUMNS = ['close', 'volume']
+# 快照中計算的衍生欄位與其依賴的指標列
+DERIVED_COLUMNS = {'bb_z': ['bb_upper', 'bb_middle'],
+                   'volume_ratio': []}
+PREV_PREFIX = 'prev.'
+
+
+class Rule:
+    def __init__(self, name: str, conditions: List[str] = None,
+                 cross: Optional[List[str]] = None,
+                 direction: str = 'up'):
+        """
+        編譯後的告警規則
+
+        Args:
+            name: 規則名稱
+            conditions: 條件列表，全部成立時觸發，例如 ["rsi <= 30"]
+            cross: 兩個列名，前一根 K 線未穿越、本根穿越時成立
+            direction: 穿越方向 up/down
+        """
+        self.name = name
+        self.conditions = [parse_condition(c) for c in conditions or []]
+        self.cross = cross
+        self.direction = direction
+        self.columns = [column for column, _, _ in self.conditions]
+        if cross:
+            self.columns += list(cross) + [f'prev.{c}' for c in cross]
+
+    def evaluate(self, frame: pd.DataFrame) -> pd.Series:
+        """對所有股票的快照向量化求值，缺少數據的股票視為不成立"""
+        result = pd.Series(True, index=frame.index)
+        for column in self.columns:
+            if column not in frame.columns:
+                return pd.Series(False, index=frame.index)
+            result &= frame[column].notna()
+
+        for column, func, threshold in self.conditions:
+            result &= func(frame[column], threshold)
+
+        if self.cross:
+            a, b = self.cross
+            if self.direction == 'up':
+                result &= (frame[f'prev.{a}'] <= frame[f'prev.{b}']) & \
+                    (frame[a] > frame[b])
+            else:
+                result &= (frame[f'prev.{a}'] >= frame[f'prev.{b}']) & \
+                    (frame[a] < frame[b])
+        return result.astype(bool)
+
+
+def _base_column(column: str) -> str:
+    """去掉 prev. 前綴的列名"""
+    return column[len(PREV_PREFIX):] if column.startswith(PREV_PREFIX) \
+        else column
+
+
+def known_columns(config: Dict) -> set:
+    """處理後數據中可能出現的列: 價格列、配置中的指標與快照衍生欄位"""
+    columns = set(config['data_processing']['required_columns'])
+    columns |= set(compile_plan(config, sys.maxsize).outputs)
+    return columns | {name for name, needed in DERIVED_COLUMNS.items()
+                      if set(needed) <= columns}
+
+
+def snapshot_columns(rules: List[Rule]) -> List[str]:
+    """規則引用的列 (去掉 prev. 前綴) 加上衍生欄位依賴的列"""
+    columns = list(BASE_COLUMNS)
+    for rule in rules:
+        for column in map(_base_column, rule.columns):
+            for needed in DERIVED_COLUMNS.get(column, [column]):
+                if needed not in columns:
+                    columns.append(needed)
+    return columns
+
+
+def compile_rules(config: Dict) -> List[Rule]:
+    """
+    由 analysis.indicators 的閾值與 alerts.rules 編譯規則
+
+    引用處理後數據中不存在的列的規則永遠不會成立，記錄錯誤並略過。
+    """
+    indicators = config['analysis']['indicators']
+    alert_config = config['alerts']
+
+    rules = [
+        Rule('rsi_oversold', [f"rsi <= {indicators['rsi_oversold']}"]),
+        Rule('rsi_overbought',
+             [f"rsi >= {indicators['rsi_overbought']}"]),
+        Rule('bb_breach_upper', [f"bb_z >= {indicators['bb_threshold']}"]),
+        Rule('bb_breach_lower',
+             [f"bb_z <= {-indicators['bb_threshold']}"]),
+        Rule('volume_spike',
+             [f"volume_ratio >= {alert_config['volume_ratio']}"])
+    ]
+    if indicators.get('macd_signal') == 'cross':
+        rules += [Rule('macd_cross_up', cross=['macd', 'signal']),
+                  Rule('macd_cross_down', cross=['macd', 'signal'],
+                       direction='down')]
+
+    for spec in alert_config.get('rules') or []:
+        rules.append(Rule(spec['name'], spec.get('when'),
+                          spec.get('cross'), spec.get('direction', 'up')))
+
+    known = known_columns(config)
+    compiled = []
+    for rule in rules:
+        unknown = sorted({column for column in rule.columns
+                          if _base_column(column) not in known})
+        if unknown:
+            logging.getLogger('stock_analysis.alerts').error(
+                "告警規則 %s 引用了不存在的列 %s，已略過", rule.name, unknown)
+            continue
+        compiled.append(rule)
+    return compiled
+
+
+class AlertEngine:
+    def __init__(self, sink: Optional[Callable[[Dict], None]] = None,
+                 state_path: Optional[str] = None):
+        """
+        初始化增量告警引擎
+
+        Args:
+            sink: 接收告警的函數，默認寫入 output_dir 下的 JSON 行文件
+            state_path: 已觸發狀態的保存路徑，重啟後不重複觸發；
+                已評估的 K 線版本保存在旁邊的 .versions.json，
+                重啟後未變化的股票不重新評估
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.alerts')
+
+        alert_config = self.config['alerts']
+        output_dir = Path(self.config['base']['output_dir'])
+        self.sink_path = output_dir / alert_config['sink']
+        self.state_path = Path(state_path or
+                               output_dir / alert_config['state_file'])
+        self.versions_path = self.state_path.with_suffix('.versions.json')
+        self.sink = sink
+        self.volume_period = alert_config['volume_period']
+        self.bb_multiplier = float(self.config['technical_indicators']
+                                   ['bollinger_bands']['std_multiplier'])
+
+        self.rules = compile_rules(self.config)
+        self.columns = snapshot_columns(self.rules)
+        self.snapshots = {}
+        self.dirty = set()
+        self.active = {rule: set(symbols) for rule, symbols
+                       in self._load_json(self.state_path).items()}
+        self.versions = {symbol: tuple(version) for symbol, version
+                         in self._load_json(self.versions_path).items()}
+        self._lock = threading.Lock()
+
+    def _load_json(self, path: Path) -> Dict:
+        try:
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            self.logger.warning("讀取告警狀態失敗 %s: %s", path, e)
+        return {}
+
+    def _dump_json(self, path: Path, data: Dict) -> None:
+        path.parent.mkdir(exist_ok=True)
+        temp_path = path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        temp_path.replace(path)
+
+    def _save_state(self) -> None:
+        self._dump_json(self.state_path,
+                        {rule: sorted(symbols)
+                         for rule, symbols in self.active.items()})
+        # 只保存已評估的版本，待評估的股票重啟後仍會重新評估
+        with self._lock:
+            versions = {symbol: list(version)
+                        for symbol, version in self.versions.items()
+                        if symbol not in self.dirty}
+        self._dump_json(self.versions_path, versions)
+
+    def update(self, symbol: str, df: Optional[pd.DataFrame]) -> bool:
+        """
+        登記股票最新的指標數據，K 線有變化時標記為待評估
+
+        Returns:
+            bool: 是否標記為待評估
+        """
+        if df is None or df.empty:
+            return False
+
+        last = df.iloc[-1]
+        version = (len(df), pd.Timestamp(df.index[-1]).isoformat(),
+                   float(last['close']), float(last['volume']))
+        with self._lock:
+            if self.versions.get(symbol) == version:
+                return False
+
+        snapshot = {'date': df.index[-1]}
+        for offset, prefix in ((1, ''), (2, 'prev.')):
+            if len(df) < offset:
+                continue
+            row = df.iloc[-offset]
+            for column in self.columns:
+                if column in row.index:
+                    snapshot[prefix + column] = float(row[column])
+
+        # 衍生欄位: 收盤價偏離布林中軌的標準差倍數、成交量相對均量
+        if 'bb_middle' in snapshot and 'bb_upper' in snapshot:
+            std = (snapshot['bb_upper'] - snapshot['bb_middle']) \
+                / self.bb_multiplier
+            snapshot['bb_z'] = (snapshot['close'] - snapshot['bb_middle']) \
+                / std if std > 0 else np.nan
+        average = df['volume'].iloc[-self.volume_period:].mean()
+        if len(df) >= self.volume_period and average > 0:
+            snapshot['volume_ratio'] = snapshot['volume'] / average
+
+        with self._lock:
+            self.snapshots[symbol] = snapshot
+            self.versions[symbol] = version
+            self.dirty.add(symbol)
+        return True
+
+    def evaluate(self) -> List[Dict]:
+        """
+        只評估有變化的股票，條件由不成立轉為成立時觸發一次告警
+
+        Returns:
+            List[Dict]: 本次觸發的告警
+        """
+        with self._lock:
+            dirty, self.dirty = self.dirty, set()
+            if not dirty:
+                return []
+            frame = pd.DataFrame.from_dict(
+                {symbol: self.snapshots[symbol] for symbol in dirty},
+                orient='index'
+            )
+
+        fired = []
+        fired_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for rule in self.rules:
+            matched = rule.evaluate(frame)
+            active = self.active.setdefault(rule.name, set())
+            now_true = set(matched.index[matched.values])
+
+            for symbol in sorted(now_true - active):
+                row = frame.loc[symbol]
+                fired.append({
+                    'rule': rule.name,
+                    'symbol': symbol,
+                    'date': row['date'],
+                    'values': {column: row[column]
+                               for column in rule.columns},
+                    'fired_at': fired_at
+                })
+            active -= set(frame.index) - now_true
+            active |= now_true
+
+        if fired:
+            self._emit(fired)
+        self._save_state()
+        self.logger.info("告警評估: %s 支股票, 觸發 %s 個告警",
+                         len(frame), len(fired))
+        return fired
+
+    def _emit(self, alerts: List[Dict]) -> None:
+        if self.sink is not None:
+            for alert in alerts:
+                self.sink(alert)
+            return
+
+        self.sink_path.parent.mkdir(exist_ok=True)
+        with open(self.sink_path, 'a', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps(to_jsonable(alert),
+                                   ensure_ascii=False) + '\n')
+                self.logger.info("告警 %s: %s", alert['rule'],
+                                 alert['symbol'])
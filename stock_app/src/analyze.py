@@ -5,9 +5,19 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 import logging
 from src.utils.config_loader import ConfigLoader
+from src.market import to_returns, rolling_beta, beta_and_correlation
+from src.utils.profiler import profiled
+from src.levels import LevelDetector
+from src.candles import PatternScanner
+from src.volume_profile import VolumeProfile
 
 
 class Analyzer:
+    # 可供 sections 選擇的分析段落，sector_analysis 需要產業指數
+    SECTIONS = ('technical_analysis', 'trend_analysis', 'pattern_analysis',
+                'risk_analysis', 'volume_analysis', 'prediction',
+                'sector_analysis')
+
     def __init__(self):
         config_loader = ConfigLoader()
         self.config = config_loader.get_config()
@@ -16,21 +26,76 @@ class Analyzer:
         # 加載分析參數
         self.analysis_params = self.config['analysis']
 
-    def analyze(self, df: pd.DataFrame) -> Dict:
-        """執行完整的分析流程"""
+        # 基準指數報酬率，由 set_benchmark 在每次執行時加載一次
+        self.benchmark_returns = None
+        self.level_detector = LevelDetector()
+        self.pattern_scanner = PatternScanner()
+
+    def set_benchmark(self, prices: Optional[pd.Series]) -> None:
+        """設置基準指數收盤價"""
+        if prices is None or prices.empty:
+            self.benchmark_returns = None
+            return
+        self.benchmark_returns = to_returns(prices)
+
+    def columns(self, sections: Optional[List[str]] = None) -> List[str]:
+        """
+        分析段落讀取的技術指標列，供 Processor 只計算所需的指標
+
+        價量列 (開高低收量) 不在其中；sections 默認為全部段落
+        """
+        self._check_sections(sections)
+        volume_period = self.config['technical_indicators']['volume']\
+            ['relative_period']
+        consumed = {
+            'technical_analysis': ['rsi', 'macd', 'signal', 'ma_20'],
+            'pattern_analysis': ['support', 'resistance'],
+            'volume_analysis': [f'volume_ma_{volume_period}',
+                                'relative_volume']
+        }
+        return sorted({column for name, columns in consumed.items()
+                       if sections is None or name in sections
+                       for column in columns})
+
+    def analyze(self, df: pd.DataFrame,
+                sector: Optional[pd.DataFrame] = None,
+                sections: Optional[List[str]] = None) -> Dict:
+        """
+        執行完整的分析流程，sector 為所屬產業指數時加入產業比較
+
+        sections 指定只執行部分段落 (例如 ['technical_analysis',
+        'risk_analysis'])，默認全部執行；包含未知段落時拋出 ValueError
+        """
+        self._check_sections(sections)
         try:
-            results = {
-                'technical_analysis': self._technical_analysis(df),
-                'trend_analysis': self._trend_analysis(df),
-                'pattern_analysis': self._pattern_analysis(df),
-                'risk_analysis': self._risk_analysis(df),
-                'prediction': self._make_prediction(df)
+            stages = {
+                'technical_analysis': self._technical_analysis,
+                'trend_analysis': self._trend_analysis,
+                'pattern_analysis': self._pattern_analysis,
+                'risk_analysis': self._risk_analysis,
+                'volume_analysis': self._volume_analysis,
+                'prediction': self._make_prediction
             }
-            return results
+            if sector is not None and not sector.empty:
+                stages['sector_analysis'] = \
+                    lambda data: self._sector_analysis(data, sector)
+            return {name: stage(df) for name, stage in stages.items()
+                    if sections is None or name in sections}
         except Exception as e:
-            self.logger.error(f"分析過程發生錯誤: {str(e)}")
+            self.logger.error("分析過程發生錯誤: %s", e)
             return None
 
+    @classmethod
+    def _check_sections(cls, sections: Optional[List[str]]) -> None:
+        """檢查段落名稱，避免拼寫錯誤的段落被靜默忽略"""
+        if sections is None:
+            return
+        unknown = [name for name in sections if name not in cls.SECTIONS]
+        if unknown:
+            raise ValueError(f"未知的分析段落: {unknown}，"
+                             f"可用段落: {list(cls.SECTIONS)}")
+
+    @profiled('analyze.technical')
     def _technical_analysis(self, df: pd.DataFrame) -> Dict:
         """技術分析"""
         try:
@@ -62,6 +127,9 @@ class Analyzer:
                 'current_price': latest['close'],
                 'price_change': price_change,
                 'volume_change': volume_change,
+                'ma20': ma20,
+                'rsi': latest['rsi'],
+                'macd': latest['macd'],
                 'rsi_status': rsi_status,
                 'macd_signal': macd_signal,
                 'trend_strength': trend_strength  # 添加趨勢強度
@@ -70,9 +138,10 @@ class Analyzer:
             return analysis
 
         except Exception as e:
-            self.logger.error(f"執行技術分析時發生錯誤: {str(e)}")
+            self.logger.error("執行技術分析時發生錯誤: %s", e)
             return None
 
+    @profiled('analyze.trend')
     def _trend_analysis(self, df: pd.DataFrame) -> Dict:
         """趨勢分析"""
         # 計算各種時間週期的趨勢
@@ -80,8 +149,11 @@ class Analyzer:
         trends = {}
 
         for period in periods:
-            price_for_now = df['close'].iloc[-1] - df['close'].iloc[-period]
-            price_change = price_for_now / df['close'].iloc[-period] * 100
+            # 週/月 K 線的根數可能少於配置的日數，以可用的最長期間計算
+            lookback = max(min(period, len(df) - 1), 1)
+            price_for_now = \
+                df['close'].iloc[-1] - df['close'].iloc[-lookback]
+            price_change = price_for_now / df['close'].iloc[-lookback] * 100
             trends[f'{period}d_trend'] = {
                 'direction': 'up' if price_change > 0 else 'down',
                 'change_percent': price_change
@@ -89,51 +161,120 @@ class Analyzer:
 
         return trends
 
+    @profiled('analyze.pattern')
     def _pattern_analysis(self, df: pd.DataFrame) -> Dict:
         """形態分析"""
         patterns = {}
 
-        # 計算K線形態
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
-
-        # 十字星形態
-        doji = abs(latest['open'] - latest['close']) <= (
-            latest['high'] - latest['low']
-            ) * 0.1
-
-        # 錘子線形態
-        diff_of_latest = latest['high'] - latest['low']
-        diff_of_OC = latest['open'] - latest['close']
-        diff_OC_low = min(latest['open'], latest['close']) - latest['low']
-        hammer = (
-            diff_of_latest > 3 * abs(diff_of_OC) and
-            diff_OC_low > 2 * abs(diff_of_OC)
-                )
+        # 計算最新K線的形態 (十字星與錘子線的閾值依 analysis.pattern 配置)
+        latest = self.pattern_scanner.latest(df)
+        doji = 'doji' in latest
+        hammer = 'hammer' in latest
 
         patterns.update({
             'doji': doji,
             'hammer': hammer,
+            'candles': latest,
             'support_level': self._find_support(df),
-            'resistance_level': self._find_resistance(df)
+            'resistance_level': self._find_resistance(df),
+            'levels': self.level_detector.summarize(df)
         })
 
         return patterns
 
+    @profiled('analyze.risk')
     def _risk_analysis(self, df: pd.DataFrame) -> Dict:
         """風險分析"""
         returns = df['close'].pct_change()
+        risk_params = self.analysis_params['risk']
+        confidence = risk_params['var_confidence']
+        var = returns.quantile(1 - confidence)
 
         risk_metrics = {
             'volatility': returns.std() * np.sqrt(252),  # 年化波動率
+            'var_confidence': confidence,
             'var_95': returns.quantile(0.05),  # 95% VaR
+            'var': var,  # 歷史法 VaR (報酬率分位數)
+            'cvar': returns[returns <= var].mean(),
             'max_drawdown': self._calculate_max_drawdown(df['close']),
-            'sharpe_ratio': self._calculate_sharpe_ratio(returns),
-            'beta': self._calculate_beta(df)
+            'sharpe_ratio': self._calculate_sharpe_ratio(
+                returns, risk_params['risk_free_rate']),
+            **self._calculate_beta(df)
         }
 
         return risk_metrics
 
+    @profiled('analyze.volume')
+    def _volume_analysis(self, df: pd.DataFrame) -> Dict:
+        """成交量相對均量與價量分佈 (整段歷史與近期的控制點、價值區)"""
+        period = self.config['technical_indicators']['volume']\
+            ['relative_period']
+        latest = df.iloc[-1]
+        average = latest.get(f'volume_ma_{period}',
+                             df['volume'].iloc[-period:].mean())
+        relative = latest.get('relative_volume',
+                              latest['volume'] / average if average else 0.0)
+
+        analysis = {
+            'volume': latest['volume'],
+            'volume_ma': average,
+            'relative_volume': relative,
+            'above_average': bool(relative > 1)
+        }
+
+        # 前綴和只建立一次，整段與近期分佈各為 O(bins)
+        profile = VolumeProfile(df)
+        window = self.analysis_params['volume_profile']['window']
+        for name, start in (('profile', None),
+                            ('recent_profile', df.index[-min(window,
+                                                             len(df))])):
+            summary = profile.summary(start)
+            if summary is None:
+                continue
+            summary['position'] = (
+                'above' if latest['close'] > summary['value_area_high']
+                else 'below' if latest['close'] < summary['value_area_low']
+                else 'inside'
+            )
+            analysis[name] = summary
+        return analysis
+
+    @profiled('analyze.sector')
+    def _sector_analysis(self, df: pd.DataFrame,
+                         sector: pd.DataFrame) -> Dict:
+        """相對所屬產業指數的超額報酬、貝塔係數與相對強度"""
+        # 以交易日 (無時區) 對齊，存儲讀回的時區可能與日 K 線不同
+        close = self._by_date(df['close'])
+        sector_close = self._by_date(sector['close'])\
+            .reindex(close.index).ffill()
+
+        metrics = {'name': sector.attrs.get('name', '')}
+        for label, period in self.analysis_params['trend'].items():
+            if len(close) <= period:
+                continue
+            stock_return = close.iloc[-1] / close.iloc[-1 - period] - 1
+            sector_return = sector_close.iloc[-1] / \
+                sector_close.iloc[-1 - period] - 1
+            metrics[f'excess_return_{period}d'] = stock_return - sector_return
+
+        metrics['beta'], metrics['correlation'] = beta_and_correlation(
+            to_returns(close), to_returns(sector_close))
+
+        # 相對強度: 個股 / 產業 比值相對其中期均值的偏離
+        ratio = close / sector_close
+        period = self.analysis_params['trend']['medium_term']
+        metrics['relative_strength'] = \
+            ratio.iloc[-1] / ratio.iloc[-period:].mean() - 1
+        return metrics
+
+    @staticmethod
+    def _by_date(series: pd.Series) -> pd.Series:
+        index = pd.DatetimeIndex(series.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return series.set_axis(index.normalize())
+
+    @profiled('analyze.prediction')
     def _make_prediction(self, df: pd.DataFrame) -> Dict:
         """預測分析"""
         try:
@@ -165,15 +306,27 @@ class Analyzer:
             }
 
         except Exception as e:
-            self.logger.error(f"預測失敗: {str(e)}")
+            self.logger.error("預測失敗: %s", e)
             return None
 
-    def _find_support(self, df: pd.DataFrame, window: int = 20) -> float:
-        """找出支撐位"""
+    def _find_support(self, df: pd.DataFrame,
+                      window: Optional[int] = None) -> float:
+        """找出支撐位，優先使用 Processor 已計算的 support 列"""
+        configured = self.analysis_params['support_resistance']['window']
+        if window is None or window == configured:
+            if 'support' in df.columns:
+                return df['support'].iloc[-1]
+            window = configured
         return df['low'].rolling(window=window).min().iloc[-1]
 
-    def _find_resistance(self, df: pd.DataFrame, window: int = 20) -> float:
-        """找出阻力位"""
+    def _find_resistance(self, df: pd.DataFrame,
+                         window: Optional[int] = None) -> float:
+        """找出阻力位，優先使用 Processor 已計算的 resistance 列"""
+        configured = self.analysis_params['support_resistance']['window']
+        if window is None or window == configured:
+            if 'resistance' in df.columns:
+                return df['resistance'].iloc[-1]
+            window = configured
         return df['high'].rolling(window=window).max().iloc[-1]
 
     def _calculate_max_drawdown(self, prices: pd.Series) -> float:
@@ -188,11 +341,24 @@ class Analyzer:
         excess_returns = returns - risk_free_rate/252
         return np.sqrt(252) * excess_returns.mean() / returns.std()
 
-    def _calculate_beta(self, df: pd.DataFrame) -> float:
-        """計算貝塔係數"""
-        # 這裡需要市場指數數據才能計算真實的貝塔係數
-        # 這是一個簡化的計算
-        return df['close'].pct_change().std() * np.sqrt(252)
+    def _calculate_beta(self, df: pd.DataFrame) -> Dict:
+        """計算相對基準指數的貝塔係數與相關係數"""
+        window = self.analysis_params['benchmark']['window']
+        metrics = {'beta': np.nan, 'correlation': np.nan,
+                   'rolling_beta': np.nan}
+        if self.benchmark_returns is None:
+            return metrics
+
+        returns = to_returns(df['close'])
+        metrics['beta'], metrics['correlation'] = beta_and_correlation(
+            returns, self.benchmark_returns)
+
+        # 最近一個窗口的滾動貝塔
+        beta, _ = rolling_beta(returns.to_frame('close'),
+                               self.benchmark_returns, window)
+        if not beta.empty:
+            metrics['rolling_beta'] = beta['close'].iloc[-1]
+        return metrics
 
         # df是來自process return的result(DataFrame)
     def _ma_dense(self, df: pd.DataFrame, dense_parameters: float)\
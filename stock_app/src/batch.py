@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from src.utils.config_loader import ConfigLoader
+
+
+def load_universe(path: str) -> List[str]:
+    """讀取股票清單文件，每行一個代碼，# 之後為註解"""
+    symbols = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            symbol = line.split('#', 1)[0].strip()
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+    return symbols
+
+
+class BatchRunner:
+    def __init__(self, run_func: Callable[[str], Optional[bool]],
+                 batch_id: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 checkpoint_dir: Optional[str] = None,
+                 commit_func: Optional[Callable[[], Optional[bool]]] = None):
+        """
+        初始化可續跑的批次執行器
+
+        Args:
+            run_func: 分析單支股票的函數，失敗時返回 None 或拋出異常
+            batch_id: 批次識別碼，默認為當天日期，相同識別碼可續跑
+            workers: 並行數量
+            checkpoint_dir: 檢查點根目錄
+            commit_func: 將暫存結果寫入存儲的函數，返回 False 表示寫入
+                失敗；設定時每完成 storage.batch_size 支股票先寫入結果，
+                再記錄這些股票的完成檢查點，中斷後續跑不會跳過未寫入的
+                股票
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.batch')
+        self.batch_config = self.config['batch']
+
+        self.run_func = run_func
+        self.commit_func = commit_func
+        self.commit_every = self.config['storage']['batch_size']
+        self.batch_id = batch_id or datetime.now().strftime('%Y%m%d')
+        self.workers = workers or self.batch_config['workers']
+        self.max_attempts = self.batch_config['max_attempts']
+        self.backoff_seconds = self.batch_config['backoff_seconds']
+        self.backoff_max_seconds = self.batch_config['backoff_max_seconds']
+        self.progress_interval = self.batch_config['progress_interval']
+
+        root = Path(checkpoint_dir or self.batch_config['checkpoint_dir'])
+        self.checkpoint_dir = root / self.batch_id
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._last_report = 0.0
+
+    def _checkpoint_path(self, symbol: str) -> Path:
+        return self.checkpoint_dir / f"{symbol}.json"
+
+    def read_checkpoint(self, symbol: str) -> Optional[Dict]:
+        """讀取單支股票的檢查點"""
+        try:
+            with open(self._checkpoint_path(symbol), 'r',
+                      encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning("檢查點損壞，將重新執行 %s: %s", symbol, e)
+            return None
+
+    def _write_checkpoint(self, symbol: str, checkpoint: Dict) -> None:
+        """原子寫入檢查點，避免中斷時留下半個文件"""
+        path = self._checkpoint_path(symbol)
+        temp_path = path.with_suffix('.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    def plan(self, symbols: List[str]) -> List[str]:
+        """規劃待執行清單，跳過本批次已完成的股票"""
+        pending = []
+        for symbol in symbols:
+            checkpoint = self.read_checkpoint(symbol)
+            if checkpoint is None or checkpoint.get('status') != 'done':
+                pending.append(symbol)
+        skipped = len(symbols) - len(pending)
+        if skipped:
+            self.logger.info("批次 %s: 跳過已完成的 %s 支股票", self.batch_id, skipped)
+        return pending
+
+    def _run_one(self, symbol: str) -> Dict:
+        """執行單支股票，失敗時以指數退避重試"""
+        start = time.perf_counter()
+        error = None
+        attempt = 0
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                if self.run_func(symbol) is not None:
+                    error = None
+                    break
+                error = "分析返回失敗"
+            except Exception as e:
+                error = str(e)
+
+            if attempt < self.max_attempts:
+                delay = min(self.backoff_seconds * 2 ** (attempt - 1),
+                            self.backoff_max_seconds)
+                self.logger.warning(
+                    "%s 第 %s/%s 次失敗，%.1f 秒後重試: %s",
+                    symbol, attempt, self.max_attempts, delay, error
+                )
+                time.sleep(delay)
+
+        checkpoint = {
+            'symbol': symbol,
+            'status': 'failed' if error else 'done',
+            'attempts': attempt,
+            'error': error,
+            'duration': time.perf_counter() - start,
+            'finished_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        # 結果寫入存儲前不記錄完成，由 run 在 _commit 時寫入
+        if error or self.commit_func is None:
+            self._write_checkpoint(symbol, checkpoint)
+        return checkpoint
+
+    def _commit(self, checkpoints: List[Dict]) -> List[str]:
+        """寫入暫存結果後記錄完成檢查點，返回寫入失敗的股票"""
+        if not checkpoints:
+            return []
+        try:
+            ok = self.commit_func() is not False
+        except Exception as e:
+            self.logger.error("寫入批次結果失敗: %s", e)
+            ok = False
+        for checkpoint in checkpoints:
+            if not ok:
+                checkpoint.update(status='failed', error='結果寫入失敗')
+            self._write_checkpoint(checkpoint['symbol'], checkpoint)
+        return [] if ok else [c['symbol'] for c in checkpoints]
+
+    def _report(self, total: int, started: float, force: bool = False) -> None:
+        """輸出吞吐量與預計剩餘時間"""
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+
+        elapsed = now - started
+        rate = self._completed / elapsed if elapsed > 0 else 0.0
+        remaining = total - self._completed
+        eta = remaining / rate if rate > 0 else float('inf')
+        self.logger.info(
+            "批次進度 %s/%s, 吞吐量 %.1f 支/分鐘, 預計剩餘 %.0f 秒",
+            self._completed, total, rate * 60, eta
+        )
+
+    def run(self, symbols: List[str]) -> Dict:
+        """執行批次，返回完成、失敗與耗時統計"""
+        pending = self.plan(symbols)
+        total = len(pending)
+        started = time.perf_counter()
+        self._completed = 0
+        self._last_report = started
+        self.logger.info(
+            "批次 %s 開始: %s 支待執行, %s 個並行", self.batch_id, total, self.workers)
+
+        failed = []
+        uncommitted = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._run_one, symbol): symbol
+                       for symbol in pending}
+            for future in as_completed(futures):
+                checkpoint = future.result()
+                with self._lock:
+                    self._completed += 1
+                    if checkpoint['status'] != 'done':
+                        failed.append(checkpoint['symbol'])
+                    elif self.commit_func is not None:
+                        uncommitted.append(checkpoint)
+                    self._report(total, started)
+                if len(uncommitted) >= self.commit_every:
+                    failed += self._commit(uncommitted)
+                    uncommitted = []
+        failed += self._commit(uncommitted)
+
+        self._report(total, started, force=True)
+        summary = {
+            'batch_id': self.batch_id,
+            'planned': total,
+            'skipped': len(symbols) - total,
+            'done': total - len(failed),
+            'failed': sorted(failed),
+            'elapsed': time.perf_counter() - started
+        }
+        if failed:
+            self.logger.error(
+                "批次 %s 有 %s 支股票失敗，重新執行相同批次即可續跑: %s",
+                self.batch_id, len(failed), ', '.join(sorted(failed))
+            )
+        return summary
@@ -0,0 +1,254 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, Optional
+from src.utils.config_loader import ConfigLoader
+
+
+# 形態註冊表: 名稱 -> (位元位置, 偏向, 判斷函數)，位元位置依註冊順序，
+# 新增形態只能附加在最後，否則已存儲的旗標會失效
+PATTERNS = {}
+FLAG_DTYPE = np.uint32
+
+
+def pattern(name: str, bias: str):
+    """
+    註冊 K 線形態
+
+    Args:
+        name: 形態名稱
+        bias: bullish / bearish / neutral
+    """
+    def decorator(func: Callable):
+        if len(PATTERNS) >= np.iinfo(FLAG_DTYPE).bits:
+            raise ValueError("形態數量超過旗標位元數")
+        PATTERNS[name] = (len(PATTERNS), bias, func)
+        return func
+    return decorator
+
+
+class Bars:
+    """整段 K 線的陣列與常用衍生量，lag(k) 取 k 根之前的數值"""
+
+    def __init__(self, df: pd.DataFrame, params: Dict):
+        self.params = params
+        self.n = len(df)
+        self.open = df['open'].to_numpy(dtype=float)
+        self.high = df['high'].to_numpy(dtype=float)
+        self.low = df['low'].to_numpy(dtype=float)
+        self.close = df['close'].to_numpy(dtype=float)
+        self.body = self.close - self.open
+        self.abs_body = np.abs(self.body)
+        self.range = self.high - self.low
+        self.upper = self.high - np.maximum(self.open, self.close)
+        self.lower = np.minimum(self.open, self.close) - self.low
+        self.bullish = self.body > 0
+        self.bearish = self.body < 0
+        self._lags = {}
+
+    def lag(self, name: str, k: int) -> np.ndarray:
+        """k 根之前的數值，前 k 根以 NaN (布林值以 False) 填補"""
+        key = (name, k)
+        if key not in self._lags:
+            values = getattr(self, name)
+            fill = False if values.dtype == bool else np.nan
+            lagged = np.empty_like(values)
+            lagged[:k] = fill
+            lagged[k:] = values[:self.n - k]
+            self._lags[key] = lagged
+        return self._lags[key]
+
+    def prior_trend(self) -> np.ndarray:
+        """前三根 K 線的方向: 1 上漲、-1 下跌、0 無"""
+        change = self.lag('close', 1) - self.lag('close', 3)
+        with np.errstate(invalid='ignore'):
+            return np.sign(np.nan_to_num(change))
+
+
+@pattern('doji', 'neutral')
+def _doji(b: Bars) -> np.ndarray:
+    return b.abs_body <= b.range * b.params['doji_threshold']
+
+
+def _long_lower_shadow(b: Bars) -> np.ndarray:
+    t = b.params['hammer_threshold']
+    return (b.range > (t + 1) * b.abs_body) & (b.lower > t * b.abs_body)
+
+
+def _long_upper_shadow(b: Bars) -> np.ndarray:
+    t = b.params['hammer_threshold']
+    return (b.range > (t + 1) * b.abs_body) & (b.upper > t * b.abs_body)
+
+
+@pattern('hammer', 'bullish')
+def _hammer(b: Bars) -> np.ndarray:
+    return _long_lower_shadow(b)
+
+
+@pattern('hanging_man', 'bearish')
+def _hanging_man(b: Bars) -> np.ndarray:
+    return _long_lower_shadow(b) & (b.upper <= b.abs_body) & \
+        (b.prior_trend() > 0)
+
+
+@pattern('inverted_hammer', 'bullish')
+def _inverted_hammer(b: Bars) -> np.ndarray:
+    return _long_upper_shadow(b) & (b.lower <= b.abs_body) & \
+        (b.prior_trend() < 0)
+
+
+@pattern('shooting_star', 'bearish')
+def _shooting_star(b: Bars) -> np.ndarray:
+    return _long_upper_shadow(b) & (b.lower <= b.abs_body) & \
+        (b.prior_trend() > 0)
+
+
+@pattern('bullish_engulfing', 'bullish')
+def _bullish_engulfing(b: Bars) -> np.ndarray:
+    return b.lag('bearish', 1) & b.bullish & \
+        (b.open <= b.lag('close', 1)) & (b.close >= b.lag('open', 1))
+
+
+@pattern('bearish_engulfing', 'bearish')
+def _bearish_engulfing(b: Bars) -> np.ndarray:
+    return b.lag('bullish', 1) & b.bearish & \
+        (b.open >= b.lag('close', 1)) & (b.close <= b.lag('open', 1))
+
+
+@pattern('bullish_harami', 'bullish')
+def _bullish_harami(b: Bars) -> np.ndarray:
+    return b.lag('bearish', 1) & b.bullish & \
+        (b.close < b.lag('open', 1)) & (b.open > b.lag('close', 1))
+
+
+@pattern('bearish_harami', 'bearish')
+def _bearish_harami(b: Bars) -> np.ndarray:
+    return b.lag('bullish', 1) & b.bearish & \
+        (b.close > b.lag('open', 1)) & (b.open < b.lag('close', 1))
+
+
+@pattern('piercing_line', 'bullish')
+def _piercing_line(b: Bars) -> np.ndarray:
+    midpoint = (b.lag('open', 1) + b.lag('close', 1)) / 2
+    return b.lag('bearish', 1) & b.bullish & \
+        (b.open < b.lag('close', 1)) & (b.close > midpoint) & \
+        (b.close < b.lag('open', 1))
+
+
+@pattern('dark_cloud_cover', 'bearish')
+def _dark_cloud_cover(b: Bars) -> np.ndarray:
+    midpoint = (b.lag('open', 1) + b.lag('close', 1)) / 2
+    return b.lag('bullish', 1) & b.bearish & \
+        (b.open > b.lag('close', 1)) & (b.close < midpoint) & \
+        (b.close > b.lag('open', 1))
+
+
+def _star(b: Bars) -> np.ndarray:
+    """中間一根的實體小於第一根實體的三成，且第一根為長實體"""
+    first_body = b.lag('abs_body', 2)
+    return (first_body >= b.lag('range', 2) * 0.5) & \
+        (b.lag('abs_body', 1) <= first_body * 0.3)
+
+
+@pattern('morning_star', 'bullish')
+def _morning_star(b: Bars) -> np.ndarray:
+    midpoint = (b.lag('open', 2) + b.lag('close', 2)) / 2
+    return b.lag('bearish', 2) & _star(b) & b.bullish & \
+        (b.close > midpoint)
+
+
+@pattern('evening_star', 'bearish')
+def _evening_star(b: Bars) -> np.ndarray:
+    midpoint = (b.lag('open', 2) + b.lag('close', 2)) / 2
+    return b.lag('bullish', 2) & _star(b) & b.bearish & \
+        (b.close < midpoint)
+
+
+@pattern('three_white_soldiers', 'bullish')
+def _three_white_soldiers(b: Bars) -> np.ndarray:
+    result = b.bullish & b.lag('bullish', 1) & b.lag('bullish', 2)
+    for k in (0, 1):
+        prev_open, prev_close = b.lag('open', k + 1), b.lag('close', k + 1)
+        open_, close = (b.open, b.close) if k == 0 else \
+            (b.lag('open', k), b.lag('close', k))
+        result &= (close > prev_close) & (open_ > prev_open) & \
+            (open_ <= prev_close)
+    return result
+
+
+@pattern('three_black_crows', 'bearish')
+def _three_black_crows(b: Bars) -> np.ndarray:
+    result = b.bearish & b.lag('bearish', 1) & b.lag('bearish', 2)
+    for k in (0, 1):
+        prev_open, prev_close = b.lag('open', k + 1), b.lag('close', k + 1)
+        open_, close = (b.open, b.close) if k == 0 else \
+            (b.lag('open', k), b.lag('close', k))
+        result &= (close < prev_close) & (open_ < prev_open) & \
+            (open_ >= prev_close)
+    return result
+
+
+def pattern_mask(names: Iterable[str]) -> int:
+    """形態名稱轉為位元遮罩"""
+    mask = 0
+    for name in names:
+        if name not in PATTERNS:
+            raise ValueError(f"未知的形態: {name}")
+        mask |= 1 << PATTERNS[name][0]
+    return mask
+
+
+def decode_flags(flags: int) -> List[str]:
+    """位元旗標轉為形態名稱"""
+    return [name for name, (bit, _, _) in PATTERNS.items()
+            if int(flags) >> bit & 1]
+
+
+def patterns_by_bias(bias: str) -> List[str]:
+    return [name for name, (_, b, _) in PATTERNS.items() if b == bias]
+
+
+class PatternScanner:
+    def __init__(self):
+        """初始化 K 線形態掃描器"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.candles')
+        self.params = self.config['analysis']['pattern']
+
+    def scan(self, df: pd.DataFrame) -> pd.Series:
+        """
+        以整段陣列運算判斷每根 K 線的所有形態
+
+        Returns:
+            pd.Series: 與 df 相同索引的位元旗標 (uint32)，
+            第 i 位對應 PATTERNS 中位置為 i 的形態
+        """
+        bars = Bars(df, self.params)
+        flags = np.zeros(bars.n, dtype=FLAG_DTYPE)
+        with np.errstate(invalid='ignore'):
+            for bit, _, func in PATTERNS.values():
+                flags |= func(bars).astype(FLAG_DTYPE) << FLAG_DTYPE(bit)
+        return pd.Series(flags, index=df.index, name='patterns')
+
+    def scan_many(self, frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """掃描股票池，返回 日期 x 股票 的旗標面板 (無數據為 0)"""
+        panel = pd.concat({symbol: self.scan(df)
+                           for symbol, df in frames.items()}, axis=1)
+        return panel.fillna(0).astype(FLAG_DTYPE)
+
+    @staticmethod
+    def find(panel: pd.DataFrame, names: Iterable[str],
+             days: int = 5) -> List[str]:
+        """查詢最近 days 根 K 線內出現任一指定形態的股票"""
+        mask = FLAG_DTYPE(pattern_mask(names))
+        recent = panel.iloc[-days:].to_numpy() & mask
+        return [symbol for symbol, hit in zip(panel.columns,
+                                              recent.any(axis=0)) if hit]
+
+    def latest(self, df: pd.DataFrame,
+               flags: Optional[pd.Series] = None) -> List[str]:
+        """最新一根 K 線的形態名稱"""
+        if flags is None:
+            # 多根形態與前期趨勢最多需要前 3 根 K 線
+            flags = self.scan(df.iloc[-4:])
+        return decode_flags(flags.iloc[-1])
@@ -0,0 +1,257 @@
+import json
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from src.utils.config_loader import ConfigLoader
+from src.utils.profiler import span
+from src.indicators import IndicatorPlan, Node, compile_plan
+
+
+INPUT_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+ROLLING_KINDS = ('rolling_mean', 'rolling_std', 'rolling_min', 'rolling_max')
+
+
+def _lookback(node: Node) -> int:
+    """節點需要的前一區塊輸入行數"""
+    kind = node.key[0]
+    if kind == 'shift':
+        return node.key[2]
+    if kind == 'delta':
+        return 1
+    if kind in ROLLING_KINDS:
+        return node.key[2] - 1
+    return 0
+
+
+class ChunkedPlan:
+    def __init__(self, plan: IndicatorPlan):
+        """
+        逐區塊執行指標計劃，跨區塊保留滾動窗口與 EWM 的狀態
+
+        滾動與差分節點保留前一區塊最後 lookback 筆輸入並接在下一區塊
+        之前；EWM (adjust=False) 只保留最後一個輸出，接在下一區塊之前
+        作為遞迴的起點。
+        """
+        self.plan = plan
+        self.state = {}
+
+    def run(self, chunk: pd.DataFrame) -> Dict[str, pd.Series]:
+        """執行一個區塊，chunk 以全域行號為索引"""
+        values = {}
+        for group, node in self.plan.steps:
+            with span(f'process.{group}', rows=len(chunk)):
+                values[node.key] = self._run_node(node, chunk, values)
+        return {column: values[node.key]
+                for column, node in self.plan.outputs.items()}
+
+    def _run_node(self, node: Node, chunk: pd.DataFrame,
+                  values: Dict) -> pd.Series:
+        kind = node.key[0]
+        if kind == 'column':
+            return node.func(chunk)
+
+        inputs = [values[n.key] for n in node.inputs]
+        if kind == 'ewm':
+            series = inputs[0]
+            previous = self.state.get(node.key)
+            if previous is not None:
+                series = pd.concat([pd.Series([previous],
+                                              index=[series.index[0] - 1]),
+                                    series])
+            result = node.func(series).iloc[len(series) - len(inputs[0]):]
+            if not np.isnan(result.iloc[-1]):
+                self.state[node.key] = result.iloc[-1]
+            return result
+
+        lookback = _lookback(node)
+        if lookback:
+            tails = self.state.get(node.key)
+            if tails is not None:
+                inputs = [pd.concat([tail, current])
+                          for tail, current in zip(tails, inputs)]
+            result = node.func(*inputs)
+            self.state[node.key] = [s.iloc[-lookback:] for s in inputs]
+            return result.iloc[len(result) - len(chunk):]
+
+        result = node.func(*inputs)
+        if not isinstance(result, pd.Series):
+            result = pd.Series(result, index=chunk.index)
+        return result
+
+
+class MemmapStore:
+    def __init__(self, root: Optional[str] = None):
+        """
+        以記憶體映射陣列存放價格與指標，每支股票一個目錄
+
+        <root>/<代碼>/index.npy (int64 奈秒時間戳)、<列名>.npy 為輸入，
+        out/<列名>.npy 為指標輸出，meta.json 記錄行數與時區。
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.chunked')
+        self.root = Path(root or self.config['chunked']['dir'])
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, symbol: str) -> Path:
+        return self.root / symbol
+
+    def exists(self, symbol: str) -> bool:
+        return (self.path(symbol) / 'meta.json').exists()
+
+    def meta(self, symbol: str) -> Dict:
+        with open(self.path(symbol) / 'meta.json', 'r',
+                  encoding='utf-8') as f:
+            return json.load(f)
+
+    def _create(self, symbol: str, rows: int):
+        directory = self.path(symbol)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {'index': np.lib.format.open_memmap(
+            directory / 'index.npy', mode='w+', dtype=np.int64,
+            shape=(rows,))}
+        for column in INPUT_COLUMNS:
+            arrays[column] = np.lib.format.open_memmap(
+                directory / f'{column}.npy', mode='w+', dtype=np.float64,
+                shape=(rows,))
+        return arrays
+
+    def _finish(self, symbol: str, arrays: Dict, rows: int,
+                tz: Optional[str]) -> None:
+        for array in arrays.values():
+            array.flush()
+        with open(self.path(symbol) / 'meta.json', 'w',
+                  encoding='utf-8') as f:
+            json.dump({'rows': rows, 'tz': tz}, f)
+
+    def write_frame(self, symbol: str, df: pd.DataFrame) -> None:
+        """將記憶體中的 K 線寫入記憶體映射陣列"""
+        arrays = self._create(symbol, len(df))
+        index = pd.DatetimeIndex(df.index)
+        arrays['index'][:] = index.as_unit('ns').asi8
+        for column in INPUT_COLUMNS:
+            arrays[column][:] = df[column].to_numpy(dtype=np.float64)
+        self._finish(symbol, arrays, len(df),
+                     str(index.tz) if index.tz is not None else None)
+
+    def import_csv(self, symbol: str, path: str,
+                   chunk_rows: int) -> int:
+        """
+        分塊讀取大型 CSV (Date 與 OHLCV 列) 寫入記憶體映射陣列
+
+        第一輪只計算行數，第二輪逐塊寫入，全程只保留一個區塊在記憶體中。
+        """
+        rows = sum(len(chunk) for chunk in pd.read_csv(
+            path, usecols=[0], chunksize=chunk_rows))
+        arrays = self._create(symbol, rows)
+
+        tz = None
+        start = 0
+        for chunk in pd.read_csv(path, chunksize=chunk_rows,
+                                 float_precision='round_trip'):
+            chunk.columns = [col.lower() for col in chunk.columns]
+            dates = pd.to_datetime(chunk.iloc[:, 0], utc=True)
+            stop = start + len(chunk)
+            arrays['index'][start:stop] = \
+                pd.DatetimeIndex(dates).as_unit('ns').asi8
+            for column in INPUT_COLUMNS:
+                arrays[column][start:stop] = \
+                    chunk[column].to_numpy(dtype=np.float64)
+            start = stop
+            tz = 'UTC'
+
+        self._finish(symbol, arrays, rows, tz)
+        self.logger.info("已匯入 %s: %s 行", symbol, rows)
+        return rows
+
+    def inputs(self, symbol: str) -> Dict[str, np.memmap]:
+        """以唯讀模式映射輸入陣列"""
+        directory = self.path(symbol)
+        return {name: np.load(directory / f'{name}.npy', mmap_mode='r')
+                for name in ['index'] + INPUT_COLUMNS}
+
+    def outputs(self, symbol: str) -> Dict[str, np.memmap]:
+        """以唯讀模式映射指標輸出陣列"""
+        directory = self.path(symbol) / 'out'
+        return {path.stem: np.load(path, mmap_mode='r')
+                for path in sorted(directory.glob('*.npy'))}
+
+    def frame(self, symbol: str, start: int = 0,
+              stop: Optional[int] = None) -> pd.DataFrame:
+        """
+        讀取 [start, stop) 行的輸入與輸出為 DataFrame
+
+        只複製所選範圍，可用於對歷史末段執行 Analyzer。
+        """
+        meta = self.meta(symbol)
+        arrays = {**self.inputs(symbol), **self.outputs(symbol)}
+        index = pd.DatetimeIndex(np.asarray(arrays.pop('index')[start:stop]))
+        index = index.tz_localize('UTC')
+        if meta['tz'] not in (None, 'UTC'):
+            index = index.tz_convert(meta['tz'])
+        elif meta['tz'] is None:
+            index = index.tz_localize(None)
+        return pd.DataFrame({name: np.asarray(array[start:stop])
+                             for name, array in arrays.items()},
+                            index=index.rename('Date'))
+
+
+class ChunkedProcessor:
+    def __init__(self, store: Optional[MemmapStore] = None,
+                 chunk_rows: Optional[int] = None):
+        """初始化分塊指標計算"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.chunked')
+        self.store = store or MemmapStore()
+        self.chunk_rows = chunk_rows or self.config['chunked']['chunk_rows']
+
+    def process(self, symbol: str,
+                outputs: Optional[Iterable[str]] = None) -> Dict:
+        """
+        以時間順序分塊計算指標並寫入記憶體映射輸出
+
+        計劃依總行數編譯，與記憶體內執行 Processor.process 使用相同的
+        指標集合。輸出保留前段窗口未滿的 NaN，valid_from 為所有指標
+        都有值的第一行 (對應 dropna 後的第一行)。
+
+        Returns:
+            Dict: rows, chunks, valid_from
+        """
+        inputs = self.store.inputs(symbol)
+        rows = len(inputs['close'])
+        plan = compile_plan(self.config, rows, outputs)
+        chunked = ChunkedPlan(plan)
+
+        out_dir = self.store.path(symbol) / 'out'
+        out_dir.mkdir(exist_ok=True)
+        for stale in out_dir.glob('*.npy'):
+            stale.unlink()
+        results = {column: np.lib.format.open_memmap(
+            out_dir / f'{column}.npy', mode='w+', dtype=np.float64,
+            shape=(rows,)) for column in plan.outputs}
+
+        valid_from = None
+        chunks = 0
+        for start in range(0, rows, self.chunk_rows):
+            stop = min(start + self.chunk_rows, rows)
+            chunk = pd.DataFrame(
+                {column: np.asarray(inputs[column][start:stop])
+                 for column in INPUT_COLUMNS},
+                index=pd.RangeIndex(start, stop))
+
+            complete = np.ones(stop - start, dtype=bool)
+            for column, series in chunked.run(chunk).items():
+                values = series.to_numpy(dtype=np.float64)
+                results[column][start:stop] = values
+                complete &= ~np.isnan(values)
+            if valid_from is None and complete.any():
+                valid_from = start + int(np.argmax(complete))
+            chunks += 1
+
+        for array in results.values():
+            array.flush()
+        self.logger.info("%s 分塊計算完成: %s 行, %s 個區塊", symbol, rows,
+                         chunks)
+        return {'rows': rows, 'chunks': chunks, 'valid_from': valid_from}
@@ -3,21 +3,29 @@ import yfinance as yf
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Dict, Iterable, List, Optional
 from src.utils.config_loader import ConfigLoader
+from src.store import PriceStore
+from src.adjustments import AdjustmentStore, adjust, unadjust_splits
+from src.trading_calendar import TradingCalendar
+from src.utils.profiler import span, profiled
 
 
 class Collector:
-    def __init__(self):
-        """初始化收集器"""
+    def __init__(self, data_dir: Optional[str] = None):
+        """初始化收集器，data_dir 默認使用 base.data_dir"""
         self.config_loader = ConfigLoader()
         self.config = self.config_loader.get_config()
         self.logger = logging.getLogger('stock_analysis.collector')
 
         # 設置數據存儲路徑
-        self.data_dir = Path(self.config['base']['data_dir'])
+        self.data_dir = Path(data_dir or self.config['base']['data_dir'])
         self.data_dir.mkdir(exist_ok=True)
+        self.store = PriceStore(self.data_dir)
+        self.adjustments = AdjustmentStore(self.store)
+        self.calendar = TradingCalendar()
 
+    @profiled('collect')
     def collect(self, stock_num: str,
                 start_date: Optional[str] = None,
                 end_date: Optional[str] = None) -> Optional[pd.DataFrame]:
@@ -45,46 +53,132 @@ class Collector:
             for attempt in range(max_attempts):
                 try:
                     # 檢查緩存
-                    cached_data = self._check_cache(stock_num)
+                    with span('collect.cache_read') as cache_span:
+                        cached_data = self._check_cache(stock_num, end_date,
+                                                        start_date)
+                        if cached_data is not None:
+                            cache_span.rows = len(cached_data)
                     if cached_data is not None:
-                        self.logger.info(f"使用緩存的數據: {stock_num}")
-                        return cached_data
+                        self.logger.info("使用緩存的數據: %s", stock_num)
+                        return self._since(cached_data, start_date)
 
-                    # 從 Yahoo Finance 獲取數據
-                    stock = yf.Ticker(f"{stock_num}.TW")
-                    df = stock.history(start=start_date, end=end_date)
+                    # 已以原始價格存儲時只下載最後一根 K 線之後的數據，
+                    # 最後一根一併重新下載以取代可能未收盤的 K 線；存儲的
+                    # 歷史晚於 start_date (例如月 K 線需要較長歷史) 時
+                    # 由 start_date 重新下載
+                    raw = self._load_raw(stock_num)
+                    fetch_start = start_date \
+                        if raw is None or not self._covers(raw, start_date) \
+                        else raw.index.max().strftime('%Y-%m-%d')
 
-                    if df is None or df.empty:
-                        self.logger.warning(f"股票代碼 {stock_num} 的數據為空")
+                    # 從 Yahoo Finance 獲取未還原的價格與除權息事件
+                    df = None
+                    if fetch_start < end_date:
+                        with span('collect.download') as download_span:
+                            stock = yf.Ticker(f"{stock_num}.TW")
+                            df = stock.history(start=fetch_start,
+                                               end=end_date,
+                                               auto_adjust=False,
+                                               actions=True)
+                            if df is not None:
+                                download_span.rows = len(df)
+
+                    if (df is None or df.empty) and raw is None:
+                        self.logger.warning("股票代碼 %s 的數據為空", stock_num)
                         return None
 
-                    # 清理數據
-                    df = self._clean_dataframe(df)
+                    if df is not None and not df.empty:
+                        # 清理數據並還原分割調整
+                        df = self._clean_dataframe(df)
+                        df = unadjust_splits(
+                            df.drop(columns=['adj close'], errors='ignore'))
+                        raw = self._merge_raw(raw, df)
 
-                    # 保存到緩存
-                    self._save_to_file(stock_num, df)
+                        # 保存原始價格與調整因子
+                        self._save_to_file(stock_num, raw)
+                        factors = self.adjustments.update(stock_num, raw)
+                        self.logger.info("成功下載數據: %s", stock_num)
+                    else:
+                        factors = self.adjustments.load(stock_num)
 
-                    self.logger.info(f"成功下載數據: {stock_num}")
-                    return df
+                    if not self.config['data_collection']['adjust_prices']:
+                        return self._since(raw, start_date)
+                    return self._since(adjust(raw, factors), start_date)
 
                 except Exception as e:
                     if attempt < max_attempts - 1:
                         self.logger.warning(
-                            f"嘗試 {attempt + 1}/{max_attempts} 失敗: {str(e)}"
+                            "嘗試 %s/%s 失敗: %s", attempt + 1, max_attempts, e
                         )
                         import time
                         time.sleep(delay_seconds)
                     else:
-                        self.logger.error(f"所有嘗試都失敗: {str(e)}")
+                        self.logger.error("所有嘗試都失敗: %s", e)
                         return None
 
         except Exception as e:
-            self.logger.error(f"收集數據時發生錯誤: {str(e)}")
+            self.logger.error("收集數據時發生錯誤: %s", e)
+            return None
+
+    def collect_benchmark(self,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None
+                          ) -> Optional[pd.DataFrame]:
+        """收集基準指數數據，已緩存時直接從價格存儲讀取"""
+        try:
+            if start_date is None:
+                start_date = \
+                    self.config['data_collection']['default_start_date']
+            if end_date is None:
+                end_date = self.config['data_collection']['default_end_date']
+            if not self._validate_dates(start_date, end_date):
+                return None
+
+            benchmark_config = self.config['analysis']['benchmark']
+            key = benchmark_config['key']
+
+            # 緩存已涵蓋應有的最後一個交易日時不再下載
+            cached = self.store.load(key)
+            if cached is not None:
+                if not self.is_stale(key, end_date) and \
+                        self._covers(cached, start_date):
+                    self.logger.info("使用緩存的基準指數: %s", key)
+                    return cached
+
+            try:
+                index = yf.Ticker(benchmark_config['symbol'])
+                df = index.history(start=start_date, end=end_date)
+            except Exception as e:
+                self.logger.warning("下載基準指數失敗: %s", e)
+                return cached
+
+            if df is None or df.empty:
+                self.logger.warning(
+                    "基準指數 %s 的數據為空", benchmark_config['symbol'])
+                return cached
+
+            df = self._clean_dataframe(df)
+            self.store.save(key, df)
+
+            self.logger.info("成功下載基準指數: %s",
+                             benchmark_config['symbol'])
+            return df
+
+        except Exception as e:
+            self.logger.error("收集基準指數時發生錯誤: %s", e)
             return None
 
     def get_info(self, stock_num: str) -> Optional[Dict]:
-        """獲取股票基本信息"""
+        """獲取股票基本信息，緩存未超過 metadata_days 天時不重新下載"""
         try:
+            cached = self.store.metadata(stock_num)
+            if cached is not None:
+                age = pd.Timestamp.now() - pd.Timestamp(cached['updated_at'])
+                max_days = self.config['data_collection']['metadata_days']
+                if age <= pd.Timedelta(days=max_days):
+                    cached.pop('updated_at')
+                    return cached
+
             stock = yf.Ticker(f"{stock_num}.TW")
             info = stock.info
 
@@ -97,12 +191,13 @@ class Collector:
                 'market_cap': info.get('marketCap', None),
                 'currency': info.get('currency', 'TWD')
             }
+            self.store.save_metadata(result)
 
-            self.logger.info(f"成功獲取股票信息: {stock_num}")
+            self.logger.info("成功獲取股票信息: %s", stock_num)
             return result
 
         except Exception as e:
-            self.logger.error(f"獲取股票信息失敗 {stock_num}: {str(e)}")
+            self.logger.error("獲取股票信息失敗 %s: %s", stock_num, e)
             return None
 
     def _validate_stock_num(self, stock_num: str) -> bool:
@@ -116,7 +211,7 @@ class Collector:
                 raise ValueError("股票代碼必須是數字字符串")
             return True
         except Exception as e:
-            self.logger.error(f"股票代碼驗證失敗: {str(e)}")
+            self.logger.error("股票代碼驗證失敗: %s", e)
             return False
 
     def _validate_dates(self, start_date: str, end_date: str) -> bool:
@@ -128,7 +223,7 @@ class Collector:
                 raise ValueError("起始日期不能晚於結束日期")
             return True
         except ValueError as e:
-            self.logger.error(f"日期格式錯誤: {str(e)}")
+            self.logger.error("日期格式錯誤: %s", e)
             return False
 
     def _clean_dataframe(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
@@ -150,35 +245,106 @@ class Collector:
             return df
 
         except Exception as e:
-            self.logger.error(f"清理數據失敗: {str(e)}")
+            self.logger.error("清理數據失敗: %s", e)
             return None
 
-    def _check_cache(self, stock_num: str) -> Optional[pd.DataFrame]:
-        """檢查是否有緩存數據"""
+    @staticmethod
+    def _covers(df: pd.DataFrame, start_date: Optional[str]) -> bool:
+        """存儲的歷史是否由 start_date 開始 (起始日可能是假日，允許
+        數個交易日的誤差)"""
+        if start_date is None:
+            return True
+        first = pd.Timestamp(df.index.min())
+        if first.tz is not None:
+            first = first.tz_localize(None)
+        return first.normalize() - pd.offsets.BDay(5) <= \
+            pd.Timestamp(start_date)
+
+    @staticmethod
+    def _since(df: pd.DataFrame, start_date: Optional[str]) -> pd.DataFrame:
+        """截取 start_date (含) 之後的數據"""
+        if start_date is None:
+            return df
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return df[index >= pd.Timestamp(start_date)]
+
+    def _check_cache(self, stock_num: str,
+                     end_date: Optional[str] = None,
+                     start_date: Optional[str] = None
+                     ) -> Optional[pd.DataFrame]:
+        """
+        清單中的最後日期已涵蓋應有的最後一個交易日，且歷史由 start_date
+        開始時返回緩存數據
+
+        新鮮度只查詢清單，週末與休市日不會判定為過期。
+        """
         try:
-            file_path = self.data_dir / f"{stock_num}.csv"
-
-            if file_path.exists():
-                df = pd.read_csv(file_path)
-                if not df.empty:
-                    # 使用 tz_localize(None) 來移除時區資訊
-                    today = pd.Timestamp.now().normalize().tz_localize(None)
-                    latest_date = pd.to_datetime(df['date']).max()
-                    if latest_date >= today - pd.Timedelta(days=1):
-                        self.logger.info(f"使用緩存數據: {file_path}")
-                        return df
-            return None
+            if end_date is None:
+                end_date = self.config['data_collection']['default_end_date']
+            if self.is_stale(stock_num, end_date):
+                return None
+
+            raw = self._load_raw(stock_num)
+            if raw is None or not self._covers(raw, start_date):
+                return None
+            self.logger.info("使用緩存數據: %s", self.store.path(stock_num))
+            if not self.config['data_collection']['adjust_prices']:
+                return raw
+            return self.adjustments.adjusted(stock_num, raw)
 
         except Exception as e:
-            self.logger.warning(f"讀取緩存失敗: {str(e)}")
+            self.logger.warning("讀取緩存失敗: %s", e)
         return None
 
-    def _save_to_file(self, stock_num: str, df: pd.DataFrame) -> None:
-        """保存數據到文件"""
-        try:
-            file_path = self.data_dir / f"{stock_num}.csv"
-            df.to_csv(file_path, index=True)
-            self.logger.info(f"數據已保存到: {file_path}")
+    def stale_symbols(self, symbols: Iterable[str],
+                      end_date: Optional[str] = None) -> List[str]:
+        """
+        以清單一次判斷整個股票池中需要更新的股票
 
-        except Exception as e:
-            self.logger.error(f"保存數據失敗: {str(e)}")
+        沒有清單記錄或最後日期早於應有的最後一個交易日者需要更新。
+        """
+        expected = self._expected_last_date(end_date)
+        symbols = list(symbols)
+        last_dates = self.store.manifest_frame()['last_date']\
+            .reindex(symbols).fillna('')
+        return list(last_dates.index[last_dates.to_numpy() < expected])
+
+    def is_stale(self, key: str, end_date: Optional[str] = None) -> bool:
+        """以單一鍵的清單記錄判斷是否需要更新，不讀取整個清單"""
+        entry = self.store.manifest(key)
+        return entry is None or \
+            entry['last_date'] < self._expected_last_date(end_date)
+
+    def _expected_last_date(self, end_date: Optional[str] = None) -> str:
+        """下載到 end_date (不含) 時應有的最後一個交易日"""
+        if end_date is None:
+            end_date = self.config['data_collection']['default_end_date']
+        return self.calendar.expected_last_date(end_date)\
+            .strftime('%Y-%m-%d')
+
+    def _load_raw(self, stock_num: str) -> Optional[pd.DataFrame]:
+        """
+        讀取已存儲的原始價格
+
+        沒有調整因子表的文件為舊版的還原價格，視為不存在以重新下載。
+        """
+        if self.adjustments.load(stock_num) is None:
+            return None
+        return self.store.load(stock_num)
+
+    @staticmethod
+    def _merge_raw(raw: Optional[pd.DataFrame],
+                   new: pd.DataFrame) -> pd.DataFrame:
+        """將新下載的原始價格接在已存儲數據之後，重疊部分以新數據為準"""
+        if raw is None:
+            return new
+        if raw.index.tz is not None and new.index.tz is not None:
+            new.index = new.index.tz_convert(raw.index.tz)
+        kept = raw[raw.index < new.index.min()]
+        return pd.concat([kept, new.reindex(columns=raw.columns)])
+
+    def _save_to_file(self, stock_num: str, df: pd.DataFrame) -> None:
+        """保存數據到價格存儲，同時更新清單"""
+        self.store.save(stock_num, df)
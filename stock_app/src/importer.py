@@ -0,0 +1,213 @@
+import re
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import get_log_queue, setup_worker_logging
+from src.store import PriceStore
+from src.adjustments import AdjustmentStore
+
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume',
+                 'dividends', 'stock splits']
+PRICE_DTYPES = {
+    'open': np.float64, 'high': np.float64, 'low': np.float64,
+    'close': np.float64, 'volume': np.float64,
+    'dividends': np.float64, 'stock splits': np.float64
+}
+
+
+def symbol_from_path(path: Path) -> str:
+    """由文件名取得股票代碼，移除 .TW / .TWO 後綴"""
+    return re.sub(r'\.(TW|TWO)$', '', Path(path).stem, flags=re.IGNORECASE)
+
+
+def read_price_csv(path: Path, date_format: str = '%Y-%m-%d',
+                   timezone: str = 'Asia/Taipei') -> pd.DataFrame:
+    """
+    以固定的欄位型別與日期格式讀取價格 CSV
+
+    同時支援歷史存檔 (Date, Open, High...) 與 Collector 緩存
+    (Date, open, high...) 兩種格式。日期只解析前 10 個字元，
+    避免逐筆解析帶時區偏移的字符串。
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    names = {col: col.strip().lower() for col in header}
+    date_column = header[0]
+    usecols = [date_column] + [col for col in header[1:]
+                               if names[col] in PRICE_DTYPES]
+    dtype = {col: PRICE_DTYPES[names[col]] for col in usecols[1:]}
+
+    df = pd.read_csv(path, usecols=usecols, dtype=dtype, engine='c',
+                     float_precision='round_trip')
+    df = df.rename(columns=names)
+
+    dates = pd.to_datetime(df.pop(names[date_column]).str.slice(0, 10),
+                           format=date_format)
+    df.index = pd.DatetimeIndex(dates).tz_localize(timezone)
+    df.index.name = 'Date'
+
+    for col in PRICE_COLUMNS:
+        if col not in df.columns:
+            df[col] = 0.0
+    return df[PRICE_COLUMNS]
+
+
+def validate_prices(df: pd.DataFrame, required_columns: List[str],
+                    min_periods: int,
+                    max_missing_pct: float) -> Tuple[bool, str]:
+    """依 validation 配置批量驗證數據"""
+    if len(df) < min_periods:
+        return False, f"數據筆數 {len(df)} 少於 {min_periods}"
+
+    values = df[required_columns].to_numpy(dtype=float)
+    missing_pct = np.isnan(values).any(axis=1).mean()
+    if missing_pct > max_missing_pct:
+        return False, f"缺失比例 {missing_pct:.1%} 超過 {max_missing_pct:.1%}"
+
+    if df.index.has_duplicates:
+        return False, "日期重複"
+    return True, ''
+
+
+def _import_file(path: str, data_dir: str, settings: Dict) -> Dict:
+    """讀取、驗證並寫入單一文件 (在工作進程中執行)"""
+    symbol = symbol_from_path(Path(path))
+    try:
+        df = read_price_csv(Path(path), settings['date_format'],
+                            settings['timezone'])
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+
+        ok, reason = validate_prices(df, settings['required_columns'],
+                                     settings['min_periods'],
+                                     settings['max_missing_pct'])
+        if not ok:
+            return {'symbol': symbol, 'path': path, 'status': 'rejected',
+                    'rows': len(df), 'reason': reason}
+
+        df = df.dropna(subset=settings['required_columns'])
+        df['volume'] = df['volume'].astype(np.int64)
+
+        # 與價格存儲中已有的數據合併，重疊日期以已存儲的為準；
+        # 原始價格不與沒有因子表的舊版還原價格合併
+        store = PriceStore(data_dir)
+        adjustments = AdjustmentStore(store)
+        existing = store.load(symbol)
+        if settings['raw_prices'] and adjustments.load(symbol) is None:
+            existing = None
+        if existing is not None:
+            existing = existing.reindex(columns=PRICE_COLUMNS, fill_value=0.0)
+            if existing.index.tz is None:
+                existing.index = existing.index.tz_localize(df.index.tz)
+            else:
+                existing.index = existing.index.tz_convert(df.index.tz)
+            df = pd.concat([df, existing])
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+
+        if not store.save(symbol, df):
+            return {'symbol': symbol, 'path': path, 'status': 'failed',
+                    'rows': len(df), 'reason': '寫入失敗'}
+        if settings['raw_prices']:
+            # 未還原價格由其中的除權息事件建立調整因子
+            adjustments.update(symbol, df)
+        else:
+            # 存檔與舊版緩存已是還原價格，不建立因子表以免重複還原；
+            # 視為舊版數據，Collector 會重新下載原始價格
+            adjustments.discard(symbol)
+        return {'symbol': symbol, 'path': path, 'status': 'imported',
+                'rows': len(df), 'reason': ''}
+
+    except Exception as e:
+        return {'symbol': symbol, 'path': path, 'status': 'failed',
+                'rows': 0, 'reason': str(e)}
+
+
+def find_csv_files(paths: Iterable[str]) -> List[Path]:
+    """展開文件與目錄參數為 CSV 文件清單"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.glob('*.csv')))
+        elif path.suffix.lower() == '.csv':
+            files.append(path)
+    return files
+
+
+class BulkImporter:
+    def __init__(self, data_dir: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 raw_prices: Optional[bool] = None):
+        """
+        初始化歷史 CSV 批量匯入器
+
+        raw_prices 表示 CSV 為未還原的原始價格 (默認依
+        import.raw_prices)，只有原始價格會建立調整因子表
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.importer')
+
+        import_config = self.config['import']
+        self.data_dir = str(data_dir or self.config['base']['data_dir'])
+        self.workers = workers or import_config['workers']
+        self.settings = {
+            'date_format': import_config['date_format'],
+            'timezone': import_config['timezone'],
+            'raw_prices': import_config.get('raw_prices', False)
+            if raw_prices is None else raw_prices,
+            'required_columns':
+                self.config['data_processing']['required_columns'],
+            'min_periods': self.config['validation']['min_periods'],
+            'max_missing_pct': self.config['validation']['max_missing_pct']
+        }
+
+    def _worker_logging(self) -> Dict:
+        """
+        多進程日誌模式下，工作進程的記錄 (例如存儲寫入失敗) 經隊列交由
+        主進程的監聽線程寫出；線程隊列無法傳給子進程，此時不設定
+        """
+        log_config = self.config['logging']
+        log_queue = get_log_queue()
+        if not log_config.get('multiprocess', False) or log_queue is None:
+            return {}
+        level = log_config['loggers'].get('stock_analysis', {})\
+            .get('level', 'INFO')
+        return {'initializer': setup_worker_logging,
+                'initargs': (log_queue, 'stock_analysis',
+                             logging.getLevelName(level))}
+
+    def import_paths(self, paths: Iterable[str]) -> Dict:
+        """並行匯入文件或目錄中的所有 CSV，返回匯入統計"""
+        files = find_csv_files(paths)
+        self.logger.info("開始匯入 %s 個文件，%s 個進程", len(files),
+                         self.workers)
+
+        results = []
+        if self.workers > 1 and len(files) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     **self._worker_logging()) as executor:
+                results = list(executor.map(
+                    _import_file, map(str, files),
+                    [self.data_dir] * len(files),
+                    [self.settings] * len(files),
+                    chunksize=max(len(files) // (self.workers * 4), 1)
+                ))
+        else:
+            results = [_import_file(str(f), self.data_dir, self.settings)
+                       for f in files]
+
+        summary = {'imported': [], 'rejected': [], 'failed': []}
+        for result in results:
+            summary[result['status']].append(result)
+            if result['status'] != 'imported':
+                self.logger.warning("匯入 %s 未完成 (%s): %s", result['path'],
+                                    result['status'], result['reason'])
+
+        self.logger.info(
+            "匯入完成: 成功 %s, 驗證未通過 %s, 失敗 %s",
+            len(summary['imported']), len(summary['rejected']),
+            len(summary['failed'])
+        )
+        return summary
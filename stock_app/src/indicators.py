@@ -0,0 +1,306 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from src.utils.profiler import span
+
+
+class Node:
+    """計算圖中的一個中間結果，以 key 去重"""
+
+    def __init__(self, key: Tuple, inputs: Tuple['Node', ...],
+                 func: Callable, warmup: int = 0):
+        self.key = key
+        self.inputs = inputs
+        self.func = func
+        # 開頭因窗口未滿而為 NaN 的行數
+        self.warmup = warmup
+
+
+class PlanBuilder:
+    """建立共享中間結果的計算圖，相同 key 的節點只建立一次"""
+
+    def __init__(self, n_rows: int):
+        self.n_rows = n_rows
+        self.nodes = {}
+
+    def _node(self, key: Tuple, inputs: Tuple[Node, ...],
+              func: Callable, lookback: int = 0,
+              fills: bool = False) -> Node:
+        """lookback 為節點本身增加的暖身行數，fills 表示輸出不含 NaN"""
+        if key not in self.nodes:
+            warmup = 0 if fills else lookback + max(
+                (node.warmup for node in inputs), default=0)
+            self.nodes[key] = Node(key, inputs, func, warmup)
+        return self.nodes[key]
+
+    def column(self, name: str) -> Node:
+        return self._node(('column', name), (),
+                          lambda df, name=name: df[name])
+
+    def shift(self, src: Node, periods: int = 1) -> Node:
+        return self._node(('shift', src.key, periods), (src,),
+                          lambda s: s.shift(periods), lookback=periods)
+
+    def delta(self, src: Node) -> Node:
+        return self._node(('delta', src.key), (src,), lambda s: s.diff(),
+                          lookback=1)
+
+    def gain(self, delta: Node) -> Node:
+        return self._node(('gain', delta.key), (delta,),
+                          lambda d: d.where(d > 0, 0), fills=True)
+
+    def loss(self, delta: Node) -> Node:
+        return self._node(('loss', delta.key), (delta,),
+                          lambda d: -d.where(d < 0, 0), fills=True)
+
+    def rolling_mean(self, src: Node, window: int) -> Node:
+        return self._node(('rolling_mean', src.key, window), (src,),
+                          lambda s: s.rolling(window=window).mean(),
+                          lookback=window - 1)
+
+    def rolling_std(self, src: Node, window: int) -> Node:
+        return self._node(('rolling_std', src.key, window), (src,),
+                          lambda s: s.rolling(window=window).std(),
+                          lookback=window - 1)
+
+    def rolling_min(self, src: Node, window: int) -> Node:
+        return self._node(('rolling_min', src.key, window), (src,),
+                          lambda s: s.rolling(window=window).min(),
+                          lookback=window - 1)
+
+    def rolling_max(self, src: Node, window: int) -> Node:
+        return self._node(('rolling_max', src.key, window), (src,),
+                          lambda s: s.rolling(window=window).max(),
+                          lookback=window - 1)
+
+    def ewm(self, src: Node, span: int) -> Node:
+        return self._node(('ewm', src.key, span), (src,),
+                          lambda s: s.ewm(span=span, adjust=False).mean())
+
+    def true_range(self) -> Node:
+        high, low = self.column('high'), self.column('low')
+        prev_close = self.shift(self.column('close'))
+
+        def compute(h, l, pc):
+            return pd.concat([h - l, (h - pc).abs(), (l - pc).abs()],
+                             axis=1).max(axis=1)
+        # 第一行沒有前收盤價時以高低價差為真實波幅
+        return self._node(('true_range',), (high, low, prev_close), compute,
+                          fills=True)
+
+    def combine(self, key: Tuple, inputs: Iterable[Node],
+                func: Callable, fills: bool = False) -> Node:
+        """以自訂函數組合多個節點，fills 表示函數輸出不含 NaN"""
+        inputs = tuple(inputs)
+        return self._node((key,) + tuple(n.key for n in inputs),
+                          inputs, func, fills=fills)
+
+
+# 指標註冊表: 名稱 -> (配置路徑, 以 (參數, builder, 配置) 返回
+# {輸出列名: 節點} 的函數)
+INDICATORS = {}
+
+
+def indicator(name: str, section: Optional[Tuple[str, ...]] = None):
+    """
+    註冊技術指標，新增指標時應透過 builder 重用既有中間結果
+
+    Args:
+        name: 指標名稱
+        section: 參數所在的配置路徑，默認為 technical_indicators.<name>，
+            配置中不存在時不計算該指標
+    """
+    def decorator(func):
+        INDICATORS[name] = (section or ('technical_indicators', name), func)
+        return func
+    return decorator
+
+
+def _lookup(config: Dict, path: Tuple[str, ...]) -> Optional[Dict]:
+    for key in path:
+        if not isinstance(config, dict) or key not in config:
+            return None
+        config = config[key]
+    return config
+
+
+@indicator('ma')
+def _ma(params: Dict, builder: PlanBuilder, config: Dict) -> Dict[str, Node]:
+    close = builder.column('close')
+    return {
+        f'ma_{period}': builder.rolling_mean(close, period)
+        for period in params.values()
+        if isinstance(period, int) and period < builder.n_rows
+    }
+
+
+@indicator('macd')
+def _macd(params: Dict, builder: PlanBuilder,
+          config: Dict) -> Dict[str, Node]:
+    close = builder.column('close')
+    macd = builder.combine(
+        'sub', [builder.ewm(close, params['fast_period']),
+                builder.ewm(close, params['slow_period'])],
+        lambda fast, slow: fast - slow
+    )
+    return {'macd': macd,
+            'signal': builder.ewm(macd, params['signal_period'])}
+
+
+@indicator('rsi')
+def _rsi(params: Dict, builder: PlanBuilder, config: Dict) -> Dict[str, Node]:
+    delta = builder.delta(builder.column('close'))
+    gain = builder.rolling_mean(builder.gain(delta), params['period'])
+    loss = builder.rolling_mean(builder.loss(delta), params['period'])
+    return {'rsi': builder.combine(
+        'rsi', [gain, loss], lambda g, l: 100 - (100 / (1 + g / l)))}
+
+
+@indicator('bollinger_bands')
+def _bollinger(params: Dict, builder: PlanBuilder,
+               config: Dict) -> Dict[str, Node]:
+    close = builder.column('close')
+    period = int(params['period'])
+    multiplier = float(params['std_multiplier'])
+    middle = builder.rolling_mean(close, period)
+    std = builder.rolling_std(close, period)
+    return {
+        'bb_middle': middle,
+        'bb_upper': builder.combine(('bb_upper', multiplier), [middle, std],
+                                    lambda m, s: m + s * multiplier),
+        'bb_lower': builder.combine(('bb_lower', multiplier), [middle, std],
+                                    lambda m, s: m - s * multiplier)
+    }
+
+
+@indicator('atr')
+def _atr(params: Dict, builder: PlanBuilder, config: Dict) -> Dict[str, Node]:
+    return {'atr': builder.rolling_mean(builder.true_range(),
+                                        params['period'])}
+
+
+@indicator('volume')
+def _volume(params: Dict, builder: PlanBuilder,
+            config: Dict) -> Dict[str, Node]:
+    volume = builder.column('volume')
+    outputs = {
+        f'volume_ma_{period}': builder.rolling_mean(volume, period)
+        for period in params['periods'] if period < builder.n_rows
+    }
+    period = params['relative_period']
+    if period < builder.n_rows:
+        # 相對成交量 = 成交量 / 均量，均量為 0 (停牌) 時記為 0
+        outputs['relative_volume'] = builder.combine(
+            'relative_volume', [volume, builder.rolling_mean(volume, period)],
+            lambda v, m: (v / m).where(m != 0, 0.0))
+    return outputs
+
+
+@indicator('support_resistance',
+           section=('analysis', 'support_resistance'))
+def _support_resistance(params: Dict, builder: PlanBuilder,
+                        config: Dict) -> Dict[str, Node]:
+    window = params['window']
+    return {
+        'support': builder.rolling_min(builder.column('low'), window),
+        'resistance': builder.rolling_max(builder.column('high'), window)
+    }
+
+
+@indicator('trend', section=('technical_indicators', 'ma'))
+def _trend(params: Dict, builder: PlanBuilder,
+           config: Dict) -> Dict[str, Node]:
+    # 使用20日均線判斷趨勢
+    period = config['technical_indicators']['ma'].get('ma20', 20)
+    if not (isinstance(period, int) and period < builder.n_rows):
+        return {}
+    close = builder.column('close')
+    ma = builder.rolling_mean(close, period)
+
+    def compute(c, m):
+        return np.where(c > m, 1, np.where(c < m, -1, 0))
+    return {'trend': builder.combine('trend', [close, ma], compute,
+                                     fills=True)}
+
+
+class IndicatorPlan:
+    def __init__(self, steps: List[Tuple[str, Node]],
+                 outputs: Dict[str, Node], groups: Dict[str, str],
+                 warmup: int = 0):
+        """
+        已排序的計算步驟與輸出列
+
+        warmup 為配置中所有指標 (不限於 outputs) 的最長暖身行數，只計算
+        部分指標時據此去掉開頭的行，使保留的行與完整計算相同
+        """
+        self.steps = steps
+        self.outputs = outputs
+        self.groups = groups
+        self.warmup = warmup
+
+    def execute(self, df: pd.DataFrame) -> pd.DataFrame:
+        """執行計劃，將輸出列加到數據框"""
+        values = {}
+        for group, node in self.steps:
+            with span(f'process.{group}', rows=len(df)):
+                if node.key[0] == 'column':
+                    values[node.key] = node.func(df)
+                else:
+                    values[node.key] = node.func(
+                        *(values[n.key] for n in node.inputs))
+
+        for column, node in self.outputs.items():
+            df[column] = values[node.key]
+        return df
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+
+def compile_plan(config: Dict, n_rows: int,
+                 outputs: Optional[Iterable[str]] = None) -> IndicatorPlan:
+    """
+    將 technical_indicators 配置編譯為共享中間結果的計算計劃
+
+    Args:
+        config: 完整配置
+        n_rows: 數據行數，週期不小於行數的均線不計算
+        outputs: 需要的輸出列，None 表示配置中的所有指標
+
+    Returns:
+        IndicatorPlan: 拓撲排序後只包含所需節點的計劃
+    """
+    builder = PlanBuilder(n_rows)
+
+    candidates = {}
+    groups = {}
+    for name, (section, func) in INDICATORS.items():
+        params = _lookup(config, section)
+        if params is None:
+            continue
+        for column, node in func(params, builder, config).items():
+            candidates[column] = node
+            groups[column] = name
+
+    warmup = max((node.warmup for node in candidates.values()), default=0)
+    if outputs is not None:
+        wanted = set(outputs)
+        candidates = {column: node for column, node in candidates.items()
+                      if column in wanted}
+
+    # 深度優先拓撲排序，只保留輸出所依賴的節點
+    steps = []
+    visited = set()
+
+    def visit(node: Node, group: str) -> None:
+        if node.key in visited:
+            return
+        for dependency in node.inputs:
+            visit(dependency, group)
+        visited.add(node.key)
+        steps.append((group, node))
+
+    for column, node in candidates.items():
+        visit(node, groups[column])
+
+    return IndicatorPlan(steps, candidates, groups, warmup)
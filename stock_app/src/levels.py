@@ -0,0 +1,159 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from src.utils.config_loader import ConfigLoader
+
+
+def swing_points(df: pd.DataFrame, order: int) -> Tuple[np.ndarray,
+                                                         np.ndarray]:
+    """
+    找出擺動高點與低點
+
+    最高價等於前後各 order 根 K 線內的最高價為擺動高點，低點同理；
+    以置中的滾動極值一次判斷所有 K 線，頭尾不足 order 根的不判斷。
+    相鄰 K 線的極值相同 (平頂/平底) 時只保留第一根。
+    """
+    span = 2 * order + 1
+    high, low = df['high'], df['low']
+    high_peak = high.rolling(window=span, center=True).max()
+    low_trough = low.rolling(window=span, center=True).min()
+    return ((high == high_peak) & (high != high.shift(1))).to_numpy(), \
+        ((low == low_trough) & (low != low.shift(1))).to_numpy()
+
+
+def cluster_levels(prices: np.ndarray, positions: np.ndarray,
+                   tolerance: float) -> pd.DataFrame:
+    """
+    將擺動點價格聚合為價位，O(n log n)
+
+    價格排序後由最低價開始，每個價位涵蓋起點價格上方 tolerance (相對
+    價格) 內的擺動點，下一個價位的起點以二分搜尋定位，避免價格連續
+    分佈時相鄰合併成過寬的價位。
+
+    Returns:
+        pd.DataFrame: level (平均價), touches (觸及次數),
+        first / last (首次與最近一次觸及的位置)
+    """
+    if len(prices) == 0:
+        return pd.DataFrame({'level': np.empty(0),
+                             'touches': np.empty(0, dtype=int),
+                             'first': np.empty(0, dtype=int),
+                             'last': np.empty(0, dtype=int)})
+
+    order = np.argsort(prices, kind='mergesort')
+    sorted_prices = prices[order]
+    sorted_positions = positions[order]
+
+    starts = [0]
+    while True:
+        upper = sorted_prices[starts[-1]] * (1 + tolerance)
+        following = np.searchsorted(sorted_prices, upper, side='right')
+        if following >= len(sorted_prices):
+            break
+        starts.append(following)
+    starts = np.array(starts)
+    touches = np.diff(np.append(starts, len(sorted_prices)))
+
+    return pd.DataFrame({
+        'level': np.add.reduceat(sorted_prices, starts) / touches,
+        'touches': touches,
+        'first': np.minimum.reduceat(sorted_positions, starts),
+        'last': np.maximum.reduceat(sorted_positions, starts)
+    })
+
+
+class LevelDetector:
+    def __init__(self):
+        """初始化多次觸及的支撐阻力價位偵測"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.levels')
+
+        params = self.config['analysis']['support_resistance']
+        self.order = params['swing_order']
+        self.tolerance = params['tolerance']
+        self.min_touches = params['min_touches']
+        self.top_n = params['top_n']
+
+    def detect(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        偵測全部歷史中觸及至少 min_touches 次的價位
+
+        Returns:
+            pd.DataFrame: level, touches, first_date, last_date,
+            bars_since (距最近一次觸及的 K 線數), kind (相對最新收盤價
+            為 support 或 resistance)，依觸及次數與近期程度排序
+        """
+        highs, lows = swing_points(df, self.order)
+        positions = np.arange(len(df))
+        prices = np.concatenate([df['high'].to_numpy()[highs],
+                                 df['low'].to_numpy()[lows]])
+        levels = cluster_levels(
+            prices, np.concatenate([positions[highs], positions[lows]]),
+            self.tolerance)
+        levels = levels[levels['touches'] >= self.min_touches]
+
+        close = df['close'].iloc[-1]
+        levels = levels.assign(
+            first_date=df.index[levels['first'].to_numpy(dtype=int)],
+            last_date=df.index[levels['last'].to_numpy(dtype=int)],
+            bars_since=len(df) - 1 - levels['last'].astype(int),
+            kind=np.where(levels['level'] <= close, 'support', 'resistance')
+        ).drop(columns=['first', 'last'])
+        return levels.sort_values(['touches', 'bars_since'],
+                                  ascending=[False, True],
+                                  ignore_index=True)
+
+    def summarize(self, df: pd.DataFrame,
+                  levels: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        取得全部歷史最強的價位，與最新 K 線上下最近的支撐阻力
+
+        Returns:
+            Dict: history / support / resistance 三個價位列表
+        """
+        if levels is None:
+            levels = self.detect(df)
+        close = df['close'].iloc[-1]
+
+        support = levels[levels['kind'] == 'support']
+        resistance = levels[levels['kind'] == 'resistance']
+        return {
+            'history': self._records(levels.head(self.top_n)),
+            'support': self._records(support.assign(
+                distance=close - support['level']
+            ).nsmallest(self.top_n, 'distance')),
+            'resistance': self._records(resistance.assign(
+                distance=resistance['level'] - close
+            ).nsmallest(self.top_n, 'distance'))
+        }
+
+    @staticmethod
+    def _records(levels: pd.DataFrame) -> List[Dict]:
+        return levels.drop(columns=['distance'], errors='ignore')\
+            .to_dict('records')
+
+    def scan(self, frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        對整個股票池偵測價位
+
+        Returns:
+            pd.DataFrame: 每列為一個股票的一個價位，scope 為 history
+            (全部歷史) 或 latest (最新 K 線的最近支撐阻力)
+        """
+        rows = []
+        for symbol, df in frames.items():
+            try:
+                summary = self.summarize(df)
+                for record in summary['history']:
+                    rows.append({'symbol': symbol, 'scope': 'history',
+                                 **record})
+                for record in summary['support'] + summary['resistance']:
+                    rows.append({'symbol': symbol, 'scope': 'latest',
+                                 **record})
+            except Exception as e:
+                self.logger.error("偵測 %s 的價位失敗: %s", symbol, e)
+
+        self.logger.info("價位偵測完成: %s 支股票, %s 個價位",
+                         len(frames), len(rows))
+        return pd.DataFrame(rows)
@@ -0,0 +1,85 @@
+import pandas as pd
+import numpy as np
+from typing import Tuple
+
+
+def to_returns(prices: pd.Series) -> pd.Series:
+    """將價格序列轉換為以日期為索引的日報酬率"""
+    index = pd.to_datetime(prices.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    series = pd.Series(prices.values, index=index.normalize())
+    series = series[~series.index.duplicated(keep='last')].sort_index()
+    return series.pct_change()
+
+
+def align_returns(returns: pd.DataFrame, benchmark: pd.Series) \
+        -> Tuple[pd.DataFrame, pd.Series]:
+    """將個股報酬率面板與基準報酬率對齊到同一日期索引"""
+    index = returns.index.intersection(benchmark.index)
+    return returns.loc[index], benchmark.loc[index]
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """以累積和計算每個時點往回 window 筆的總和"""
+    cumsum = np.cumsum(values, axis=0)
+    sums = cumsum.copy()
+    sums[window:] = cumsum[window:] - cumsum[:-window]
+    return sums
+
+
+def rolling_beta(returns: pd.DataFrame, benchmark: pd.Series,
+                 window: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    一次計算所有股票的滾動貝塔係數與相關係數
+
+    Args:
+        returns: 個股日報酬率面板 (日期 x 股票)
+        benchmark: 基準指數日報酬率
+        window: 滾動窗口天數
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: 貝塔係數面板與相關係數面板
+    """
+    returns, benchmark = align_returns(returns, benchmark)
+    x = returns.to_numpy(dtype=float)
+    m = np.broadcast_to(benchmark.to_numpy(dtype=float)[:, None], x.shape)
+
+    # 只使用個股與基準同時有值的樣本
+    valid = ~np.isnan(x) & ~np.isnan(m)
+    x = np.where(valid, x, 0.0)
+    m = np.where(valid, m, 0.0)
+
+    n = _window_sums(valid.astype(float), window)
+    sx = _window_sums(x, window)
+    sm = _window_sums(m, window)
+    sxm = _window_sums(x * m, window)
+    sxx = _window_sums(x * x, window)
+    smm = _window_sums(m * m, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (sxm - sx * sm / n) / (n - 1)
+        var_x = (sxx - sx * sx / n) / (n - 1)
+        var_m = (smm - sm * sm / n) / (n - 1)
+        beta = cov / var_m
+        corr = cov / np.sqrt(var_x * var_m)
+
+    # 窗口內有效樣本不足時不輸出
+    incomplete = n < window
+    beta[incomplete] = np.nan
+    corr[incomplete] = np.nan
+
+    return (pd.DataFrame(beta, index=returns.index, columns=returns.columns),
+            pd.DataFrame(corr, index=returns.index, columns=returns.columns))
+
+
+def beta_and_correlation(returns: pd.Series,
+                         benchmark: pd.Series) -> Tuple[float, float]:
+    """計算全期間的貝塔係數與相關係數"""
+    aligned = pd.concat([returns, benchmark], axis=1, join='inner').dropna()
+    if len(aligned) < 2:
+        return np.nan, np.nan
+
+    beta, corr = rolling_beta(aligned.iloc[:, [0]], aligned.iloc[:, 1],
+                              len(aligned))
+    return float(beta.iloc[-1, 0]), float(corr.iloc[-1, 0])
@@ -0,0 +1,176 @@
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from src.utils.config_loader import ConfigLoader
+
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[[Any], Any],
+                 workers: int = 1, queue_size: int = 8):
+        """
+        管線中的一個階段
+
+        Args:
+            name: 階段名稱
+            func: 處理一個項目，返回下一階段的輸入；返回 None 或拋出
+                異常時該項目失敗，不再往下傳遞
+            workers: 執行緒數量
+            queue_size: 輸入隊列長度，滿時上一階段等待 (背壓)
+        """
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.queue_size = queue_size
+
+        self.lock = threading.Lock()
+        self.items = 0
+        self.failed = 0
+        self.busy = 0.0       # 處理項目的總時間
+        self.blocked = 0.0    # 等待下一階段隊列空位的總時間
+        self.max_depth = 0
+        self.active = workers
+
+    def put(self, item: Any) -> None:
+        """放入輸入隊列，隊列滿時等待；結束標記之前記錄隊列深度"""
+        self.inbox.put(item)
+        depth = self.inbox.qsize()
+        with self.lock:
+            self.max_depth = max(self.max_depth, depth)
+
+
+class StagedPipeline:
+    def __init__(self, stages: List[Stage]):
+        """
+        以有界隊列串接的多階段生產者/消費者管線
+
+        各階段有自己的執行緒，下載、計算與寫入可以同時進行；隊列滿時
+        上游等待，記憶體中最多只有各隊列長度與執行緒數之和的項目。
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.pipeline')
+        self.stages = stages
+        self.failures: Dict[str, str] = {}
+        self._failures_lock = threading.Lock()
+
+    def _fail(self, key: str, stage: Stage, reason: str) -> None:
+        with self._failures_lock:
+            self.failures[key] = f"{stage.name}: {reason}"
+
+    def _worker(self, index: int, key_func: Callable[[Any], str]) -> None:
+        stage = self.stages[index]
+        following = self.stages[index + 1] \
+            if index + 1 < len(self.stages) else None
+
+        while True:
+            item = stage.inbox.get()
+            if item is _DONE:
+                break
+
+            key = key_func(item)
+            started = time.perf_counter()
+            try:
+                result = stage.func(item)
+                error = None if result is not None else "返回失敗"
+            except Exception as e:
+                result, error = None, str(e)
+            elapsed = time.perf_counter() - started
+
+            with stage.lock:
+                stage.items += 1
+                stage.busy += elapsed
+                if error:
+                    stage.failed += 1
+            if error:
+                self._fail(key, stage, error)
+                continue
+
+            if following is not None:
+                waited = time.perf_counter()
+                following.put(result)
+                with stage.lock:
+                    stage.blocked += time.perf_counter() - waited
+
+        # 最後一個結束的執行緒通知下一階段結束
+        with stage.lock:
+            stage.active -= 1
+            last = stage.active == 0
+        if last and following is not None:
+            for _ in range(following.workers):
+                following.inbox.put(_DONE)
+
+    def run(self, items: Iterable[Any],
+            key_func: Callable[[Any], str] = str) -> Dict:
+        """
+        執行管線直到所有項目通過或失敗
+
+        Returns:
+            Dict: done / failed 項目、總耗時與各階段的處理數、使用率
+            (處理時間 / 執行緒數 x 總耗時)、背壓等待時間與最大隊列深度
+        """
+        items = list(items)
+        started = time.perf_counter()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(index, key_func),
+                    name=f"pipeline-{stage.name}-{n}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        first = self.stages[0]
+        for item in items:
+            first.put(item)
+        for _ in range(first.workers):
+            first.inbox.put(_DONE)
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - started
+        failed = sorted(self.failures)
+        summary = {
+            'done': [key_func(item) for item in items
+                     if key_func(item) not in self.failures],
+            'failed': failed,
+            'elapsed': elapsed,
+            'stages': {
+                stage.name: {
+                    'workers': stage.workers,
+                    'queue_size': stage.queue_size,
+                    'items': stage.items,
+                    'failed': stage.failed,
+                    'busy': stage.busy,
+                    'utilization': stage.busy / (stage.workers * elapsed)
+                    if elapsed > 0 else 0.0,
+                    'blocked': stage.blocked,
+                    'max_depth': stage.max_depth
+                }
+                for stage in self.stages
+            }
+        }
+        for name, stats in summary['stages'].items():
+            self.logger.info(
+                "階段 %s: %s 項 (失敗 %s), %s 執行緒, 使用率 %.0f%%, "
+                "背壓等待 %.2f 秒, 最大隊列 %s/%s",
+                name, stats['items'], stats['failed'], stats['workers'],
+                stats['utilization'] * 100, stats['blocked'],
+                stats['max_depth'], stats['queue_size'])
+        for key in failed:
+            self.logger.error("%s 失敗於 %s", key, self.failures[key])
+        return summary
+
+    @classmethod
+    def from_config(cls, funcs: Dict[str, Callable[[Any], Any]],
+                    config: Optional[Dict] = None) -> 'StagedPipeline':
+        """依 pipeline.stages 配置的順序、執行緒數與隊列長度建立管線"""
+        config = config or ConfigLoader().get_config()
+        stages = [Stage(name, funcs[name], params['workers'],
+                        params['queue_size'])
+                  for name, params in config['pipeline']['stages'].items()]
+        return cls(stages)
@@ -0,0 +1,207 @@
+import logging
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Dict, Optional, Tuple
+from src.utils.config_loader import ConfigLoader
+from src.market import to_returns
+
+
+def load_weights(path: str) -> Dict[str, float]:
+    """讀取持倉權重文件，每行 代碼,權重，# 之後為註解"""
+    weights = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            symbol, weight = [part.strip() for part in line.split(',', 1)]
+            weights[symbol] = weights.get(symbol, 0.0) + float(weight)
+    return weights
+
+
+def returns_panel(prices: Dict[str, pd.Series]) -> pd.DataFrame:
+    """將多支股票的收盤價轉為共同交易日的日報酬率面板"""
+    panel = pd.concat({symbol: to_returns(series)
+                       for symbol, series in prices.items()}, axis=1)
+    return panel.dropna(how='any')
+
+
+def cholesky_factor(cov: np.ndarray) -> np.ndarray:
+    """共變異數矩陣的下三角分解，非正定時將特徵值截斷為非負"""
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        values, vectors = np.linalg.eigh(cov)
+        values = np.clip(values, 0, None)
+        # 以 QR 分解將 V * sqrt(D) 轉為下三角形式
+        _, r = np.linalg.qr((vectors * np.sqrt(values)).T)
+        return r.T * np.sign(np.diag(r))
+
+
+def parametric_var(weights: np.ndarray, mean: np.ndarray, cov: np.ndarray,
+                   confidence: float) -> Dict[str, float]:
+    """
+    常態假設下的 VaR、CVaR 與各持倉的邊際、成分風險
+
+    損失以正數表示，成分 VaR 加總等於組合 VaR。
+    """
+    z = NormalDist().inv_cdf(confidence)
+    sigma_w = cov @ weights
+    sigma = float(np.sqrt(weights @ sigma_w))
+    mu = float(weights @ mean)
+
+    marginal = sigma_w / sigma if sigma > 0 else np.zeros_like(weights)
+    tail = NormalDist().pdf(z) / (1 - confidence)
+    return {
+        'volatility': sigma,
+        'var': z * sigma - mu,
+        'cvar': tail * sigma - mu,
+        'marginal_volatility': marginal,
+        'component_volatility': weights * marginal,
+        'component_var': weights * (z * marginal - mean)
+    }
+
+
+def historical_var(portfolio_returns: np.ndarray,
+                   confidence: float) -> Tuple[float, float]:
+    """以歷史報酬率分佈計算 VaR 與 CVaR"""
+    threshold = np.quantile(portfolio_returns, 1 - confidence)
+    tail = portfolio_returns[portfolio_returns <= threshold]
+    return -float(threshold), -float(tail.mean())
+
+
+def monte_carlo_var(weights: np.ndarray, mean: np.ndarray, cov: np.ndarray,
+                    confidence: float, n_paths: int, chunk_size: int,
+                    seed: int = 0) -> Dict:
+    """
+    以多元常態情境分批模擬計算 VaR、CVaR 與成分 CVaR
+
+    每批只生成 chunk_size x 股票數 的情境矩陣，全程只保留組合報酬率
+    (n_paths 個浮點數)。各批依序從同一個隨機數生成器抽取，情境與
+    chunk_size 無關；第二輪以相同種子依序重建各批情境，累計尾部情境中
+    各持倉的損失以得到成分 CVaR。
+    """
+    factor = cholesky_factor(cov)
+    n_assets = len(weights)
+    sizes = [min(chunk_size, n_paths - start)
+             for start in range(0, n_paths, chunk_size)]
+
+    def scenarios(rng: np.random.Generator, size: int) -> np.ndarray:
+        shocks = rng.standard_normal((size, n_assets))
+        return mean + shocks @ factor.T
+
+    rng = np.random.default_rng(seed)
+    portfolio = np.empty(n_paths)
+    start = 0
+    for size in sizes:
+        portfolio[start:start + size] = scenarios(rng, size) @ weights
+        start += size
+
+    threshold = np.quantile(portfolio, 1 - confidence)
+    in_tail = portfolio <= threshold
+    tail_count = int(in_tail.sum())
+
+    tail_losses = np.zeros(n_assets)
+    rng = np.random.default_rng(seed)
+    start = 0
+    for size in sizes:
+        mask = in_tail[start:start + size]
+        # 沒有尾部情境的批次也要抽取，後續批次才能重建相同情境
+        batch = scenarios(rng, size)
+        if mask.any():
+            tail_losses -= (batch[mask] * weights).sum(axis=0)
+        start += size
+
+    return {
+        'var': -float(threshold),
+        'cvar': -float(portfolio[in_tail].mean()),
+        'component_cvar': tail_losses / tail_count,
+        'paths': n_paths
+    }
+
+
+class PortfolioRisk:
+    def __init__(self):
+        """初始化組合風險引擎"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.portfolio')
+        self.risk_config = self.config['analysis']['risk']
+
+    def analyze(self, prices: Dict[str, pd.Series],
+                weights: Dict[str, float],
+                n_paths: Optional[int] = None) -> Optional[Dict]:
+        """
+        計算組合的參數法、歷史法與蒙地卡羅 VaR/CVaR 及各持倉風險貢獻
+
+        Args:
+            prices: 代碼 -> 收盤價序列
+            weights: 代碼 -> 持倉權重 (自動正規化為總和 1)
+            n_paths: 蒙地卡羅路徑數，默認使用配置
+
+        Returns:
+            Optional[Dict]: 組合層級指標與 holdings 持倉明細
+        """
+        try:
+            symbols = [s for s in weights if s in prices]
+            missing = [s for s in weights if s not in prices]
+            if missing:
+                self.logger.warning("缺少價格數據，不計入組合: %s", missing)
+            if not symbols:
+                self.logger.error("組合中沒有可用的股票")
+                return None
+
+            panel = returns_panel({s: prices[s] for s in symbols})
+            if len(panel) < self.config['validation']['min_periods']:
+                self.logger.error("共同交易日不足: %s", len(panel))
+                return None
+
+            w = np.array([weights[s] for s in symbols], dtype=float)
+            w = w / w.sum()
+
+            # 依持有天數以平方根法則放大
+            horizon = self.risk_config['horizon_days']
+            confidence = self.risk_config['var_confidence']
+            values = panel.to_numpy()
+            mean = values.mean(axis=0) * horizon
+            cov = np.cov(values, rowvar=False).reshape(
+                len(symbols), len(symbols)) * horizon
+
+            parametric = parametric_var(w, mean, cov, confidence)
+            hist_var, hist_cvar = historical_var(
+                values @ w * np.sqrt(horizon), confidence)
+            monte_carlo = monte_carlo_var(
+                w, mean, cov, confidence,
+                n_paths or self.risk_config['mc_paths'],
+                self.risk_config['mc_chunk_size'],
+                self.risk_config['seed']
+            )
+
+            holdings = pd.DataFrame({
+                'weight': w,
+                'marginal_volatility': parametric['marginal_volatility'],
+                'component_volatility': parametric['component_volatility'],
+                'component_var': parametric['component_var'],
+                'component_cvar_mc': monte_carlo['component_cvar']
+            }, index=symbols)
+            holdings['pct_contribution'] = \
+                holdings['component_volatility'] / parametric['volatility']
+
+            return {
+                'confidence': confidence,
+                'horizon_days': horizon,
+                'observations': len(panel),
+                'volatility': parametric['volatility'],
+                'parametric_var': parametric['var'],
+                'parametric_cvar': parametric['cvar'],
+                'historical_var': hist_var,
+                'historical_cvar': hist_cvar,
+                'monte_carlo_var': monte_carlo['var'],
+                'monte_carlo_cvar': monte_carlo['cvar'],
+                'monte_carlo_paths': monte_carlo['paths'],
+                'holdings': holdings
+            }
+
+        except Exception as e:
+            self.logger.error("組合風險計算失敗: %s", e)
+            return None
@@ -0,0 +1,116 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from src.utils.config_loader import ConfigLoader
+
+
+HORIZONS = ('short_term', 'medium_term', 'long_term')
+
+# 各期間的百分位排名以 1-100 存為 uint8，綜合分數以 1-10000 存為
+# uint16，0 表示當天沒有排名
+RANK_DTYPE = np.uint8
+RANK_SCALE = 100
+SCORE_DTYPE = np.uint16
+SCORE_SCALE = 10000
+
+
+def close_panel(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """將多支股票的收盤價合併為 日期 x 股票 面板 (以交易日對齊)"""
+    series = {}
+    for symbol, df in frames.items():
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        series[symbol] = df['close'].set_axis(index.normalize())
+    return pd.concat(series, axis=1).sort_index()
+
+
+def horizon_returns(close: pd.DataFrame,
+                    periods: Dict[str, int]) -> Dict[str, pd.DataFrame]:
+    """每支股票在每個日期的各期間報酬率，一次以面板運算"""
+    return {name: close / close.shift(period) - 1
+            for name, period in periods.items()}
+
+
+def percentile_ranks(values: pd.DataFrame) -> pd.DataFrame:
+    """每個日期的橫截面百分位排名 (0, 1]，數值越大排名越高"""
+    return values.rank(axis=1, pct=True, method='average')
+
+
+def quantize(ranks: pd.DataFrame, scale: int, dtype) -> pd.DataFrame:
+    """百分位排名轉為 1-scale 的整數，缺值為 0"""
+    scaled = np.ceil(ranks.to_numpy() * scale)
+    return pd.DataFrame(np.nan_to_num(scaled, nan=0).astype(dtype),
+                        index=ranks.index, columns=ranks.columns)
+
+
+def composite_score(ranks: Dict[str, pd.DataFrame],
+                    weights: Dict[str, float]) -> pd.DataFrame:
+    """
+    各期間百分位排名的加權平均再做一次橫截面排名
+
+    某期間沒有排名 (歷史不足) 時，以其餘期間的權重重新正規化。
+    """
+    total = None
+    weight_sum = None
+    for name, rank in ranks.items():
+        weight = weights.get(name, 0.0)
+        valid = rank.notna() * weight
+        weighted = rank.fillna(0.0) * weight
+        total = weighted if total is None else total + weighted
+        weight_sum = valid if weight_sum is None else weight_sum + valid
+    return percentile_ranks(total / weight_sum.where(weight_sum > 0))
+
+
+class RelativeStrength:
+    def __init__(self):
+        """初始化橫截面相對強度排名"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.ranking')
+        self.periods = {name: self.config['analysis']['trend'][name]
+                        for name in HORIZONS}
+        self.weights = self.config['ranking']['weights']
+
+    def rank(self, frames: Dict[str, pd.DataFrame],
+             since: Optional[str] = None) -> pd.DataFrame:
+        """
+        計算股票池每個日期的多期間報酬率排名與綜合相對強度
+
+        Args:
+            frames: 股票 -> 日 K 線
+            since: 只返回此日期之後的排名 (仍以完整歷史計算報酬率)
+
+        Returns:
+            pd.DataFrame: 以 (date, symbol) 為索引，HORIZONS 各期間的
+            uint8 百分位排名與 uint16 composite 綜合分數，只包含有綜合
+            分數的列
+        """
+        close = close_panel(frames)
+        returns = horizon_returns(close, self.periods)
+        ranks = {name: percentile_ranks(values)
+                 for name, values in returns.items()}
+        score = composite_score(ranks, self.weights)
+
+        if since is not None:
+            keep = close.index >= pd.Timestamp(since)
+            ranks = {name: rank[keep] for name, rank in ranks.items()}
+            score = score[keep]
+
+        columns = {name: quantize(rank, RANK_SCALE, RANK_DTYPE).stack()
+                   for name, rank in ranks.items()}
+        columns['composite'] = quantize(score, SCORE_SCALE,
+                                        SCORE_DTYPE).stack()
+        table = pd.DataFrame(columns)
+        table.index.names = ['date', 'symbol']
+        table = table[table['composite'] > 0]
+
+        self.logger.info("相對強度排名完成: %s 支股票, %s 個交易日",
+                         close.shape[1], close.shape[0])
+        return table
+
+    @staticmethod
+    def top(table: pd.DataFrame, date, n: int) -> pd.DataFrame:
+        """排名表中某日綜合分數最高的 n 支股票"""
+        day = table.xs(pd.Timestamp(date), level='date')
+        return day.nlargest(n, 'composite')
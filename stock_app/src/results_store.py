@@ -0,0 +1,329 @@
+import math
+import sqlite3
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.utils.config_loader import ConfigLoader
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_runs (
+    symbol TEXT NOT NULL,
+    analysis_date TEXT NOT NULL,
+    name TEXT,
+    trend TEXT,
+    run_at TEXT NOT NULL,
+    PRIMARY KEY (symbol, analysis_date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS analysis_metrics (
+    metric TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    analysis_date TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (metric, symbol, analysis_date)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_metrics_symbol_date
+    ON analysis_metrics (symbol, analysis_date);
+
+CREATE TABLE IF NOT EXISTS pattern_flags (
+    symbol TEXT NOT NULL,
+    bar_date TEXT NOT NULL,
+    flags INTEGER NOT NULL,
+    PRIMARY KEY (symbol, bar_date)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_pattern_flags_date
+    ON pattern_flags (bar_date);
+
+CREATE TABLE IF NOT EXISTS rs_ranks (
+    bar_date TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    short_term INTEGER NOT NULL,
+    medium_term INTEGER NOT NULL,
+    long_term INTEGER NOT NULL,
+    composite INTEGER NOT NULL,
+    PRIMARY KEY (bar_date, symbol)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_rs_ranks_top
+    ON rs_ranks (bar_date, composite DESC);
+"""
+
+
+def flatten_results(results: Dict, prefix: str = '') -> Dict[str, float]:
+    """將 Analyzer.analyze 的巢狀結果攤平成 {'section.key': 數值}"""
+    flat = {}
+    for key, value in (results or {}).items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten_results(value, name))
+        elif isinstance(value, (bool, np.bool_)):
+            flat[name] = float(value)
+        elif isinstance(value, (int, float, np.integer, np.floating)):
+            value = float(value)
+            flat[name] = None if math.isnan(value) else value
+    return flat
+
+
+def trend_direction(results: Dict, period: int) -> str:
+    """取出 period 日趨勢的方向 (up/down)，沒有趨勢分析時為 Unknown"""
+    trend = ((results or {}).get('trend_analysis') or {})\
+        .get(f'{period}d_trend')
+    return trend['direction'] if trend else 'Unknown'
+
+
+def results_frame(records: List[Dict]) -> pd.DataFrame:
+    """
+    將多筆分析結果轉為每支股票一列、每個數值指標一欄的表格
+
+    Args:
+        records: 包含 symbol、analysis_date 與 results 的記錄
+
+    Returns:
+        pd.DataFrame: 以 symbol 為索引，analysis_date 欄與依名稱排序的
+        float 指標欄 (同 flatten_results 的 'section.key')，缺值為 NaN
+    """
+    frame = pd.DataFrame.from_dict(
+        {record['symbol']: flatten_results(record['results'])
+         for record in records},
+        orient='index', dtype=float)
+    frame = frame.reindex(index=[record['symbol'] for record in records],
+                          columns=sorted(frame.columns))
+    frame.insert(0, 'analysis_date', pd.to_datetime(
+        [record['analysis_date'] for record in records]))
+    frame.index.name = 'symbol'
+    return frame
+
+
+class ResultStore:
+    def __init__(self, db_path: Optional[str] = None):
+        """初始化分析結果存儲"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.results')
+
+        if db_path is None:
+            output_dir = Path(self.config['base']['output_dir'])
+            output_dir.mkdir(exist_ok=True)
+            db_path = output_dir / self.config['storage']['results_db']
+        self.db_path = Path(db_path)
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """建立資料庫連線"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def write_many(self, records: List[Dict]) -> int:
+        """
+        在單一交易中批次寫入分析結果
+
+        Args:
+            records: 每筆包含 symbol, analysis_date, name, trend, results
+
+        Returns:
+            int: 寫入的指標數量
+        """
+        run_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        runs = []
+        metrics = []
+        for record in records:
+            symbol = str(record['symbol'])
+            analysis_date = pd.Timestamp(record['analysis_date'])\
+                .strftime("%Y-%m-%d")
+            runs.append((symbol, analysis_date, record.get('name'),
+                         record.get('trend'), run_at))
+            for metric, value in flatten_results(record['results']).items():
+                metrics.append((metric, symbol, analysis_date, value))
+
+        conn = self._connect()
+        try:
+            with conn:
+                # 同一股票同一分析日重跑時覆蓋舊結果
+                conn.executemany(
+                    "DELETE FROM analysis_metrics "
+                    "WHERE symbol = ? AND analysis_date = ?",
+                    [(run[0], run[1]) for run in runs]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_runs "
+                    "VALUES (?, ?, ?, ?, ?)", runs
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_metrics "
+                    "VALUES (?, ?, ?, ?)", metrics
+                )
+        finally:
+            conn.close()
+
+        self.logger.info("已寫入 %s 筆分析結果 (%s 個指標)",
+                         len(runs), len(metrics))
+        return len(metrics)
+
+    def write_pattern_flags(self, flags: pd.DataFrame) -> int:
+        """
+        批次寫入 K 線形態位元旗標
+
+        Args:
+            flags: 日期 x 股票 的旗標面板 (PatternScanner.scan_many)，
+                只保存有形態的 K 線
+
+        Returns:
+            int: 寫入的筆數
+        """
+        dates = pd.DatetimeIndex(flags.index).strftime("%Y-%m-%d")
+        rows = []
+        for symbol in flags.columns:
+            values = flags[symbol].to_numpy()
+            hits = values.nonzero()[0]
+            rows.extend((str(symbol), dates[i], int(values[i]))
+                        for i in hits)
+
+        conn = self._connect()
+        try:
+            with conn:
+                # 重新掃描的範圍以新結果覆蓋
+                conn.executemany(
+                    "DELETE FROM pattern_flags "
+                    "WHERE symbol = ? AND bar_date BETWEEN ? AND ?",
+                    [(str(symbol), dates[0], dates[-1])
+                     for symbol in flags.columns]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pattern_flags VALUES (?, ?, ?)",
+                    rows
+                )
+        finally:
+            conn.close()
+
+        self.logger.info("已寫入 %s 支股票的形態旗標 (%s 筆)",
+                         len(flags.columns), len(rows))
+        return len(rows)
+
+    def symbols_with_pattern(self, mask: int,
+                             since: str) -> pd.DataFrame:
+        """查詢 since 之後出現遮罩中任一形態的股票與日期"""
+        query = """
+            SELECT symbol, bar_date, flags FROM pattern_flags
+            WHERE bar_date >= ? AND (flags & ?) != 0
+            ORDER BY symbol, bar_date
+        """
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(query, conn, params=(since, int(mask)))
+        finally:
+            conn.close()
+
+    def write_ranks(self, table: pd.DataFrame) -> int:
+        """
+        批次寫入相對強度排名 (RelativeStrength.rank)，覆蓋相同日期的排名
+
+        Returns:
+            int: 寫入的筆數
+        """
+        if table.empty:
+            return 0
+        dates = pd.DatetimeIndex(table.index.get_level_values('date'))\
+            .strftime("%Y-%m-%d")
+        symbols = table.index.get_level_values('symbol').astype(str)
+        values = table[['short_term', 'medium_term', 'long_term',
+                        'composite']].to_numpy(dtype=np.int64).tolist()
+        rows = [(date, symbol, *ranks)
+                for date, symbol, ranks in zip(dates, symbols, values)]
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM rs_ranks "
+                             "WHERE bar_date BETWEEN ? AND ?",
+                             (dates.min(), dates.max()))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rs_ranks "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+        finally:
+            conn.close()
+
+        self.logger.info("已寫入 %s 筆相對強度排名", len(rows))
+        return len(rows)
+
+    def top_ranked(self, n: int, date: Optional[str] = None
+                   ) -> pd.DataFrame:
+        """
+        查詢某日綜合相對強度最高的 n 支股票，默認為最近的排名日
+
+        以 (bar_date, composite) 索引直接取前 n 筆，不需掃描整日排名。
+        """
+        conn = self._connect()
+        try:
+            if date is None:
+                date = conn.execute(
+                    "SELECT MAX(bar_date) FROM rs_ranks").fetchone()[0]
+            return pd.read_sql_query(
+                "SELECT bar_date, symbol, short_term, medium_term, "
+                "long_term, composite FROM rs_ranks WHERE bar_date = ? "
+                "ORDER BY composite DESC LIMIT ?", conn,
+                params=(date, int(n)))
+        finally:
+            conn.close()
+
+    def latest(self, metric: str) -> pd.DataFrame:
+        """查詢每支股票某指標的最新值"""
+        query = """
+            SELECT m.symbol, m.analysis_date, m.value
+            FROM analysis_metrics m
+            JOIN (
+                SELECT symbol, MAX(analysis_date) AS analysis_date
+                FROM analysis_metrics
+                WHERE metric = ?
+                GROUP BY symbol
+            ) latest
+              ON m.symbol = latest.symbol
+             AND m.analysis_date = latest.analysis_date
+            WHERE m.metric = ?
+            ORDER BY m.symbol
+        """
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(query, conn, params=(metric, metric))
+        finally:
+            conn.close()
+
+    def history(self, symbol: str, metrics: Optional[List[str]] = None,
+                start_date: Optional[str] = None,
+                end_date: Optional[str] = None) -> pd.DataFrame:
+        """查詢單支股票的指標時間序列 (分析日 x 指標)"""
+        query = ("SELECT analysis_date, metric, value FROM analysis_metrics "
+                 "WHERE symbol = ?")
+        params = [str(symbol)]
+        if metrics:
+            query += f" AND metric IN ({', '.join('?' * len(metrics))})"
+            params.extend(metrics)
+        if start_date:
+            query += " AND analysis_date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND analysis_date <= ?"
+            params.append(end_date)
+
+        conn = self._connect()
+        try:
+            df = pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()
+
+        if df.empty:
+            return pd.DataFrame()
+        table = df.pivot(index='analysis_date', columns='metric',
+                         values='value')
+        table.index = pd.to_datetime(table.index)
+        table.columns.name = None
+        return table.sort_index()
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple, Union
+from src.market import _window_sums
+
+
+Frame = Union[pd.Series, pd.DataFrame]
+
+TRADING_DAYS = 252
+
+
+def _as_frame(data: Frame) -> Tuple[pd.DataFrame, bool]:
+    """單一序列轉為單列面板，返回是否需要還原為序列"""
+    if isinstance(data, pd.Series):
+        return data.to_frame(data.name or 'value'), True
+    return data, False
+
+
+def _restore(frame: pd.DataFrame, is_series: bool) -> Frame:
+    return frame.iloc[:, 0] if is_series else frame
+
+
+def rolling_moments(returns: pd.DataFrame, window: int
+                    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    以累積和一次計算所有列的滾動平均與樣本標準差，O(n)
+
+    窗口內有效樣本不足 window 筆時為 NaN。
+    """
+    x = returns.to_numpy(dtype=float)
+    valid = ~np.isnan(x)
+    x = np.where(valid, x, 0.0)
+
+    n = _window_sums(valid.astype(float), window)
+    sx = _window_sums(x, window)
+    sxx = _window_sums(x * x, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sx / n
+        variance = (sxx - sx * sx / n) / (n - 1)
+    std = np.sqrt(np.clip(variance, 0, None))
+
+    incomplete = n < window
+    mean[incomplete] = np.nan
+    std[incomplete] = np.nan
+    return mean, std
+
+
+def rolling_volatility(returns: Frame, window: int,
+                       periods_per_year: int = TRADING_DAYS) -> Frame:
+    """滾動年化波動率"""
+    frame, is_series = _as_frame(returns)
+    _, std = rolling_moments(frame, window)
+    result = pd.DataFrame(std * np.sqrt(periods_per_year),
+                          index=frame.index, columns=frame.columns)
+    return _restore(result, is_series)
+
+
+def rolling_sharpe(returns: Frame, window: int,
+                   risk_free_rate: float = 0.0,
+                   periods_per_year: int = TRADING_DAYS) -> Frame:
+    """滾動年化夏普比率，與 Analyzer._calculate_sharpe_ratio 定義相同"""
+    frame, is_series = _as_frame(returns)
+    mean, std = rolling_moments(frame, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.sqrt(periods_per_year) * \
+            (mean - risk_free_rate / periods_per_year) / std
+    result = pd.DataFrame(sharpe, index=frame.index, columns=frame.columns)
+    return _restore(result, is_series)
+
+
+def rolling_drawdown(prices: Frame, window: int) -> Frame:
+    """
+    相對窗口內最高價的回撤
+
+    窗口最高價以 pandas 的滾動最大值取得，其實作為單調雙端隊列，O(n)。
+    """
+    frame, is_series = _as_frame(prices)
+    peak = frame.rolling(window=window, min_periods=1).max()
+    return _restore(frame / peak - 1, is_series)
+
+
+def _block_scans(x: np.ndarray, window: int):
+    """
+    將序列切為長度 window 的區塊，計算每個位置在所屬區塊內的前綴與後綴
+    統計量: 前綴最大回撤、前綴最低價、後綴最高價與後綴最大回撤
+    """
+    n = len(x)
+    blocks = -(-n // window)
+    padded = np.full((blocks * window,) + x.shape[1:], np.nan)
+    padded[:n] = x
+    b = padded.reshape((blocks, window) + x.shape[1:])
+    reverse = b[:, ::-1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 前綴: 區塊起點至此的回撤以區塊起點起的累計高點計算
+        prefix_dd = np.minimum.accumulate(
+            b / np.maximum.accumulate(b, axis=1) - 1, axis=1)
+        prefix_min = np.minimum.accumulate(b, axis=1)
+        # 後綴: 以此為高點候選時的回撤為 (此後最低價 / 此價 - 1)，
+        # 後綴最大回撤為其由區塊終點往回的累計最小值
+        suffix_max = np.maximum.accumulate(reverse, axis=1)[:, ::-1]
+        suffix_min = np.minimum.accumulate(reverse, axis=1)[:, ::-1]
+        suffix_dd = np.minimum.accumulate(
+            (suffix_min / b - 1)[:, ::-1], axis=1)[:, ::-1]
+
+    def flat(a):
+        return a.reshape((-1,) + x.shape[1:])[:n]
+    return (flat(prefix_dd), flat(prefix_min), flat(suffix_max),
+            flat(suffix_dd))
+
+
+def rolling_max_drawdown(prices: Frame, window: int) -> Frame:
+    """
+    滾動最大回撤: 窗口內任一日相對窗口內此前最高價的最大跌幅，O(n)
+
+    以長度 window 的區塊切分，每個窗口最多跨越兩個區塊: 左區塊的
+    後綴 L 與右區塊的前綴 R，最大回撤為 L 內、R 內與 L 高點至 R 低點
+    三者的最小值，各區塊的前綴與後綴統計量皆以累計極值一次計算。
+    窗口不足或包含缺值時為 NaN。
+    """
+    frame, is_series = _as_frame(prices)
+    x = frame.to_numpy(dtype=float)
+    n = len(x)
+    result = np.full(x.shape, np.nan)
+
+    if n >= window:
+        prefix_dd, prefix_min, suffix_max, suffix_dd = \
+            _block_scans(x, window)
+        end = np.arange(window - 1, n)
+        start = end - window + 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            across = np.minimum(
+                np.minimum(suffix_dd[start], prefix_dd[end]),
+                prefix_min[end] / suffix_max[start] - 1)
+        # 窗口與區塊對齊時只在單一區塊內
+        aligned = (start % window == 0)[:, None]
+        result[end] = np.where(aligned, prefix_dd[end], across)
+
+        missing = _window_sums(np.isnan(x).astype(float), window) > 0
+        result[missing] = np.nan
+
+    result = pd.DataFrame(result, index=frame.index, columns=frame.columns)
+    return _restore(result, is_series)
+
+
+def rolling_var(returns: Frame, window: int,
+                confidence: float = 0.95) -> Frame:
+    """
+    滾動歷史法 VaR (報酬率的 1 - confidence 分位數)
+
+    pandas 的滾動分位數以跳躍表維護窗口的順序統計量，O(n log w)。
+    """
+    frame, is_series = _as_frame(returns)
+    result = frame.rolling(window=window).quantile(1 - confidence,
+                                                   interpolation='linear')
+    return _restore(result, is_series)
+
+
+def rolling_risk(prices: Frame, window: int, confidence: float = 0.95,
+                 risk_free_rate: float = 0.0) -> Union[pd.DataFrame, dict]:
+    """
+    計算滾動波動率、夏普比率、最大回撤與 VaR
+
+    Args:
+        prices: 收盤價序列或面板 (日期 x 股票)
+        window: 滾動窗口
+        confidence: VaR 信賴水準
+        risk_free_rate: 年化無風險利率
+
+    Returns:
+        序列輸入時返回以指標為列的 DataFrame，面板輸入時返回
+        {指標: 日期 x 股票 DataFrame}
+    """
+    returns = prices.pct_change()
+    metrics = {
+        'volatility': rolling_volatility(returns, window),
+        'sharpe_ratio': rolling_sharpe(returns, window, risk_free_rate),
+        'max_drawdown': rolling_max_drawdown(prices, window),
+        'var': rolling_var(returns, window, confidence)
+    }
+    if isinstance(prices, pd.Series):
+        return pd.DataFrame(metrics)
+    return metrics
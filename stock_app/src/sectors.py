@@ -0,0 +1,215 @@
+import re
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from src.utils.config_loader import ConfigLoader
+from src.store import PriceStore
+
+
+LEVELS = ('sector', 'industry')
+
+
+def group_key(level: str, name: str) -> str:
+    """產業指數在價格存儲中的鍵，例如 sector@Technology"""
+    return f"{level}@{re.sub(r'[^0-9A-Za-z]+', '_', name).strip('_')}"
+
+
+def panel(frames: Dict[str, pd.DataFrame], column: str) -> pd.DataFrame:
+    """將多支股票的單一欄位合併為 日期 x 股票 面板"""
+    return pd.concat({symbol: df[column] for symbol, df in frames.items()},
+                     axis=1).sort_index()
+
+
+def group_returns(returns: pd.DataFrame, weights: pd.Series,
+                  labels: pd.Series) -> pd.DataFrame:
+    """
+    以分組加權平均將個股報酬率聚合為各組報酬率
+
+    每日只以當天有報酬率的成分股重新正規化權重，所有組一次計算。
+
+    Args:
+        returns: 日期 x 股票 報酬率
+        weights: 股票 -> 權重
+        labels: 股票 -> 組鍵
+
+    Returns:
+        pd.DataFrame: 日期 x 組 報酬率，當天無成分股為 NaN
+    """
+    w = weights.reindex(returns.columns).to_numpy(dtype=float)
+    valid = returns.notna()
+    weighted = returns.fillna(0.0) * w
+    total = valid * w
+    labels = labels.reindex(returns.columns)
+    numerator = weighted.T.groupby(labels).sum().T
+    denominator = total.T.groupby(labels).sum().T
+    return numerator / denominator.where(denominator > 0)
+
+
+def aggregate_index(frames: Dict[str, pd.DataFrame], weights: pd.Series,
+                    labels: pd.Series,
+                    base: Optional[Dict[str, float]] = None
+                    ) -> Dict[str, pd.DataFrame]:
+    """
+    建立各組的 OHLCV 指數
+
+    收盤指數為前一日指數乘上 1 + 加權收盤報酬率；開高低價以相對前一日
+    收盤的加權變動率計算，並確保高低價涵蓋開盤與收盤；成交量為成分股
+    加總。
+
+    Args:
+        frames: 股票 -> 日 K 線，須包含 base 中各組最後日期之前一日
+        weights, labels: 同 group_returns
+        base: 組鍵 -> 延續的起始收盤指數 (增量更新)，默認為 100，
+            起始日本身不輸出
+
+    Returns:
+        Dict[str, pd.DataFrame]: 組鍵 -> 指數 K 線
+    """
+    close = panel(frames, 'close')
+    previous = close.shift(1)
+    changes = {column: group_returns(panel(frames, column) / previous - 1,
+                                     weights, labels)
+               for column in ('open', 'high', 'low', 'close')}
+    volume = panel(frames, 'volume').T.groupby(
+        labels.reindex(close.columns)).sum(min_count=1).T
+
+    indices = {}
+    for key in changes['close'].columns:
+        ret = changes['close'][key]
+        members = labels.index[labels == key]
+        first = close[members].notna().any(axis=1).to_numpy().argmax()
+
+        if base is not None and key in base:
+            start_level = base[key]
+            ret = ret.iloc[first + 1:]
+        else:
+            start_level = 100.0
+            ret = ret.iloc[first:].fillna(0.0)
+            ret.iloc[0] = 0.0
+
+        levels = start_level * np.cumprod(1 + ret.fillna(0.0).to_numpy())
+        prior = np.append(start_level, levels[:-1])
+        bars = pd.DataFrame({'close': levels}, index=ret.index)
+        for column in ('open', 'high', 'low'):
+            change = changes[column][key].reindex(ret.index)
+            bars[column] = np.where(change.notna(), prior * (1 + change),
+                                    levels)
+        bars['high'] = bars[['open', 'high', 'close']].max(axis=1)
+        bars['low'] = bars[['open', 'low', 'close']].min(axis=1)
+        bars['volume'] = volume[key].reindex(ret.index).fillna(0.0)
+        bars.index.name = 'Date'
+        indices[key] = bars[['open', 'high', 'low', 'close', 'volume']]
+    return indices
+
+
+class SectorIndexer:
+    def __init__(self, store: Optional[PriceStore] = None):
+        """
+        初始化產業與行業指數
+
+        成分股依 Collector.get_info 緩存於價格存儲的 sector / industry
+        分組，指數以 <層級>@<名稱> 存於價格存儲，成分股組成記錄於
+        aggregates.json，組成未變時只延續最後一日之後的指數。
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.sectors')
+        self.store = store or PriceStore()
+        self.sector_config = self.config['sectors']
+        self.compositions_path = self.store.data_dir / 'aggregates.json'
+
+    def _compositions(self) -> Dict:
+        if not self.compositions_path.exists():
+            return {}
+        with open(self.compositions_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def groups(self, symbols: List[str]) -> Dict[str, List[str]]:
+        """由緩存信息將股票分組，成分股少於 min_members 的組不建立"""
+        metadata = self.store.metadata_frame(symbols)
+        groups = {}
+        for level in LEVELS:
+            names = metadata[level].replace('', np.nan).dropna()
+            for name, members in names.groupby(names).groups.items():
+                if len(members) >= self.sector_config['min_members']:
+                    groups[group_key(level, name)] = sorted(members)
+        return groups
+
+    def weights(self, symbols: List[str]) -> pd.Series:
+        """市值加權或等權，缺少市值時該股以等權的平均市值計"""
+        if self.sector_config['weighting'] != 'market_cap':
+            return pd.Series(1.0, index=symbols)
+        caps = self.store.metadata_frame(symbols)['market_cap']\
+            .reindex(symbols).astype(float)
+        return caps.fillna(caps.mean() if caps.notna().any() else 1.0)
+
+    def build(self, frames: Dict[str, pd.DataFrame]
+              ) -> Dict[str, pd.DataFrame]:
+        """
+        建立或增量更新股票池的所有產業與行業指數
+
+        Args:
+            frames: 股票 -> 日 K 線 (還原價格)
+
+        Returns:
+            Dict[str, pd.DataFrame]: 組鍵 -> 指數 K 線
+        """
+        groups = self.groups(list(frames))
+        compositions = self._compositions()
+        weighting = self.sector_config['weighting']
+
+        results = {}
+        for key, members in groups.items():
+            try:
+                composition = {'members': members, 'weighting': weighting}
+                stored = self.store.load(key) \
+                    if compositions.get(key) == composition else None
+                labels = pd.Series(key, index=members)
+                member_frames = {s: frames[s] for s in members}
+
+                if stored is None:
+                    index = aggregate_index(member_frames,
+                                            self.weights(members),
+                                            labels)[key]
+                else:
+                    # 只取最後一日起的數據，最後一日作為報酬率的前一日
+                    last = stored.index[-1]
+                    window = {s: df[df.index >= last]
+                              for s, df in member_frames.items()}
+                    fresh = aggregate_index(
+                        window, self.weights(members), labels,
+                        base={key: stored['close'].iloc[-1]})[key]
+                    if fresh.index.tz is not None and \
+                            stored.index.tz is not None:
+                        fresh.index = fresh.index.tz_convert(stored.index.tz)
+                    index = pd.concat([stored, fresh])
+
+                if stored is None or len(index) != len(stored):
+                    self.store.save(key, index)
+                compositions[key] = composition
+                results[key] = index
+
+            except Exception as e:
+                self.logger.error("建立 %s 指數失敗: %s", key, e)
+
+        with open(self.compositions_path, 'w', encoding='utf-8') as f:
+            json.dump(compositions, f, ensure_ascii=False, indent=2)
+        self.logger.info("產業指數更新完成: %s 個", len(results))
+        return results
+
+    def load(self, symbol: str, level: Optional[str] = None
+             ) -> Optional[pd.DataFrame]:
+        """
+        讀取股票所屬產業的指數，不需載入其他成分股
+
+        level 默認使用 sectors.compare_level
+        """
+        level = level or self.sector_config['compare_level']
+        info = self.store.metadata(symbol)
+        if info is None or not info.get(level):
+            return None
+        index = self.store.load(group_key(level, info[level]))
+        if index is not None:
+            index.attrs['name'] = info[level]
+        return index
@@ -0,0 +1,208 @@
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+from src.results_store import flatten_results
+from src.utils.helpers import parse_condition, to_jsonable
+
+
+class StockService:
+    def __init__(self, stock_analyzer, config: Dict):
+        """
+        初始化常駐分析服務
+
+        Args:
+            stock_analyzer: 已初始化組件的 StockAnalyzer，配置與緩存常駐記憶體
+            config: 完整配置
+        """
+        self.stock_analyzer = stock_analyzer
+        self.config = config
+        self.service_config = config['service']
+        self.logger = logging.getLogger('stock_analysis.service')
+
+        # 每支股票的處理結果常駐記憶體
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+        self._stop = threading.Event()
+        self._server = None
+        self._refresh_thread = None
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def load(self, symbol: str, refresh: bool = False) -> Optional[Dict]:
+        """取得股票的常駐結果，不存在或要求刷新時重新計算"""
+        entry = self.entries.get(symbol)
+        if entry is not None and not refresh:
+            return entry
+
+        # 同一股票同時只計算一次，其他請求等待結果
+        with self._symbol_lock(symbol):
+            entry = self.entries.get(symbol)
+            if entry is not None and not refresh:
+                return entry
+
+            prepared = self.stock_analyzer.prepare(symbol)
+            if prepared is None:
+                return entry
+
+            prepared['metrics'] = flatten_results(prepared['analysis'])
+            prepared['updated_at'] = datetime.now()
+            self.entries[symbol] = prepared
+            return prepared
+
+    def analyze(self, symbol: str) -> Optional[Dict]:
+        """返回單支股票的完整分析結果"""
+        entry = self.load(symbol)
+        if entry is None:
+            return None
+        return {
+            'symbol': symbol,
+            'name': entry['info'].get('name', ''),
+            'analysis_date': entry['processed'].index[-1],
+            'updated_at': entry['updated_at'],
+            'analysis': entry['analysis']
+        }
+
+    def indicators(self, symbol: str, columns: Optional[List[str]] = None,
+                   tail: int = 1) -> Optional[Dict]:
+        """返回最近 tail 根 K 線的技術指標"""
+        entry = self.load(symbol)
+        if entry is None:
+            return None
+        df = entry['processed']
+        if columns:
+            df = df[[col for col in columns if col in df.columns]]
+        df = df.tail(tail)
+        return {
+            'symbol': symbol,
+            'dates': [index.isoformat() for index in df.index],
+            'indicators': {col: df[col].tolist() for col in df.columns}
+        }
+
+    def screen(self, conditions: List[str],
+               symbols: Optional[List[str]] = None) -> Dict:
+        """以指標條件篩選已加載的股票"""
+        parsed = [parse_condition(condition) for condition in conditions]
+        for symbol in symbols or []:
+            self.load(symbol)
+
+        matches = []
+        for symbol, entry in list(self.entries.items()):
+            metrics = entry['metrics']
+            values = {metric: metrics.get(metric)
+                      for metric, _, _ in parsed}
+            if all(values[metric] is not None and func(values[metric],
+                                                       threshold)
+                   for metric, func, threshold in parsed):
+                matches.append({'symbol': symbol, **values})
+
+        return {'conditions': conditions, 'matches': matches}
+
+    def refresh_all(self) -> None:
+        """重新收集並計算所有常駐股票，未變更的數據由階段緩存命中"""
+        for symbol in list(self.entries):
+            if self._stop.is_set():
+                break
+            try:
+                self.load(symbol, refresh=True)
+            except Exception as e:
+                self.logger.error("刷新 %s 失敗: %s", symbol, e)
+
+    def _refresh_loop(self) -> None:
+        interval = self.service_config['refresh_minutes'] * 60
+        while not self._stop.wait(interval):
+            start = time.perf_counter()
+            self.refresh_all()
+            self.stock_analyzer.evaluate_alerts()
+            self.logger.info(
+                "背景刷新完成: %s 支股票, %.2f 秒",
+                len(self.entries), time.perf_counter() - start
+            )
+
+    def serve(self, host: Optional[str] = None,
+              port: Optional[int] = None) -> None:
+        """啟動 HTTP 服務並阻塞直到停止"""
+        host = host or self.service_config['host']
+        port = port or self.service_config['port']
+
+        # 預熱默認股票
+        for symbol in self.config.get('default_symbols', []):
+            self.load(str(symbol))
+
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name='service-refresh', daemon=True)
+        self._refresh_thread.start()
+
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self.logger.info("分析服務已啟動: http://%s:%s", host, port)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def shutdown(self) -> None:
+        """停止服務與背景刷新"""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def _make_handler(service: StockService):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            service.logger.debug(format % args)
+
+        def _send(self, status: int, payload: Any) -> None:
+            body = json.dumps(to_jsonable(payload),
+                              ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type',
+                             'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            symbol = params.get('symbol', [None])[0]
+            try:
+                if url.path == '/health':
+                    self._send(200, {'status': 'ok',
+                                     'symbols': sorted(service.entries)})
+                elif url.path == '/analyze' and symbol:
+                    result = service.analyze(symbol)
+                    self._send(200 if result else 404,
+                               result or {'error': f"無法分析 {symbol}"})
+                elif url.path == '/indicators' and symbol:
+                    columns = params.get('columns', [''])[0]
+                    result = service.indicators(
+                        symbol,
+                        [col for col in columns.split(',') if col],
+                        int(params.get('tail', ['1'])[0])
+                    )
+                    self._send(200 if result else 404,
+                               result or {'error': f"無法分析 {symbol}"})
+                elif url.path == '/screen':
+                    symbols = params.get('symbols', [''])[0]
+                    self._send(200, service.screen(
+                        params.get('where', []),
+                        [s for s in symbols.split(',') if s]
+                    ))
+                else:
+                    self._send(404, {'error': f"未知的路徑: {url.path}"})
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                service.logger.error("處理請求失敗 %s: %s", self.path, e)
+                self._send(500, {'error': str(e)})
+
+    return Handler
@@ -0,0 +1,160 @@
+import os
+import threading
+import json
+import pickle
+import hashlib
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from src.utils.config_loader import ConfigLoader
+
+
+def fingerprint_frame(df: Optional[pd.DataFrame]) -> str:
+    """計算數據框內容的指紋 (索引、列名與數值)"""
+    if df is None:
+        return 'none'
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in df.columns]).encode())
+    digest.update(
+        pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_config(section: Any) -> str:
+    """計算配置子段落的指紋"""
+    payload = json.dumps(section, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class StageCache:
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_size_mb: Optional[float] = None):
+        """初始化階段結果緩存"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.stage_cache')
+
+        cache_config = self.config['cache']
+        self.enabled = cache_config.get('enabled', True)
+        self.cache_dir = Path(cache_dir or cache_config['dir'])
+        if max_size_mb is None:
+            max_size_mb = cache_config['max_size_mb']
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+
+        # 分析在線程池中並行執行，統計與容量計數以鎖保護
+        self._lock = threading.Lock()
+        self.stats = {}
+        self._total_bytes = None
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, stage: str, *parts: str) -> str:
+        """由階段名稱與輸入指紋組成緩存鍵"""
+        digest = hashlib.sha256(stage.encode())
+        for part in parts:
+            digest.update(b'\0')
+            digest.update(str(part).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pkl"
+
+    def _count(self, stage: str, outcome: str) -> None:
+        with self._lock:
+            stage_stats = self.stats.setdefault(stage,
+                                                {'hits': 0, 'misses': 0})
+            stage_stats[outcome] += 1
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """讀取緩存，命中時更新存取時間供 LRU 淘汰使用"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+            return True, value
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            self.logger.warning("讀取階段緩存失敗 %s: %s", key, e)
+            return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        """寫入緩存並在超過容量時淘汰最久未使用的項目"""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            temp_path = path.with_suffix(
+                f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(temp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                # 覆寫同一個鍵時先扣除舊文件的大小
+                try:
+                    previous = path.stat().st_size
+                except FileNotFoundError:
+                    previous = 0
+                os.replace(temp_path, path)
+
+                self._total_bytes = self._size() \
+                    if self._total_bytes is None \
+                    else self._total_bytes + path.stat().st_size - previous
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+
+        except Exception as e:
+            self.logger.warning("寫入階段緩存失敗 %s: %s", key, e)
+
+    def _entries(self):
+        return [(p, p.stat()) for p in self.cache_dir.glob('*/*.pkl')]
+
+    def _size(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _evict(self) -> None:
+        """依最後存取時間淘汰項目，直到容量低於上限 (呼叫者持有鎖)"""
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= stat.st_size
+            except FileNotFoundError:
+                continue
+        self._total_bytes = total
+
+    def memoize(self, stage: str, parts: Tuple[str, ...],
+                func: Callable[[], Any]) -> Any:
+        """
+        以輸入指紋緩存階段結果
+
+        Args:
+            stage: 階段名稱 (process / analyze / visualize)
+            parts: 輸入指紋 (數據指紋與該階段讀取的配置指紋)
+            func: 未命中時執行的計算
+
+        Returns:
+            Any: 階段結果，結果為 None 時不緩存
+        """
+        if not self.enabled:
+            return func()
+
+        key = self.key(stage, *parts)
+        hit, value = self.get(key)
+        if hit:
+            self._count(stage, 'hits')
+            return value
+
+        self._count(stage, 'misses')
+        value = func()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """返回各階段的命中/未命中次數"""
+        with self._lock:
+            return {stage: dict(counts)
+                    for stage, counts in self.stats.items()}
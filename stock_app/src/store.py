@@ -0,0 +1,209 @@
+import zlib
+import sqlite3
+import logging
+import pandas as pd
+from datetime import datetime
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from src.utils.config_loader import ConfigLoader
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest (
+    key TEXT PRIMARY KEY,
+    last_date TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS metadata (
+    symbol TEXT PRIMARY KEY,
+    name TEXT,
+    sector TEXT,
+    industry TEXT,
+    market_cap REAL,
+    currency TEXT,
+    updated_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+METADATA_COLUMNS = ['name', 'sector', 'industry', 'market_cap', 'currency']
+
+
+def checksum(*chunks: bytes) -> str:
+    """文件內容 (依序相接的各段) 的 CRC32 校驗碼"""
+    value = 0
+    for chunk in chunks:
+        value = zlib.crc32(chunk, value)
+    return f"{value:08x}"
+
+
+class PriceStore:
+    def __init__(self, data_dir: Optional[str] = None):
+        """初始化價格存儲"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.store')
+
+        # 每個代碼一個 CSV，格式與 Collector 的緩存一致 (Date 索引 + 小寫列名)
+        self.data_dir = Path(data_dir or self.config['base']['data_dir'])
+        self.data_dir.mkdir(exist_ok=True)
+
+        # 清單記錄每個鍵的最後日期、行數與校驗碼，判斷新鮮度不需讀取 CSV
+        self.manifest_path = self.data_dir / 'manifest.db'
+        with self._connect() as conn:
+            # WAL 模式記錄在資料庫文件中，只需設定一次
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """建立清單資料庫連線，交易結束後提交並關閉"""
+        conn = sqlite3.connect(self.manifest_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def path(self, key: str) -> Path:
+        """獲取代碼對應的文件路徑"""
+        return self.data_dir / f"{key}.csv"
+
+    def exists(self, key: str) -> bool:
+        """檢查代碼是否已存儲"""
+        return self.path(key).exists()
+
+    def load(self, key: str) -> Optional[pd.DataFrame]:
+        """讀取已存儲的價格數據"""
+        try:
+            file_path = self.path(key)
+            if not file_path.exists():
+                return None
+
+            df = pd.read_csv(file_path, index_col=0)
+            if df.empty:
+                return None
+
+            df.index = pd.to_datetime(df.index)
+            df.index.name = 'Date'
+            df.columns = [col.lower() for col in df.columns]
+            return df
+
+        except Exception as e:
+            self.logger.warning("讀取存儲數據失敗 %s: %s", key, e)
+            return None
+
+    def save(self, key: str, df: pd.DataFrame) -> bool:
+        """保存價格數據並更新清單"""
+        try:
+            file_path = self.path(key)
+            data = df.to_csv(index=True, index_label='Date').encode('utf-8')
+            file_path.write_bytes(data)
+            self._record(key, df, checksum(data))
+            self.logger.info("數據已保存到: %s", file_path)
+            return True
+
+        except Exception as e:
+            self.logger.error("保存數據失敗 %s: %s", key, e)
+            return False
+
+    def save_tail(self, key: str, df: pd.DataFrame, start: int) -> bool:
+        """
+        只改寫文件中第 start 行之後的數據並更新清單
+
+        df 為完整數據，前 start 行須與已存儲的文件相同；文件不存在時
+        寫入整個文件。
+        """
+        file_path = self.path(key)
+        if not file_path.exists():
+            return self.save(key, df)
+        try:
+            data = file_path.read_bytes()
+            # 保留標題行與前 start 行
+            lines = data.split(b'\n', start + 1)
+            offset = len(data) - len(lines[-1]) \
+                if len(lines) > start + 1 else len(data)
+            tail = df.iloc[start:].to_csv(index=True, header=False)\
+                .encode('utf-8')
+            with open(file_path, 'r+b') as f:
+                f.seek(offset)
+                f.write(tail)
+                f.truncate()
+            self._record(key, df, checksum(memoryview(data)[:offset], tail))
+            self.logger.info("數據已更新到: %s (%s 行)", file_path,
+                             len(df) - start)
+            return True
+
+        except Exception as e:
+            self.logger.error("保存數據失敗 %s: %s", key, e)
+            return False
+
+    def delete(self, key: str) -> None:
+        """刪除鍵的文件與清單記錄"""
+        self.path(key).unlink(missing_ok=True)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM manifest WHERE key = ?", (key,))
+
+    def _record(self, key: str, df: pd.DataFrame, digest: str) -> None:
+        last_date = pd.Timestamp(df.index.max()).strftime('%Y-%m-%d') \
+            if len(df) else ''
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?)",
+                (key, last_date, len(df), digest,
+                 datetime.now().isoformat(timespec='seconds')))
+
+    def manifest(self, key: str) -> Optional[Dict]:
+        """查詢單一鍵的清單記錄"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT last_date, rows, checksum, updated_at FROM manifest "
+                "WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(['last_date', 'rows', 'checksum', 'updated_at'],
+                        row))
+
+    def manifest_frame(self) -> pd.DataFrame:
+        """以鍵為索引的完整清單"""
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT key, last_date, rows, checksum, updated_at "
+                "FROM manifest", conn, index_col='key')
+
+    def save_metadata(self, info: Dict) -> None:
+        """緩存 Collector.get_info 取得的股票基本信息"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (info['symbol'], *(info.get(col) for col in METADATA_COLUMNS),
+                 datetime.now().isoformat(timespec='seconds')))
+
+    def metadata(self, symbol: str) -> Optional[Dict]:
+        """查詢單一股票的緩存信息"""
+        frame = self.metadata_frame([symbol])
+        if frame.empty:
+            return None
+        return {'symbol': symbol, **frame.iloc[0].to_dict()}
+
+    def metadata_frame(self, symbols: Optional[List[str]] = None
+                       ) -> pd.DataFrame:
+        """以代碼為索引的緩存信息，symbols 為 None 時返回全部"""
+        query = "SELECT symbol, name, sector, industry, market_cap, " \
+            "currency, updated_at FROM metadata"
+        params = []
+        if symbols is not None:
+            params = list(symbols)
+            query += f" WHERE symbol IN ({','.join('?' * len(params))})"
+        with self._connect() as conn:
+            return pd.read_sql_query(query, conn, params=params,
+                                     index_col='symbol')
+
+    def verify(self, key: str) -> bool:
+        """檢查文件內容是否與清單中的校驗碼一致"""
+        entry = self.manifest(key)
+        file_path = self.path(key)
+        return entry is not None and file_path.exists() and \
+            checksum(file_path.read_bytes()) == entry['checksum']
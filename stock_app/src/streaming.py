@@ -0,0 +1,472 @@
+import json
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from src.utils.config_loader import ConfigLoader
+
+
+# 隊列結束標記
+_END = None
+
+
+def _parse_timestamp(value) -> float:
+    """將 epoch 秒數或 ISO 時間字符串轉為 epoch 秒數"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def parse_record(line: str) -> Optional[Dict]:
+    """
+    解析一筆逐筆或分鐘記錄
+
+    支援 JSON 行 ({"symbol", "ts", "price", "volume"}，分鐘 K 線可改用
+    open/high/low/close) 與 CSV 行 (symbol,ts,price,volume)。
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('{'):
+        raw = json.loads(line)
+    else:
+        fields = line.split(',')
+        if fields[0] == 'symbol':
+            return None
+        raw = {'symbol': fields[0], 'ts': fields[1], 'price': fields[2],
+               'volume': fields[3] if len(fields) > 3 else 0}
+
+    close = float(raw.get('close', raw.get('price')))
+    return {
+        'symbol': str(raw['symbol']),
+        'ts': _parse_timestamp(raw['ts']),
+        'open': float(raw.get('open', close)),
+        'high': float(raw.get('high', close)),
+        'low': float(raw.get('low', close)),
+        'close': close,
+        'volume': float(raw.get('volume', 0))
+    }
+
+
+def write_replay(path: str, records: Iterable[Dict]) -> int:
+    """將記錄寫成 JSON 行回放文件"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+            count += 1
+    return count
+
+
+class RollingWindow:
+    """固定長度窗口的滾動和與平方和"""
+    __slots__ = ('size', 'values', 'total', 'total_sq')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, value: float) -> None:
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        if len(self.values) > self.size:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.size if self.full else None
+
+    def std(self) -> Optional[float]:
+        """樣本標準差 (ddof=1)，與 pandas rolling std 相同"""
+        if not self.full or self.size < 2:
+            return None
+        variance = (self.total_sq - self.total * self.total / self.size) \
+            / (self.size - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class EMA:
+    """指數移動平均 (adjust=False)"""
+    __slots__ = ('alpha', 'value')
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class SymbolState:
+    def __init__(self, symbol: str, params: Dict):
+        """單一股票的增量指標與均線密集區狀態"""
+        self.symbol = symbol
+        self.params = params
+        self.ma = {period: RollingWindow(period)
+                   for period in params['ma_periods']}
+        self.fast = EMA(params['macd']['fast_period'])
+        self.slow = EMA(params['macd']['slow_period'])
+        self.signal = EMA(params['macd']['signal_period'])
+        self.gains = RollingWindow(params['rsi_period'])
+        self.losses = RollingWindow(params['rsi_period'])
+        self.bb = RollingWindow(params['bb_period'])
+        self.tr = RollingWindow(params['atr_period'])
+        self.prev_close = None
+        self.dense = None
+        self.rsi_zone = None
+        self.macd_above = None
+        self.bars = 0
+
+    def update(self, bar: Dict) -> List[Dict]:
+        """
+        以一根收盤的 K 線更新指標，返回觸發的訊號
+
+        訊號只在狀態改變時發出 (進出均線密集區、RSI 進入超買超賣區、
+        MACD 與訊號線交叉)。
+        """
+        close = bar['close']
+        self.bars += 1
+
+        for window in self.ma.values():
+            window.push(close)
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        self.bb.push(close)
+
+        # 與 Processor 相同: 第一根 K 線的漲跌與真實波幅不依賴前收盤
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.gains.push(max(delta, 0.0))
+        self.losses.push(max(-delta, 0.0))
+        if self.prev_close is None:
+            true_range = bar['high'] - bar['low']
+        else:
+            true_range = max(bar['high'] - bar['low'],
+                             abs(bar['high'] - self.prev_close),
+                             abs(bar['low'] - self.prev_close))
+        self.tr.push(true_range)
+        self.prev_close = close
+
+        indicators = {f'ma_{period}': window.mean()
+                      for period, window in self.ma.items()}
+        indicators.update({'macd': macd, 'signal': signal,
+                           'rsi': self._rsi(), 'atr': self.tr.mean()})
+        middle, std = self.bb.mean(), self.bb.std()
+        if middle is not None:
+            multiplier = self.params['bb_multiplier']
+            indicators.update({'bb_middle': middle,
+                               'bb_upper': middle + std * multiplier,
+                               'bb_lower': middle - std * multiplier})
+        bar['indicators'] = indicators
+
+        return self._signals(bar, indicators, macd, signal)
+
+    def _rsi(self) -> Optional[float]:
+        gain, loss = self.gains.mean(), self.losses.mean()
+        if gain is None:
+            return None
+        if loss == 0:
+            return 100.0 if gain > 0 else None
+        return 100 - 100 / (1 + gain / loss)
+
+    def _signals(self, bar: Dict, indicators: Dict, macd: float,
+                 signal: float) -> List[Dict]:
+        events = []
+
+        # 均線密集: 所有均線的最大差距不超過收盤價的 dense_threshold
+        ma_values = [indicators[f'ma_{p}'] for p in self.ma]
+        if ma_values and all(v is not None for v in ma_values):
+            dense = max(ma_values) - min(ma_values) <= \
+                bar['close'] * self.params['dense_threshold']
+            if self.dense is not None and dense != self.dense:
+                events.append('ma_dense_enter' if dense else 'ma_dense_exit')
+            self.dense = dense
+
+        rsi = indicators['rsi']
+        if rsi is not None:
+            zone = 'overbought' if rsi >= self.params['rsi_overbought'] \
+                else 'oversold' if rsi <= self.params['rsi_oversold'] \
+                else None
+            if zone is not None and zone != self.rsi_zone:
+                events.append(f'rsi_{zone}')
+            self.rsi_zone = zone
+
+        if self.bars >= self.params['macd']['slow_period']:
+            above = macd > signal
+            if self.macd_above is not None and above != self.macd_above:
+                events.append('macd_cross_up' if above
+                              else 'macd_cross_down')
+            self.macd_above = above
+
+        return [{'symbol': self.symbol, 'event': event, 'ts': bar['ts'],
+                 'close': bar['close'], 'rsi': rsi}
+                for event in events]
+
+
+class BarAggregator:
+    def __init__(self, bar_seconds: int):
+        """將逐筆或分鐘記錄即時聚合為固定週期 K 線"""
+        self.bar_seconds = bar_seconds
+        self.open_bars = {}
+        self.watermark = None
+        self.dropped = 0
+
+    def add(self, record: Dict) -> List[Dict]:
+        """加入一筆記錄，返回因此收盤的 K 線 (早於目前週期的記錄捨棄)"""
+        start = record['ts'] - record['ts'] % self.bar_seconds
+        if self.watermark is not None and start < self.watermark:
+            self.dropped += 1
+            return []
+        closed = []
+
+        bar = self.open_bars.get(record['symbol'])
+        if bar is not None and start > bar['ts']:
+            closed.append(self.open_bars.pop(record['symbol']))
+            bar = None
+        if bar is None:
+            self.open_bars[record['symbol']] = {
+                'symbol': record['symbol'], 'ts': start,
+                'open': record['open'], 'high': record['high'],
+                'low': record['low'], 'close': record['close'],
+                'volume': record['volume']
+            }
+        else:
+            bar['high'] = max(bar['high'], record['high'])
+            bar['low'] = min(bar['low'], record['low'])
+            bar['close'] = record['close']
+            bar['volume'] += record['volume']
+
+        # 時間推進到新的週期時，沒有新記錄的股票也收盤上一根 K 線
+        if self.watermark is None or start > self.watermark:
+            if self.watermark is not None:
+                closed.extend(self._close_before(start))
+            self.watermark = start
+        return closed
+
+    def _close_before(self, start: float) -> List[Dict]:
+        stale = [symbol for symbol, bar in self.open_bars.items()
+                 if bar['ts'] < start]
+        return [self.open_bars.pop(symbol) for symbol in stale]
+
+    def flush(self) -> List[Dict]:
+        """收盤所有未完成的 K 線"""
+        bars = list(self.open_bars.values())
+        self.open_bars = {}
+        return bars
+
+
+def load_stream_params(config: Dict) -> Dict:
+    """由 technical_indicators 與 analysis 配置取得增量指標參數"""
+    indicators = config['technical_indicators']
+    return {
+        'ma_periods': [p for p in indicators['ma'].values()
+                       if isinstance(p, int)],
+        'macd': indicators['macd'],
+        'rsi_period': indicators['rsi']['period'],
+        'bb_period': int(indicators['bollinger_bands']['period']),
+        'bb_multiplier': float(
+            indicators['bollinger_bands']['std_multiplier']),
+        'atr_period': indicators['atr']['period'],
+        'rsi_overbought': config['analysis']['indicators']['rsi_overbought'],
+        'rsi_oversold': config['analysis']['indicators']['rsi_oversold'],
+        'dense_threshold': config['streaming']['dense_threshold']
+    }
+
+
+class StreamPipeline:
+    def __init__(self, sink: Optional[Callable[[Dict], None]] = None,
+                 bar_seconds: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        """
+        初始化盤中串流管線
+
+        Args:
+            sink: 接收訊號的函數，默認寫入 output_dir 下的 JSON 行文件
+            bar_seconds: K 線週期秒數
+            queue_size: 各階段隊列長度，隊列滿時上游等待 (背壓)
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.streaming')
+
+        stream_config = self.config['streaming']
+        self.bar_seconds = bar_seconds or stream_config['bar_seconds']
+        self.queue_size = queue_size or stream_config['queue_size']
+        self.max_latency = stream_config['max_latency_ms'] / 1000
+        self.params = load_stream_params(self.config)
+        self.sink = sink
+        self.states = {}
+        self.stats = {}
+
+    def _state(self, symbol: str) -> SymbolState:
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = SymbolState(symbol, self.params)
+        return state
+
+    async def replay(self, path: str, queue: asyncio.Queue,
+                     speed: float) -> None:
+        """
+        依記錄時間回放文件
+
+        speed 為回放倍速，例如 60 表示一分鐘的數據在一秒內送出，
+        0 表示不等待、以最快速度送出。
+        """
+        loop = asyncio.get_running_loop()
+        started = None
+        first_ts = None
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = parse_record(line)
+                if record is None:
+                    continue
+                if speed > 0:
+                    if first_ts is None:
+                        first_ts, started = record['ts'], loop.time()
+                    delay = started + (record['ts'] - first_ts) / speed \
+                        - loop.time()
+                    if delay > 0.001:
+                        await asyncio.sleep(delay)
+                record['received'] = loop.time()
+                await queue.put(record)
+
+    async def listen(self, host: str, port: int, queue: asyncio.Queue,
+                     stop: asyncio.Event) -> None:
+        """接收 TCP 連線送入的 JSON/CSV 行，作為即時行情的替代來源"""
+        loop = asyncio.get_running_loop()
+
+        async def handle(reader, writer):
+            try:
+                while not reader.at_eof():
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    record = parse_record(line.decode('utf-8'))
+                    if record is not None:
+                        record['received'] = loop.time()
+                        await queue.put(record)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        self.logger.info("串流服務已啟動: %s:%s", host, port)
+        async with server:
+            await stop.wait()
+
+    async def _aggregate(self, records: asyncio.Queue,
+                         signals: asyncio.Queue) -> None:
+        """聚合 K 線並增量更新指標，訊號送入下游隊列"""
+        aggregator = BarAggregator(self.bar_seconds)
+        loop = asyncio.get_running_loop()
+        latencies = self.stats['latencies']
+
+        async def emit(bars: List[Dict], received: float) -> None:
+            for bar in bars:
+                self.stats['bars'] += 1
+                for signal in self._state(bar['symbol']).update(bar):
+                    await signals.put(signal)
+                    latency = loop.time() - received
+                    latencies.append(latency)
+                    if latency > self.max_latency:
+                        self.stats['late'] += 1
+
+        while True:
+            record = await records.get()
+            if record is _END:
+                await emit(aggregator.flush(), loop.time())
+                self.stats['dropped'] = aggregator.dropped
+                await signals.put(_END)
+                return
+            self.stats['records'] += 1
+            await emit(aggregator.add(record), record['received'])
+
+    async def _sink(self, signals: asyncio.Queue) -> None:
+        """將訊號寫入 sink"""
+        output = None
+        sink = self.sink
+        if sink is None:
+            output_dir = Path(self.config['base']['output_dir'])
+            output_dir.mkdir(exist_ok=True)
+            output = open(output_dir / self.config['streaming']
+                          ['signals_file'], 'a', encoding='utf-8')
+
+            def sink(signal):
+                output.write(json.dumps(signal, ensure_ascii=False) + '\n')
+        try:
+            while True:
+                signal = await signals.get()
+                if signal is _END:
+                    return
+                self.stats['signals'] += 1
+                sink(signal)
+        finally:
+            if output is not None:
+                output.close()
+
+    async def run(self, source: Callable[[asyncio.Queue], Awaitable]
+                  ) -> Dict:
+        """
+        執行管線直到來源結束
+
+        Args:
+            source: 以記錄隊列為參數的協程函數，例如
+                lambda queue: pipeline.replay(path, queue, speed)
+
+        Returns:
+            Dict: 記錄數、K 線數、訊號數與延遲統計
+        """
+        self.stats = {'records': 0, 'bars': 0, 'signals': 0, 'late': 0,
+                      'dropped': 0,
+                      'latencies': deque(maxlen=100000)}
+        records = asyncio.Queue(self.queue_size)
+        signals = asyncio.Queue(self.queue_size)
+        started = time.perf_counter()
+
+        workers = [asyncio.create_task(self._aggregate(records, signals)),
+                   asyncio.create_task(self._sink(signals))]
+        try:
+            await source(records)
+        finally:
+            await records.put(_END)
+            await asyncio.gather(*workers)
+
+        return self._summary(time.perf_counter() - started)
+
+    def _summary(self, elapsed: float) -> Dict:
+        latencies = sorted(self.stats.pop('latencies'))
+        summary = dict(self.stats, elapsed=elapsed,
+                       symbols=len(self.states),
+                       records_per_second=self.stats['records'] / elapsed
+                       if elapsed > 0 else None)
+        if latencies:
+            summary['latency_p50_ms'] = \
+                latencies[len(latencies) // 2] * 1000
+            summary['latency_p99_ms'] = \
+                latencies[int(len(latencies) * 0.99)] * 1000
+            summary['latency_max_ms'] = latencies[-1] * 1000
+
+        self.logger.info(
+            "串流結束: %s 筆記錄, %s 根 K 線, %s 個訊號, %.2f 秒",
+            summary['records'], summary['bars'], summary['signals'], elapsed
+        )
+        if summary['late']:
+            self.logger.warning("%s 個訊號延遲超過 %.0f 毫秒",
+                                summary['late'], self.max_latency * 1000)
+        return summary
@@ -0,0 +1,173 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+from src.utils.config_loader import ConfigLoader
+from src.store import PriceStore
+
+
+# 各欄位聚合為週期 K 線的方式，未列出的欄位不保留
+AGGREGATIONS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum',
+    'dividends': 'sum',
+    'stock splits': 'max'
+}
+
+
+def _periods(index: pd.DatetimeIndex, freq: str) -> pd.PeriodIndex:
+    """將日期索引轉為所屬週期"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_period(freq)
+
+
+def aggregate_bars(daily: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    將日 K 線聚合為週期 K 線
+
+    每根 K 線以週期內最後一個交易日為索引，未收盤的週期
+    以目前為止的交易日聚合。
+    """
+    if daily is None or daily.empty:
+        return pd.DataFrame()
+
+    columns = {col: how for col, how in AGGREGATIONS.items()
+               if col in daily.columns}
+    periods = _periods(daily.index, freq)
+    grouped = daily[list(columns)].groupby(periods, sort=True)
+    bars = grouped.agg(columns)
+    bars.index = pd.DatetimeIndex(
+        pd.Series(daily.index, index=daily.index)
+        .groupby(periods, sort=True).last()
+    )
+    bars.index.name = 'Date'
+    return bars
+
+
+def _tail_update(daily: pd.DataFrame, bars: Optional[pd.DataFrame],
+                 freq: str) -> Optional[Tuple[int, pd.DataFrame]]:
+    """
+    重新聚合已存儲的最後一根 K 線所屬週期 (可能尚未收盤) 及之後的週期
+
+    Returns:
+        Optional[Tuple[int, pd.DataFrame]]: (沿用的已存儲 K 線行數,
+        重新聚合的 K 線)，需要整段重新聚合時為 None
+    """
+    if bars is None or bars.empty or \
+            _periods(daily.index[:1], freq)[0] < \
+            _periods(bars.index[:1], freq)[0]:
+        return None
+
+    # 以最後一個週期的起始日定位，不需把整段日 K 線轉為週期
+    start = _periods(bars.index[-1:], freq)[0].start_time
+    if daily.index.tz is not None:
+        start = start.tz_localize(daily.index.tz)
+    kept = bars.index.searchsorted(start)
+    fresh = daily.iloc[daily.index.searchsorted(start):]
+
+    if kept:
+        # 新的除權息事件會改變全部較早的還原價格，已存儲的週期不再有效
+        last_kept = bars.index[kept - 1]
+        if last_kept not in daily.index or not np.isclose(
+                daily.at[last_kept, 'close'], bars['close'].iloc[kept - 1],
+                rtol=1e-9, atol=0):
+            return None
+    return kept, aggregate_bars(fresh, freq)
+
+
+def _same_bars(bars: pd.DataFrame, stored: pd.DataFrame) -> bool:
+    """比較 K 線數值，容許 CSV 讀回時的型別與末位誤差"""
+    if len(bars) != len(stored):
+        return False
+    if bars.empty:
+        return True
+    return bars.index.equals(stored.index) and \
+        list(bars.columns) == list(stored.columns) and \
+        np.allclose(bars.to_numpy(dtype=float), stored.to_numpy(dtype=float),
+                    rtol=1e-12, atol=0, equal_nan=True)
+
+
+def update_bars(daily: pd.DataFrame, bars: Optional[pd.DataFrame],
+                freq: str) -> pd.DataFrame:
+    """
+    以新的日 K 線增量更新週期 K 線
+
+    已存儲的最後一根 K 線所屬週期 (可能尚未收盤) 及之後的週期
+    由日 K 線重新聚合，更早的週期直接沿用；更早週期的收盤價與
+    日 K 線不一致 (還原價格已改變) 或日 K 線的歷史較已存儲的更早
+    時整段重新聚合。
+    """
+    update = _tail_update(daily, bars, freq)
+    if update is None:
+        return aggregate_bars(daily, freq)
+    kept, tail = update
+    if tail.empty:
+        return bars
+    return pd.concat([bars.iloc[:kept], tail])
+
+
+def timeframe_key(symbol: str, timeframe: str) -> str:
+    """週期 K 線在價格存儲中的鍵，例如 2330@W"""
+    return f"{symbol}@{timeframe}"
+
+
+class TimeframeStore:
+    def __init__(self, store: Optional[PriceStore] = None):
+        """初始化多週期 K 線存儲"""
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.timeframes')
+        self.store = store or PriceStore()
+
+        # 週期代碼 -> pandas 週期頻率，D 為原始日 K 線
+        self.frequencies: Dict[str, str] = self.config['timeframes']
+
+    def bars(self, symbol: str, daily: pd.DataFrame,
+             timeframe: str) -> Optional[pd.DataFrame]:
+        """
+        取得指定週期的 K 線，只重建尚未收盤的週期
+
+        Args:
+            symbol: 股票代碼
+            daily: 最新的日 K 線
+            timeframe: 週期代碼 (D/W/M)
+
+        Returns:
+            Optional[pd.DataFrame]: 週期 K 線，格式與日 K 線相同
+        """
+        if timeframe == 'D':
+            return daily
+        if timeframe not in self.frequencies:
+            self.logger.error("不支援的週期: %s", timeframe)
+            return None
+
+        try:
+            freq = self.frequencies[timeframe]
+            key = timeframe_key(symbol, timeframe)
+            stored = self.store.load(key)
+            if stored is not None and str(stored.index.tz) != \
+                    str(daily.index.tz):
+                # 存儲讀回的時區與日 K 線不同時統一轉換
+                stored.index = pd.to_datetime(stored.index, utc=True)\
+                    .tz_convert(daily.index.tz)
+
+            update = _tail_update(daily, stored, freq)
+            if update is None:
+                bars = aggregate_bars(daily, freq)
+                self.store.save(key, bars)
+                return bars
+
+            # 只比較並改寫最後一個週期之後的 K 線
+            kept, tail = update
+            if tail.empty or _same_bars(tail, stored.iloc[kept:]):
+                return stored
+            bars = pd.concat([stored.iloc[:kept], tail])
+            self.store.save_tail(key, bars, kept)
+            return bars
+
+        except Exception as e:
+            self.logger.error("更新 %s 的 %s K 線失敗: %s", symbol, timeframe, e)
+            return None
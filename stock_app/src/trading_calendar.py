@@ -0,0 +1,67 @@
+import logging
+import pandas as pd
+from datetime import time
+from typing import Optional
+from src.utils.config_loader import ConfigLoader
+
+
+class TradingCalendar:
+    def __init__(self):
+        """
+        初始化臺灣證券交易所交易日曆
+
+        交易日為週一至週五扣除配置中的休市日；盤後數據於 close_time
+        之後才視為可取得。
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.calendar')
+
+        calendar_config = self.config['trading_calendar']
+        self.timezone = calendar_config['timezone']
+        self.close_time = time.fromisoformat(calendar_config['close_time'])
+        self.holidays = pd.DatetimeIndex(
+            pd.to_datetime(calendar_config['holidays'])).normalize()
+        self.offset = pd.offsets.CustomBusinessDay(holidays=self.holidays)
+
+    def _date(self, value) -> pd.Timestamp:
+        """轉為交易所時區的無時區日期"""
+        value = pd.Timestamp(value)
+        if value.tz is not None:
+            value = value.tz_convert(self.timezone).tz_localize(None)
+        return value.normalize()
+
+    def is_trading_day(self, value) -> bool:
+        return self.offset.is_on_offset(self._date(value))
+
+    def trading_days(self, start, end) -> pd.DatetimeIndex:
+        """[start, end] 之間的交易日"""
+        return pd.date_range(self._date(start), self._date(end),
+                             freq=self.offset)
+
+    def previous_session(self, value) -> pd.Timestamp:
+        """value 之前 (不含當日) 的最後一個交易日"""
+        return self._date(value) - self.offset
+
+    def last_session(self, now: Optional[pd.Timestamp] = None
+                     ) -> pd.Timestamp:
+        """截至 now 已收盤且數據可取得的最後一個交易日"""
+        now = pd.Timestamp.now(tz=self.timezone) if now is None else \
+            pd.Timestamp(now)
+        if now.tz is None:
+            now = now.tz_localize(self.timezone)
+        now = now.tz_convert(self.timezone)
+
+        today = self._date(now)
+        if self.is_trading_day(today) and now.time() >= self.close_time:
+            return today
+        return self.previous_session(today)
+
+    def expected_last_date(self, end_date: str,
+                           now: Optional[pd.Timestamp] = None
+                           ) -> pd.Timestamp:
+        """
+        下載到 end_date (不含) 時應有的最後一根日 K 線日期
+
+        取 end_date 前一個交易日與目前最後一個已收盤交易日的較早者。
+        """
+        return min(self.previous_session(end_date), self.last_session(now))
@@ -35,10 +35,10 @@ class ConfigLoader:
             self._process_config()
 
             self._initialized = True
-            self.logger.info(f"配置加載成功: {self.config_path}")
+            self.logger.info("配置加載成功: %s", self.config_path)
 
         except Exception as e:
-            self.logger.error(f"配置初始化失敗: {str(e)}")
+            self.logger.error("配置初始化失敗: %s", e)
             raise
 
     def _load_config(self) -> Dict[str, Any]:
@@ -106,5 +106,5 @@ class ConfigLoader:
             return self.base_dir / self.config['base'][dir_key]
 
         except Exception as e:
-            self.logger.error(f"獲取路徑失敗: {str(e)}")
+            self.logger.error("獲取路徑失敗: %s", e)
             raise
@@ -7,11 +7,11 @@ def timing_decorator(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         logger = logging.getLogger('stock_analysis')
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        end_time = time.time()
+        end_time = time.perf_counter()
         execution_time = end_time - start_time
-        logger.info(f"{func.__name__} 執行時間: {execution_time:.2f} 秒")
+        logger.info("%s 執行時間: %.2f 秒", func.__name__, execution_time)
         return result
     return wrapper
 
@@ -23,7 +23,7 @@ def error_handler(func):
             return func(*args, **kwargs)
         except Exception as e:
             logger = logging.getLogger('stock_analysis')
-            logger.error(f"執行 {func.__name__} 時發生錯誤: {str(e)}")
+            logger.error("執行 %s 時發生錯誤: %s", func.__name__, e)
             # 添加更詳細的錯誤信息
             logger.exception("詳細錯誤信息:")
             raise
@@ -0,0 +1,38 @@
+import math
+import operator
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any
+
+
+_OPERATORS = [
+    ('>=', operator.ge), ('<=', operator.le), ('!=', operator.ne),
+    ('>', operator.gt), ('<', operator.lt), ('=', operator.eq)
+]
+
+
+def to_jsonable(value: Any) -> Any:
+    """將分析結果轉換為可 JSON 序列化的結構"""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return value
+
+
+def parse_condition(expression: str):
+    """解析篩選條件，例如 technical_analysis.rsi<30"""
+    for symbol, func in _OPERATORS:
+        if symbol in expression:
+            metric, threshold = expression.split(symbol, 1)
+            return metric.strip(), func, float(threshold)
+    raise ValueError(f"無法解析的篩選條件: {expression}")
@@ -1,20 +1,77 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import importlib
+import multiprocessing
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Dict, Optional
 from .config_loader import ConfigLoader
 
 
+# 由監聽線程持有實際的處理器，其他線程與進程只負責入隊
+_log_queue = None
+_listener = None
+
+
+class _LazyQueueHandler(QueueHandler):
+    """線程隊列不需序列化，保留原始記錄讓監聽線程再格式化訊息"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(self.queue, queue.Queue):
+            return record
+        return super().prepare(record)
+
+
+def _resolve_class(path: str):
+    """將 'logging.handlers.RotatingFileHandler' 轉為類別"""
+    module_name, _, class_name = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _build_handlers(log_config: Dict[str, Any], handler_names,
+                    log_file: Path):
+    """依 config.yaml 的 logging 段落建立處理器"""
+    formatters = {
+        name: logging.Formatter(spec.get('format'), spec.get('datefmt'))
+        for name, spec in log_config.get('formatters', {}).items()
+    }
+
+    handlers = []
+    for handler_name in handler_names:
+        spec = dict(log_config['handlers'][handler_name])
+        handler_class = _resolve_class(spec.pop('class'))
+        level = spec.pop('level', 'NOTSET')
+        formatter = spec.pop('formatter', None)
+
+        # 文件處理器未指定路徑時寫入當天的日誌文件
+        if issubclass(handler_class, logging.FileHandler):
+            spec.setdefault('filename', str(log_file))
+
+        handler = handler_class(**spec)
+        handler.setLevel(level)
+        if formatter:
+            handler.setFormatter(formatters[formatter])
+        handlers.append(handler)
+    return handlers
+
+
 def setup_logging(name: str = 'stock_analysis') -> logging.Logger:
     """
     配置並返回日誌記錄器
 
+    記錄器只掛載隊列處理器，文件與控制台輸出由監聽線程完成，
+    處理器、格式與等級依 config.yaml 的 logging 段落設定。
+
     Args:
         name: 日誌記錄器名稱
 
     Returns:
         logging.Logger: 配置好的日誌記錄器
     """
+    global _log_queue, _listener
+
     try:
         # 獲取配置
         config = ConfigLoader().get_config()
@@ -27,47 +84,83 @@ def setup_logging(name: str = 'stock_analysis') -> logging.Logger:
         # 設置日誌文件名
         log_file = log_dir / f"stock_analysis_{datetime.now():%Y%m%d}.log"
 
+        logger_config = log_config['loggers'].get(name, {})
+        handlers = _build_handlers(log_config,
+                                   logger_config.get('handlers', []),
+                                   log_file)
+
+        # 重新配置時先停止舊的監聽線程
+        stop_logging()
+
+        # 多進程模式使用進程間隊列，子進程以 setup_worker_logging 接入
+        if log_config.get('multiprocess', False):
+            _log_queue = multiprocessing.Queue(-1)
+        else:
+            _log_queue = queue.Queue(-1)
+        _listener = QueueListener(_log_queue, *handlers,
+                                  respect_handler_level=True)
+        _listener.start()
+
         # 獲取或創建日誌記錄器
         logger = logging.getLogger(name)
-        logger.setLevel(logging.INFO)
+        logger.setLevel(logger_config.get('level', 'INFO'))
+        logger.propagate = logger_config.get('propagate', True)
 
         # 清除現有的處理器
         if logger.hasHandlers():
             logger.handlers.clear()
+        logger.addHandler(_LazyQueueHandler(_log_queue))
 
-        # 創建文件處理器
-        file_handler = RotatingFileHandler(
-            filename=str(log_file),
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
-        )
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        ))
-
-        # 創建控制台處理器
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(logging.Formatter(
-            '%(message)s'
-        ))
-
-        # 添加處理器
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-
-        logger.info(f"日誌系統初始化完成，日誌文件: {log_file}")
+        logger.info("日誌系統初始化完成，日誌文件: %s", log_file)
         return logger
 
     except Exception as e:
         # 如果配置失敗，使用基本配置
         basic_logger = _setup_basic_logger(name)
-        basic_logger.error(f"日誌系統配置失敗，使用基本配置: {str(e)}")
+        basic_logger.error("日誌系統配置失敗，使用基本配置: %s", e)
         return basic_logger
 
 
+def get_log_queue() -> Optional[Any]:
+    """獲取日誌隊列，供子進程初始化時使用"""
+    return _log_queue
+
+
+def setup_worker_logging(log_queue, name: str = 'stock_analysis',
+                         level: int = logging.INFO) -> logging.Logger:
+    """
+    在工作進程中配置日誌，只將記錄送入主進程的隊列
+
+    Args:
+        log_queue: 主進程 get_log_queue() 返回的隊列
+        name: 日誌記錄器名稱
+        level: 日誌等級
+
+    Returns:
+        logging.Logger: 配置好的日誌記錄器
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.propagate = False
+    if logger.hasHandlers():
+        logger.handlers.clear()
+    logger.addHandler(_LazyQueueHandler(log_queue))
+    return logger
+
+
+def stop_logging() -> None:
+    """停止監聽線程並寫出隊列中剩餘的記錄"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
 def _setup_basic_logger(name: str) -> logging.Logger:
     """
     設置基本的日誌記錄器（當主要配置失敗時使用）
@@ -109,6 +202,6 @@ def _setup_basic_logger(name: str) -> logging.Logger:
         logger.addHandler(file_handler)
 
     except Exception as e:
-        logger.error(f"無法創建日誌文件: {str(e)}")
+        logger.error("無法創建日誌文件: %s", e)
 
     return logger
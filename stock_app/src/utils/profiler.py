@@ -0,0 +1,196 @@
+import json
+import time
+import threading
+import tracemalloc
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class _NullSpan:
+    """停用時使用的空區段，進出與屬性設定都不做任何事"""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profiler: 'Profiler', name: str, rows: Optional[int]):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0
+        # tracemalloc 的峰值是整個進程共用的，重設會互相干擾，
+        # 因此只記錄主執行緒區段的峰值記憶體
+        self.trace_memory = profiler.trace_memory and \
+            threading.current_thread() is threading.main_thread()
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        stack.append(self)
+        if self.trace_memory:
+            self.start_memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        self.start_cpu = time.thread_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.thread_time() - self.start_cpu
+        peak = None
+        if self.trace_memory:
+            # 子區段會重設峰值，因此取自身觀察值與子區段峰值中的較大者
+            _, absolute_peak = tracemalloc.get_traced_memory()
+            absolute_peak = max(absolute_peak, self.child_peak)
+            peak = max(absolute_peak - self.start_memory, 0)
+
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack and self.trace_memory:
+            stack[-1].child_peak = max(stack[-1].child_peak, absolute_peak)
+
+        self.profiler.record(self.name, wall, cpu, peak, self.rows)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        """初始化效能記錄器，默認停用"""
+        self.enabled = False
+        self.trace_memory = False
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def configure(self, enabled: bool, trace_memory: bool = True) -> None:
+        """啟用或停用記錄"""
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, rows: Optional[int] = None):
+        """
+        建立記錄區段
+
+        Args:
+            name: 區段名稱，例如 process.rsi
+            rows: 處理的資料行數，也可在區段內設定 span.rows
+
+        Returns:
+            context manager，停用時為無開銷的空區段
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, rows)
+
+    def record(self, name: str, wall: float, cpu: float,
+               peak: Optional[int], rows: Optional[int] = None) -> None:
+        """
+        累計單次區段結果
+
+        peak 為 None 表示未記錄峰值記憶體 (停用記憶體追蹤或非主執行緒的
+        區段)；memory_samples 為有記錄峰值的次數，為 0 時
+        peak_memory_max 沒有意義
+        """
+        with self._lock:
+            stats = self.stats.setdefault(name, {
+                'count': 0, 'wall_total': 0.0, 'wall_max': 0.0,
+                'cpu_total': 0.0, 'peak_memory_max': 0,
+                'memory_samples': 0, 'rows_total': 0
+            })
+            stats['count'] += 1
+            stats['wall_total'] += wall
+            stats['wall_max'] = max(stats['wall_max'], wall)
+            stats['cpu_total'] += cpu
+            if peak is not None:
+                stats['peak_memory_max'] = max(stats['peak_memory_max'],
+                                               peak)
+                stats['memory_samples'] += 1
+            if rows is not None:
+                stats['rows_total'] += int(rows)
+
+    def summary(self) -> Dict[str, Dict]:
+        """返回各區段的累計統計，依總耗時排序"""
+        with self._lock:
+            items = sorted(self.stats.items(),
+                           key=lambda item: item[1]['wall_total'],
+                           reverse=True)
+            return {name: dict(stats) for name, stats in items}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = {}
+
+    def export_json(self, path: Path) -> None:
+        """輸出 JSON 格式的統計"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+    def export_prometheus(self, path: Path) -> None:
+        """輸出 Prometheus text format 的統計"""
+        metrics = [
+            ('calls_total', 'counter', 'count', '區段執行次數'),
+            ('wall_seconds_total', 'counter', 'wall_total', '累計牆鐘時間'),
+            ('wall_seconds_max', 'gauge', 'wall_max', '單次最長牆鐘時間'),
+            ('cpu_seconds_total', 'counter', 'cpu_total', '累計 CPU 時間'),
+            ('peak_memory_bytes', 'gauge', 'peak_memory_max',
+             '峰值記憶體 (只含主執行緒的區段)'),
+            ('memory_samples_total', 'counter', 'memory_samples',
+             '記錄峰值記憶體的次數'),
+            ('rows_total', 'counter', 'rows_total', '累計處理行數'),
+        ]
+        summary = self.summary()
+        lines = []
+        for suffix, metric_type, key, help_text in metrics:
+            name = f"stock_analysis_span_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for span_name, stats in summary.items():
+                label = span_name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{name}{{span="{label}"}} {stats[key]}')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+_profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+    """獲取全域效能記錄器"""
+    return _profiler
+
+
+def span(name: str, rows: Optional[int] = None):
+    """在全域記錄器上建立區段"""
+    return _profiler.span(name, rows)
+
+
+def profiled(name: str):
+    """以區段記錄整個函數的裝飾器"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return func(*args, **kwargs)
+            with _profiler.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
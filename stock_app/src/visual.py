@@ -5,6 +5,9 @@ import numpy as np
 from typing import Dict, List, Optional
 import logging
 from src.utils.config_loader import ConfigLoader
+from src.utils.profiler import profiled
+from src.rolling_risk import rolling_risk
+from src.volume_profile import VolumeProfile
 
 
 class Visualizer:
@@ -38,13 +41,15 @@ class Visualizer:
                 'volume_analysis': self._create_volume_chart(df),
                 'pattern_analysis': self._create_pattern_chart(
                     df, analysis_results),
-                'correlation_matrix': self._create_correlation_matrix(df)
+                'correlation_matrix': self._create_correlation_matrix(df),
+                'rolling_risk': self._create_rolling_risk_chart(df)
             }
             return charts
         except Exception as e:
-            self.logger.error(f"創建儀表板失敗: {str(e)}")
+            self.logger.error("創建儀表板失敗: %s", e)
             return None
 
+    @profiled('chart.price')
     def _create_price_chart(self, df: pd.DataFrame) -> go.Figure:
         """創建價格走勢圖"""
         fig = go.Figure()
@@ -81,6 +86,7 @@ class Visualizer:
 
         return fig
 
+    @profiled('chart.technical')
     def _create_technical_chart(self, df: pd.DataFrame) -> go.Figure:
         """創建技術指標圖"""
         fig = make_subplots(
@@ -130,22 +136,49 @@ class Visualizer:
         fig.update_layout(height=900, template=self.theme)
         return fig
 
+    @profiled('chart.volume')
     def _create_volume_chart(self, df: pd.DataFrame) -> go.Figure:
-        """創建成交量圖"""
-        fig = go.Figure()
+        """創建成交量圖: 成交量與均量，右側為價量分佈與價值區"""
+        fig = make_subplots(rows=1, cols=2, column_widths=[0.8, 0.2],
+                            horizontal_spacing=0.02,
+                            subplot_titles=('成交量', '價量分佈'))
 
-        colors = [self.colors['up']
-                  if df['close'].iloc[i] > df['close'].iloc[i-1]
-                  else self.colors['down']
-                  for i in range(1, len(df))]
-        colors.insert(0, self.colors['volume'])
+        change = df['close'].diff().to_numpy()
+        colors = np.where(change > 0, self.colors['up'],
+                          self.colors['down'])
+        colors[0] = self.colors['volume']
 
         fig.add_trace(go.Bar(
             x=df.index,
             y=df['volume'],
             name='Volume',
             marker_color=colors
-        ))
+        ), row=1, col=1)
+
+        for column in df.columns:
+            if column.startswith('volume_ma_'):
+                fig.add_trace(go.Scatter(
+                    x=df.index,
+                    y=df[column],
+                    name=f"均量 {column.rsplit('_', 1)[-1]}",
+                    line=dict(width=1)
+                ), row=1, col=1)
+
+        profile = VolumeProfile(df)
+        summary = profile.summary()
+        fig.add_trace(go.Bar(
+            x=profile.histogram(),
+            y=profile.centers,
+            orientation='h',
+            name='價量分佈',
+            marker_color=self.colors['volume']
+        ), row=1, col=2)
+        if summary is not None:
+            for name in ('poc', 'value_area_low', 'value_area_high'):
+                fig.add_hline(y=summary[name], row=1, col=2,
+                              line_dash='solid' if name == 'poc'
+                              else 'dot',
+                              line_color=self.colors['line'])
 
         fig.update_layout(
             title='成交量分析',
@@ -155,6 +188,7 @@ class Visualizer:
 
         return fig
 
+    @profiled('chart.pattern')
     def _create_pattern_chart(
             self, df: pd.DataFrame,
             analysis_results: Dict
@@ -183,6 +217,20 @@ class Visualizer:
                 fig.add_hline(y=resistance, line_dash="dash",
                               annotation_text="阻力位")
 
+            # 多次觸及的價位，線寬隨觸及次數增加
+            levels = patterns.get('levels') or {}
+            for kind, label, color in (('support', '支撐', self.colors['up']),
+                                       ('resistance', '阻力',
+                                        self.colors['down'])):
+                for level in levels.get(kind, []):
+                    fig.add_hline(
+                        y=level['level'], line_dash="dot",
+                        line_color=color,
+                        line_width=min(1 + level['touches'] / 2, 4),
+                        annotation_text=f"{label} {level['level']:.2f} "
+                                        f"({level['touches']} 次)"
+                    )
+
         fig.update_layout(
             title='形態分析',
             template=self.theme
@@ -190,6 +238,37 @@ class Visualizer:
 
         return fig
 
+    @profiled('chart.rolling_risk')
+    def _create_rolling_risk_chart(self, df: pd.DataFrame) -> go.Figure:
+        """創建滾動風險指標圖"""
+        risk_params = self.config['analysis']['risk']
+        metrics = rolling_risk(df['close'], risk_params['rolling_window'],
+                               risk_params['var_confidence'],
+                               risk_params['risk_free_rate'])
+
+        titles = {
+            'volatility': '年化波動率',
+            'sharpe_ratio': '夏普比率',
+            'max_drawdown': '最大回撤',
+            'var': f"VaR ({risk_params['var_confidence']:.0%})"
+        }
+        fig = make_subplots(rows=len(titles), cols=1, shared_xaxes=True,
+                            vertical_spacing=0.05,
+                            subplot_titles=list(titles.values()))
+        for row, (column, title) in enumerate(titles.items(), start=1):
+            fig.add_trace(go.Scatter(x=metrics.index, y=metrics[column],
+                                     name=title), row=row, col=1)
+
+        fig.update_layout(
+            title=f"滾動風險指標 ({risk_params['rolling_window']} 日)",
+            template=self.theme,
+            height=900,
+            showlegend=False
+        )
+
+        return fig
+
+    @profiled('chart.correlation')
     def _create_correlation_matrix(self, df: pd.DataFrame) -> go.Figure:
         """創建相關性矩陣圖"""
         # 選擇數值型列
@@ -210,6 +289,7 @@ class Visualizer:
 
         return fig
 
+    @profiled('save.charts')
     def save_charts(self, charts: Dict[str, go.Figure], output_dir: str):
         """保存圖表"""
         import os
@@ -220,7 +300,7 @@ class Visualizer:
             for name, fig in charts.items():
                 output_path = os.path.join(output_dir, f"{name}.html")
                 fig.write_html(output_path)
-                self.logger.info(f"已保存圖表: {output_path}")
+                self.logger.info("已保存圖表: %s", output_path)
 
         except Exception as e:
-            self.logger.error(f"保存圖表失敗: {str(e)}")
+            self.logger.error("保存圖表失敗: %s", e)
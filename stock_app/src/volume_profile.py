@@ -0,0 +1,103 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+from src.utils.config_loader import ConfigLoader
+
+
+def value_area(histogram: np.ndarray,
+               fraction: float) -> Tuple[int, int, int]:
+    """
+    由成交量分佈找出控制點與價值區，O(bins)
+
+    由成交量最大的價格區間 (控制點) 開始，每次將上下相鄰區間中成交量
+    較大者加入，直到涵蓋總成交量的 fraction。
+
+    Returns:
+        Tuple[int, int, int]: 控制點、價值區下緣與上緣的區間序號
+    """
+    poc = int(np.argmax(histogram))
+    target = histogram.sum() * fraction
+    low = high = poc
+    covered = histogram[poc]
+    while covered < target and (low > 0 or high < len(histogram) - 1):
+        below = histogram[low - 1] if low > 0 else -1.0
+        above = histogram[high + 1] if high < len(histogram) - 1 else -1.0
+        if above >= below:
+            high += 1
+            covered += above
+        else:
+            low -= 1
+            covered += below
+    return poc, low, high
+
+
+class VolumeProfile:
+    def __init__(self, df: pd.DataFrame, bins: Optional[int] = None):
+        """
+        建立價量分佈的前綴和緩存
+
+        價格區間以整段歷史的最低與最高價等分為 bins 個，每根 K 線的
+        成交量歸入典型價 (高 + 低 + 收) / 3 所在的區間；累計每根 K 線
+        為止各區間的成交量，任意日期範圍的分佈只需兩列相減。
+
+        Args:
+            df: K 線數據
+            bins: 價格區間數量，默認使用 analysis.volume_profile.bins
+        """
+        self.config = ConfigLoader().get_config()
+        self.logger = logging.getLogger('stock_analysis.volume_profile')
+        self.profile_config = self.config['analysis']['volume_profile']
+        bins = bins or self.profile_config['bins']
+
+        self.index = pd.DatetimeIndex(df.index)
+        self.edges = np.linspace(df['low'].min(), df['high'].max(),
+                                 bins + 1)
+
+        typical = ((df['high'] + df['low'] + df['close']) / 3).to_numpy()
+        positions = np.clip(np.searchsorted(self.edges, typical,
+                                            side='right') - 1, 0, bins - 1)
+        self.cumulative = np.zeros((len(df) + 1, bins))
+        self.cumulative[np.arange(1, len(df) + 1), positions] = \
+            np.nan_to_num(df['volume'].to_numpy(dtype=float))
+        np.cumsum(self.cumulative, axis=0, out=self.cumulative)
+
+    @property
+    def centers(self) -> np.ndarray:
+        """各價格區間的中間價"""
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    def _position(self, value, side: str) -> int:
+        value = pd.Timestamp(value)
+        if self.index.tz is not None and value.tz is None:
+            value = value.tz_localize(self.index.tz)
+        return int(self.index.searchsorted(value, side=side))
+
+    def histogram(self, start=None, end=None) -> np.ndarray:
+        """[start, end] 日期範圍內各價格區間的成交量，O(bins)"""
+        first = 0 if start is None else self._position(start, 'left')
+        last = len(self.index) if end is None else \
+            self._position(end, 'right')
+        return self.cumulative[last] - self.cumulative[first]
+
+    def summary(self, start=None, end=None,
+                fraction: Optional[float] = None) -> Optional[Dict]:
+        """
+        日期範圍內的控制點與價值區
+
+        Returns:
+            Optional[Dict]: poc (控制點中間價)、value_area_low /
+            value_area_high (價值區價格範圍) 與 volume (總成交量)，
+            範圍內沒有成交量時為 None
+        """
+        histogram = self.histogram(start, end)
+        if histogram.sum() <= 0:
+            return None
+        fraction = fraction or self.profile_config['value_area']
+        poc, low, high = value_area(histogram, fraction)
+        return {
+            'poc': float(self.centers[poc]),
+            'value_area_low': float(self.edges[low]),
+            'value_area_high': float(self.edges[high + 1]),
+            'volume': float(histogram.sum())
+        }
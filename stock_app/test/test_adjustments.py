@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from stock_app.src.adjustments import (AdjustmentStore, adjust, factor_table,
+                                       unadjust_splits)
+from stock_app.src.collect import Collector
+from stock_app.src.store import PriceStore
+
+
+def make_raw(n, dividends=None, splits=None):
+    dates = pd.bdate_range('2024-01-01', periods=n, tz='Asia/Taipei',
+                           name='Date')
+    close = 100.0 + np.arange(n)
+    df = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                       'close': close, 'volume': 1000.0,
+                       'dividends': 0.0, 'stock splits': 0.0}, index=dates)
+    for i, value in (dividends or {}).items():
+        df.iloc[i, df.columns.get_loc('dividends')] = value
+    for i, value in (splits or {}).items():
+        df.iloc[i, df.columns.get_loc('stock splits')] = value
+    return df
+
+
+class TestAdjustments(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_dividend_factor(self):
+        """測試除息日之前的價格乘上 1 - 股利 / 前一日收盤價"""
+        raw = make_raw(10, dividends={5: 2.08})
+        factors = factor_table(raw)
+        self.assertEqual(len(factors), 1)
+        self.assertAlmostEqual(factors['price_factor'].iloc[0], 1 - 2.08 / 104)
+
+        adjusted = adjust(raw, factors)
+        np.testing.assert_allclose(adjusted['close'].iloc[:5],
+                                   raw['close'].iloc[:5] * 0.98)
+        pd.testing.assert_series_equal(adjusted['close'].iloc[5:],
+                                       raw['close'].iloc[5:])
+        self.assertEqual(raw['close'].iloc[0], 100.0)
+
+    def test_split(self):
+        """測試分割還原與調整互為逆運算"""
+        raw = make_raw(10, splits={4: 2.0})
+        yahoo = adjust(raw, factor_table(raw))
+        np.testing.assert_allclose(yahoo['close'].iloc[:4],
+                                   raw['close'].iloc[:4] / 2)
+        np.testing.assert_allclose(yahoo['volume'].iloc[:4], 2000.0)
+        pd.testing.assert_frame_equal(unadjust_splits(yahoo), raw)
+
+    def test_new_event_only_changes_factors(self):
+        """測試新的除權息事件只改變因子表，與整段重算一致"""
+        store = AdjustmentStore(PriceStore(self.tmp_dir))
+        full = make_raw(30, dividends={8: 1.5, 25: 3.0})
+        first = full.iloc[:20]
+        store.update('2330', first)
+        self.assertEqual(len(store.load('2330')), 1)
+
+        store.update('2330', full)
+        factors = store.load('2330')
+        self.assertEqual(len(factors), 2)
+        pd.testing.assert_frame_equal(store.adjusted('2330', full),
+                                      adjust(full, factor_table(full)))
+
+    def test_collector_fetches_incrementally(self):
+        """測試已存儲原始價格時只下載之後的數據，除息不觸發完整重新下載"""
+        full = make_raw(30, dividends={25: 3.0}).rename(columns=str.title)
+        full['Adj Close'] = full['Close']
+        calls = []
+
+        def history(start, end, **kwargs):
+            calls.append(start)
+            data = full[full.index >= pd.Timestamp(start, tz='Asia/Taipei')]
+            return data.iloc[:20] if len(calls) == 1 else data
+
+        ticker = mock.Mock()
+        ticker.history.side_effect = history
+        collector = Collector(data_dir=self.tmp_dir)
+
+        with mock.patch('stock_app.src.collect.yf.Ticker',
+                        return_value=ticker):
+            first = collector.collect('2330', '2024-01-01', '2030-01-01')
+            second = collector.collect('2330', '2024-01-01', '2030-01-01')
+
+        self.assertEqual(calls[0], '2024-01-01')
+        self.assertEqual(calls[1], first.index[-1].strftime('%Y-%m-%d'))
+        self.assertEqual(len(second), 30)
+        raw = collector.store.load('2330')
+        self.assertAlmostEqual(raw['close'].iloc[0], 100.0)
+        self.assertAlmostEqual(second['close'].iloc[0],
+                               100.0 * (1 - 3.0 / 124))
+
+
+if __name__ == '__main__':
+    unittest.main()
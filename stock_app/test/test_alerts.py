@@ -0,0 +1,115 @@
+import unittest
+from unittest import mock
+import tempfile
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from stock_app.src.alerts import AlertEngine, Rule, compile_rules
+
+
+class TestAlerts(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        dates = pd.bdate_range(start='2024-01-01', periods=30)
+        self.df = pd.DataFrame({
+            'close': np.linspace(100, 110, 30),
+            'volume': np.full(30, 1000.0),
+            'rsi': np.full(30, 50.0),
+            'macd': np.full(30, 1.0),
+            'signal': np.full(30, 0.5)
+        }, index=dates)
+        self.alerts = []
+        self.engine = AlertEngine(sink=self.alerts.append,
+                                  state_path=self.temp_dir / 'state.json')
+
+    def _append(self, df, **values):
+        row = df.iloc[[-1]].copy()
+        row.index = [df.index[-1] + pd.offsets.BDay(1)]
+        for column, value in values.items():
+            row[column] = value
+        return pd.concat([df, row])
+
+    def test_rule_vectorized(self):
+        """測試規則對多支股票向量化求值"""
+        frame = pd.DataFrame({'rsi': [20, 50, np.nan],
+                              'macd': [1, 2, 1], 'signal': [0, 1, 2],
+                              'prev.macd': [-1, 2, 1],
+                              'prev.signal': [0, 1, 0]},
+                             index=['A', 'B', 'C'])
+        self.assertEqual(list(Rule('x', ['rsi < 30']).evaluate(frame)),
+                         [True, False, False])
+        cross = Rule('y', cross=['macd', 'signal'])
+        self.assertEqual(list(cross.evaluate(frame)), [True, False, False])
+        self.assertFalse(Rule('z', ['missing > 1']).evaluate(frame).any())
+
+    def test_edge_triggered(self):
+        """測試條件持續成立時只觸發一次，解除後可再次觸發"""
+        df = self._append(self.df, rsi=20.0)
+        self.engine.update('2330', df)
+        fired = self.engine.evaluate()
+        self.assertEqual([a['rule'] for a in fired], ['rsi_oversold'])
+
+        # 未變化的股票不重新評估
+        self.assertFalse(self.engine.update('2330', df))
+        self.assertEqual(self.engine.evaluate(), [])
+
+        df = self._append(df, rsi=25.0)
+        self.engine.update('2330', df)
+        self.assertEqual(self.engine.evaluate(), [])
+
+        df = self._append(self._append(df, rsi=50.0), rsi=20.0)
+        self.engine.update('2330', df.iloc[:-1])
+        self.engine.evaluate()
+        self.engine.update('2330', df)
+        self.assertEqual([a['rule'] for a in self.engine.evaluate()],
+                         ['rsi_oversold'])
+
+    def test_cross_and_volume(self):
+        """測試 MACD 交叉與成交量放大"""
+        df = self._append(self.df, macd=0.0, signal=0.5)
+        df = self._append(df, macd=1.0, signal=0.5, volume=5000.0)
+        self.engine.update('2317', df)
+        rules = {a['rule'] for a in self.engine.evaluate()}
+        self.assertEqual(rules, {'macd_cross_up', 'volume_spike'})
+
+    def test_state_persisted(self):
+        """測試重啟後已觸發的告警不重複觸發"""
+        df = self._append(self.df, rsi=20.0)
+        self.engine.update('2330', df)
+        self.assertEqual(len(self.engine.evaluate()), 1)
+
+        engine = AlertEngine(sink=self.alerts.append,
+                             state_path=self.temp_dir / 'state.json')
+        # 已評估的版本也已保存，未變化的股票不重新評估
+        self.assertFalse(engine.update('2330', df))
+        self.assertTrue(engine.update('2330', self._append(df, rsi=25.0)))
+        self.assertEqual(engine.evaluate(), [])
+
+    def test_custom_rule_columns(self):
+        """測試自訂規則引用的列進入快照，不存在的列在編譯時略過"""
+        config = self.engine.config
+        rules = [{'name': 'near_support', 'when': ['support >= 100']},
+                 {'name': 'ma_cross', 'cross': ['ma_5', 'ma_120']},
+                 {'name': 'typo', 'when': ['rsii < 30']}]
+        with mock.patch.dict(config['alerts'], {'rules': rules}):
+            with self.assertLogs('stock_analysis.alerts', 'ERROR'):
+                names = [rule.name for rule in compile_rules(config)]
+            engine = AlertEngine(sink=self.alerts.append,
+                                 state_path=self.temp_dir / 'state.json')
+        self.assertIn('near_support', names)
+        self.assertNotIn('typo', names)
+        self.assertIn('ma_120', engine.columns)
+
+        df = self.df.assign(support=90.0, ma_5=1.0, ma_120=2.0)
+        df = self._append(df, support=105.0, ma_5=3.0)
+        engine.update('2330', df)
+        self.assertEqual({a['rule'] for a in engine.evaluate()},
+                         {'near_support', 'ma_cross'})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
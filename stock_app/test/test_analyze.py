@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+from stock_app.src.analyze import Analyzer
+from stock_app.src.process import Processor
+from stock_app.benchmark.synthetic import generate_ohlcv
+
+
+class TestAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = Analyzer()
+        self.processed = Processor().process(generate_ohlcv(400, seed=3))
+
+    def test_analyze_sections(self):
+        """測試分析結果包含所有段落"""
+        results = self.analyzer.analyze(self.processed)
+        self.assertIsNotNone(results)
+        for section in ['technical_analysis', 'trend_analysis',
+                        'pattern_analysis', 'risk_analysis']:
+            self.assertIn(section, results)
+        self.assertAlmostEqual(results['technical_analysis']['rsi'],
+                               self.processed['rsi'].iloc[-1])
+        # 保留原有的 var_95 鍵，配置的信賴水準另存於 var
+        risk = results['risk_analysis']
+        returns = self.processed['close'].pct_change()
+        self.assertAlmostEqual(risk['var_95'], returns.quantile(0.05))
+        self.assertIn('var', risk)
+
+    def test_selected_sections(self):
+        """測試只執行指定的分析段落"""
+        results = self.analyzer.analyze(
+            self.processed, sections=['technical_analysis',
+                                      'volume_analysis'])
+        self.assertEqual(list(results), ['technical_analysis',
+                                         'volume_analysis'])
+        volume = results['volume_analysis']
+        self.assertAlmostEqual(volume['relative_volume'],
+                               self.processed['relative_volume'].iloc[-1])
+        self.assertLessEqual(volume['profile']['value_area_low'],
+                             volume['profile']['poc'])
+
+    def test_unknown_section(self):
+        """測試未知的段落名稱拋出 ValueError 而非被忽略"""
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze(self.processed,
+                                  sections=['technical_analysis', 'risk'])
+        with self.assertRaises(ValueError):
+            self.analyzer.columns(['volume'])
+
+    def test_requested_columns(self):
+        """測試只計算分析讀取的指標時，保留的行與分析結果不變"""
+        sections = ['technical_analysis', 'risk_analysis',
+                    'volume_analysis']
+        columns = self.analyzer.columns(sections)
+        pruned = Processor().process(generate_ohlcv(400, seed=3), columns)
+
+        self.assertNotIn('atr', pruned.columns)
+        self.assertNotIn('ma_120', pruned.columns)
+        self.assertTrue(pruned.index.equals(self.processed.index))
+        expected = self.analyzer.analyze(self.processed, sections=sections)
+        results = self.analyzer.analyze(pruned, sections=sections)
+        for section in sections:
+            for key, value in expected[section].items():
+                if isinstance(value, float):
+                    self.assertTrue(np.isclose(results[section][key], value,
+                                               equal_nan=True), key)
+
+    def test_short_history(self):
+        """測試根數少於趨勢期間的月 K 線仍可分析"""
+        trend = self.analyzer._trend_analysis(self.processed.iloc[-5:])
+        self.assertIn('20d_trend', trend)
+
+    def test_beta_against_benchmark(self):
+        """測試設置基準後計算貝塔係數"""
+        self.analyzer.set_benchmark(None)
+        self.assertTrue(np.isnan(
+            self.analyzer._risk_analysis(self.processed)['beta']))
+
+        # 以自身作為基準時貝塔與相關係數皆為 1
+        self.analyzer.set_benchmark(self.processed['close'])
+        risk = self.analyzer._risk_analysis(self.processed)
+        self.assertAlmostEqual(risk['beta'], 1.0)
+        self.assertAlmostEqual(risk['correlation'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import tempfile
+import shutil
+from stock_app.src.batch import BatchRunner
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.calls = []
+        self.failures = {'2317': 1, '9999': 99}  # 失敗次數
+
+    def _run(self, symbol):
+        self.calls.append(symbol)
+        if self.failures.get(symbol, 0) > 0:
+            self.failures[symbol] -= 1
+            return None
+        return True
+
+    def _runner(self):
+        runner = BatchRunner(self._run, batch_id='test', workers=2,
+                             checkpoint_dir=self.temp_dir)
+        runner.backoff_seconds = 0
+        return runner
+
+    def test_retry_and_checkpoint(self):
+        """測試失敗重試與檢查點寫入"""
+        runner = self._runner()
+        summary = runner.run(['2330', '2317', '9999'])
+
+        self.assertEqual(summary['done'], 2)
+        self.assertEqual(summary['failed'], ['9999'])
+        self.assertEqual(runner.read_checkpoint('2317')['attempts'], 2)
+        self.assertEqual(runner.read_checkpoint('9999')['status'], 'failed')
+
+    def test_resume_only_unfinished(self):
+        """測試續跑時只執行未完成或失敗的股票"""
+        self._runner().run(['2330', '2317', '9999'])
+        self.calls.clear()
+        self.failures['9999'] = 0
+
+        summary = self._runner().run(['2330', '2317', '9999', '2357'])
+        self.assertEqual(sorted(self.calls), ['2357', '9999'])
+        self.assertEqual(summary['skipped'], 2)
+        self.assertEqual(summary['failed'], [])
+
+    def test_checkpoint_after_commit(self):
+        """測試分析後、寫入結果前中斷時，續跑會重新執行這些股票"""
+        pending, stored = [], []
+
+        def run(symbol):
+            pending.append(symbol)
+            return True
+
+        def crash():
+            raise KeyboardInterrupt
+
+        def commit():
+            stored.extend(pending)
+            pending.clear()
+            return True
+
+        runner = BatchRunner(run, batch_id='test', workers=2,
+                             checkpoint_dir=self.temp_dir, commit_func=crash)
+        with self.assertRaises(KeyboardInterrupt):
+            runner.run(['2330', '2317'])
+        self.assertIsNone(runner.read_checkpoint('2330'))
+
+        pending.clear()
+        runner = BatchRunner(run, batch_id='test', workers=2,
+                             checkpoint_dir=self.temp_dir, commit_func=commit)
+        summary = runner.run(['2330', '2317'])
+        self.assertEqual(summary['skipped'], 0)
+        self.assertEqual(sorted(stored), ['2317', '2330'])
+        self.assertEqual(runner.read_checkpoint('2330')['status'], 'done')
+
+        # 寫入失敗時不記錄完成
+        runner = BatchRunner(run, batch_id='other', workers=1,
+                             checkpoint_dir=self.temp_dir,
+                             commit_func=lambda: False)
+        summary = runner.run(['2357'])
+        self.assertEqual(summary['failed'], ['2357'])
+        self.assertEqual(runner.read_checkpoint('2357')['status'], 'failed')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
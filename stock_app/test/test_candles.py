@@ -0,0 +1,79 @@
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from stock_app.benchmark.synthetic import generate_panel
+from stock_app.src.candles import PATTERNS, PatternScanner, decode_flags, \
+    pattern_mask
+from stock_app.src.results_store import ResultStore
+
+
+def bars(rows):
+    """以 (open, high, low, close) 列表建立 K 線"""
+    dates = pd.bdate_range(start='2024-01-01', periods=len(rows))
+    return pd.DataFrame(rows, columns=['open', 'high', 'low', 'close'],
+                        index=dates).assign(volume=1000)
+
+
+class TestCandles(unittest.TestCase):
+    def setUp(self):
+        self.scanner = PatternScanner()
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def test_single_bar(self):
+        """測試十字星與錘子線依配置閾值判斷"""
+        df = bars([(100, 105, 95, 100.5), (100, 101, 90, 100.5)])
+        flags = self.scanner.scan(df)
+        self.assertIn('doji', decode_flags(flags.iloc[0]))
+        self.assertIn('hammer', decode_flags(flags.iloc[1]))
+
+        self.scanner.params = dict(self.scanner.params, doji_threshold=0.01)
+        self.assertNotIn('doji', decode_flags(self.scanner.scan(df).iloc[0]))
+
+    def test_multi_bar(self):
+        """測試吞噬、晨星與三白兵"""
+        engulfing = bars([(105, 106, 99, 100), (99, 108, 98, 107)])
+        self.assertIn('bullish_engulfing',
+                      self.scanner.latest(engulfing))
+
+        star = bars([(110, 111, 99, 100), (99, 100, 97, 98.5),
+                     (99, 108, 98, 107)])
+        self.assertIn('morning_star', self.scanner.latest(star))
+
+        soldiers = bars([(100, 103, 99, 102), (101, 105, 100.5, 104),
+                         (103, 107, 102.5, 106)])
+        self.assertIn('three_white_soldiers', self.scanner.latest(soldiers))
+
+    def test_scan_matches_row_by_row(self):
+        """測試整段掃描與逐根判斷最新 K 線的結果一致"""
+        df = generate_panel(1, 1, seed=4)['9000']
+        flags = self.scanner.scan(df)
+        self.assertEqual(flags.dtype, np.uint32)
+        for i in range(10, len(df), 23):
+            self.assertEqual(self.scanner.latest(df.iloc[:i + 1]),
+                             decode_flags(flags.iloc[i]))
+
+    def test_find_and_store(self):
+        """測試查詢最近出現指定形態的股票"""
+        panel = self.scanner.scan_many(generate_panel(20, 1, seed=2))
+        mask = pattern_mask(['bullish_engulfing'])
+        expected = self.scanner.find(panel, ['bullish_engulfing'], days=5)
+        brute = [s for s in panel.columns
+                 if any(int(v) & mask for v in panel[s].iloc[-5:])]
+        self.assertEqual(expected, brute)
+
+        store = ResultStore(self.temp_dir / 'results.db')
+        store.write_pattern_flags(panel)
+        since = panel.index[-5].strftime('%Y-%m-%d')
+        hits = store.symbols_with_pattern(mask, since)
+        self.assertEqual(sorted(hits['symbol'].unique()), expected)
+        self.assertEqual(len(PATTERNS), 15)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from stock_app.benchmark.synthetic import generate_ohlcv
+from stock_app.src.chunked import ChunkedProcessor, MemmapStore
+from stock_app.src.process import Processor
+from stock_app.src.indicators import compile_plan
+from stock_app.src.utils.config_loader import ConfigLoader
+
+
+class TestChunked(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.df = generate_ohlcv(1500, seed=3)
+        self.store = MemmapStore(self.tmp_dir)
+        self.store.write_frame('TEST', self.df)
+        config = ConfigLoader().get_config()
+        self.expected = compile_plan(config, len(self.df)).execute(
+            self.df.copy())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_matches_in_memory(self):
+        """測試不同區塊大小的輸出與整段計算一致"""
+        for chunk_rows in (7, 64, 333, 5000):
+            summary = ChunkedProcessor(self.store, chunk_rows).process('TEST')
+            self.assertEqual(summary['chunks'], -(-1500 // chunk_rows))
+            outputs = self.store.outputs('TEST')
+            for column in outputs:
+                expected = self.expected[column].to_numpy(dtype=float)
+                np.testing.assert_array_equal(np.isnan(outputs[column]),
+                                              np.isnan(expected))
+                np.testing.assert_allclose(outputs[column], expected,
+                                           rtol=1e-10, atol=1e-10,
+                                           err_msg=column)
+
+    def test_exact_columns(self):
+        """測試 EWM、滾動極值與趨勢逐位元一致"""
+        ChunkedProcessor(self.store, 50).process('TEST')
+        outputs = self.store.outputs('TEST')
+        for column in ('macd', 'signal', 'support', 'resistance', 'trend'):
+            np.testing.assert_array_equal(
+                outputs[column], self.expected[column].to_numpy(dtype=float))
+
+    def test_valid_from_matches_dropna(self):
+        """測試 valid_from 與 Processor 的 dropna 結果對齊"""
+        summary = ChunkedProcessor(self.store, 100).process('TEST')
+        processed = Processor().process(self.df)
+        frame = self.store.frame('TEST', summary['valid_from'])
+        self.assertEqual(len(frame), len(processed))
+        self.assertTrue(frame.index.equals(processed.index))
+        np.testing.assert_allclose(frame['ma_20'], processed['ma_20'],
+                                   rtol=1e-10)
+
+    def test_import_csv(self):
+        """測試分塊匯入 CSV"""
+        path = f'{self.tmp_dir}/minute.csv'
+        self.df.rename_axis('Date').rename(columns=str.capitalize)\
+            .to_csv(path)
+        rows = self.store.import_csv('CSV', path, chunk_rows=256)
+        self.assertEqual(rows, len(self.df))
+        inputs = self.store.inputs('CSV')
+        np.testing.assert_array_equal(inputs['close'],
+                                      self.df['close'].to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
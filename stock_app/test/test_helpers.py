@@ -0,0 +1,23 @@
+import unittest
+import numpy as np
+from stock_app.src.utils.helpers import parse_condition, to_jsonable
+
+
+class TestHelpers(unittest.TestCase):
+    def test_parse_condition(self):
+        """測試篩選條件解析"""
+        metric, func, threshold = parse_condition('risk_analysis.beta>=1.2')
+        self.assertEqual(metric, 'risk_analysis.beta')
+        self.assertTrue(func(1.2, threshold))
+        with self.assertRaises(ValueError):
+            parse_condition('rsi')
+
+    def test_to_jsonable(self):
+        """測試 NaN 與 numpy 型別轉換"""
+        value = to_jsonable({'a': np.float64(np.nan), 'b': np.int64(3),
+                             'c': np.bool_(True)})
+        self.assertEqual(value, {'a': None, 'b': 3, 'c': True})
+
+
+if __name__ == '__main__':
+    unittest.main()
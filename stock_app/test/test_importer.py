@@ -0,0 +1,91 @@
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from stock_app.src.importer import BulkImporter, read_price_csv, \
+    symbol_from_path
+from stock_app.src.store import PriceStore
+from stock_app.src.adjustments import AdjustmentStore
+from stock_app.benchmark.synthetic import generate_ohlcv
+
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.source_dir = self.temp_dir / 'source'
+        self.source_dir.mkdir()
+        self.data_dir = self.temp_dir / 'data'
+
+        # 歷史存檔格式 (首字母大寫欄位) 與 Collector 緩存格式 (小寫欄位)
+        archive = generate_ohlcv(250, seed=1, start_date='2021-01-04')
+        archive.columns = [col.title() for col in archive.columns]
+        self.archive = self.source_dir / '2330.TW.csv'
+        archive.to_csv(self.archive, index_label='Date')
+        self.cache = self.source_dir / '2357.csv'
+        generate_ohlcv(300, seed=2, start_date='2023-08-01')\
+            .to_csv(self.cache, index_label='Date')
+
+    def test_read_both_schemas(self):
+        """測試讀取存檔與緩存兩種格式"""
+        archive = read_price_csv(self.archive)
+        cache = read_price_csv(self.cache)
+        self.assertEqual(list(archive.columns), list(cache.columns))
+        self.assertEqual(str(archive.index.tz), 'Asia/Taipei')
+        self.assertEqual(archive.index[0].strftime('%Y-%m-%d'), '2021-01-04')
+        self.assertEqual(symbol_from_path(self.archive), '2330')
+
+    def test_import_and_validate(self):
+        """測試並行匯入與驗證"""
+        short = self.source_dir / '9999.csv'
+        with open(self.cache, encoding='utf-8') as f:
+            short.write_text(''.join(f.readlines()[:10]), encoding='utf-8')
+
+        summary = BulkImporter(data_dir=self.data_dir, workers=2)\
+            .import_paths([self.source_dir])
+        self.assertEqual(sorted(r['symbol'] for r in summary['imported']),
+                         ['2330', '2357'])
+        self.assertEqual([r['symbol'] for r in summary['rejected']],
+                         ['9999'])
+
+        stored = PriceStore(self.data_dir).load('2330')
+        archive = read_price_csv(self.archive)
+        self.assertEqual(len(stored), len(archive))
+        self.assertEqual(stored['close'].iloc[0], archive['close'].iloc[0])
+
+    def test_merge_with_existing(self):
+        """測試重複匯入時與已存儲數據合併"""
+        importer = BulkImporter(data_dir=self.data_dir, workers=1)
+        importer.import_paths([self.source_dir / '2357.csv'])
+        importer.import_paths([self.source_dir / '2357.csv'])
+        stored = PriceStore(self.data_dir).load('2357')
+        self.assertEqual(len(stored), len(read_price_csv(self.cache)))
+
+    def test_adjusted_import_has_no_factors(self):
+        """測試還原價格的匯入不建立因子表，並移除已有的因子表"""
+        store = PriceStore(self.data_dir)
+        adjustments = AdjustmentStore(store)
+        BulkImporter(data_dir=self.data_dir, workers=1, raw_prices=True)\
+            .import_paths([self.cache])
+        self.assertIsNotNone(adjustments.load('2357'))
+
+        BulkImporter(data_dir=self.data_dir, workers=1)\
+            .import_paths([self.cache, self.archive])
+        self.assertIsNone(adjustments.load('2357'))
+        self.assertIsNone(adjustments.load('2330'))
+        self.assertIsNone(store.manifest('2357@factors'))
+
+    def test_raw_import_replaces_legacy(self):
+        """測試原始價格不與沒有因子表的舊版還原價格合併"""
+        legacy = generate_ohlcv(300, seed=3, start_date='2022-01-03')
+        PriceStore(self.data_dir).save('2357', legacy)
+        BulkImporter(data_dir=self.data_dir, workers=1, raw_prices=True)\
+            .import_paths([self.cache])
+        stored = PriceStore(self.data_dir).load('2357')
+        self.assertEqual(len(stored), len(read_price_csv(self.cache)))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
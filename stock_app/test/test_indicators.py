@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+import pandas as pd
+from stock_app.src.indicators import compile_plan, INDICATORS, indicator
+from stock_app.src.utils.config_loader import ConfigLoader
+from stock_app.benchmark.synthetic import generate_ohlcv
+
+
+class TestIndicatorPlan(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigLoader().get_config()
+        self.df = generate_ohlcv(300, seed=11)
+
+    def test_shared_intermediates(self):
+        """測試 ma_20 與 bb_middle 共用同一個滾動均值"""
+        plan = compile_plan(self.config, len(self.df))
+        self.assertIs(plan.outputs['ma_20'], plan.outputs['bb_middle'])
+        keys = [node.key for _, node in plan.steps]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(keys.count(('delta', ('column', 'close'))), 1)
+
+    def test_matches_pandas(self):
+        """測試計劃結果與直接使用 pandas 計算一致"""
+        result = compile_plan(self.config, len(self.df)).execute(
+            self.df.copy())
+        close = self.df['close']
+        pd.testing.assert_series_equal(result['ma_20'],
+                                       close.rolling(20).mean(),
+                                       check_names=False)
+        pd.testing.assert_series_equal(
+            result['bb_upper'],
+            close.rolling(20).mean() + close.rolling(20).std() * 2,
+            check_names=False)
+        pd.testing.assert_series_equal(result['support'],
+                                       self.df['low'].rolling(20).min(),
+                                       check_names=False)
+
+    def test_volume_outputs(self):
+        """測試成交量均線共用滾動均值並計算相對成交量"""
+        plan = compile_plan(self.config, len(self.df))
+        result = plan.execute(self.df.copy())
+        volume = self.df['volume']
+        pd.testing.assert_series_equal(result['volume_ma_20'],
+                                       volume.rolling(20).mean(),
+                                       check_names=False)
+        pd.testing.assert_series_equal(
+            result['relative_volume'], volume / volume.rolling(20).mean(),
+            check_names=False)
+        self.assertIs(plan.outputs['relative_volume'].inputs[1],
+                      plan.outputs['volume_ma_20'])
+
+    def test_requested_outputs_only(self):
+        """測試只計算下游需要的指標"""
+        plan = compile_plan(self.config, len(self.df), outputs=['rsi'])
+        self.assertEqual(list(plan.outputs), ['rsi'])
+        kinds = {node.key[0] for _, node in plan.steps}
+        self.assertNotIn('ewm', kinds)
+        self.assertNotIn('true_range', kinds)
+
+    def test_warmup(self):
+        """測試暖身行數與完整計算開頭的 NaN 行數相同"""
+        plan = compile_plan(self.config, len(self.df))
+        result = plan.execute(self.df.copy())
+        leading = int(result.isna().any(axis=1).to_numpy().argmin())
+        self.assertEqual(plan.warmup, leading)
+        pruned = compile_plan(self.config, len(self.df), outputs=['rsi'])
+        self.assertEqual(pruned.warmup, plan.warmup)
+
+    def test_new_indicator_reuses_nodes(self):
+        """測試新增指標重用既有中間結果"""
+        @indicator('ma_distance', section=('technical_indicators', 'rsi'))
+        def _ma_distance(params, builder, config):
+            close = builder.column('close')
+            ma = builder.rolling_mean(close, 20)
+            return {'ma_distance': builder.combine(
+                'ma_distance', [close, ma], lambda c, m: c / m - 1)}
+
+        try:
+            plan = compile_plan(self.config, len(self.df))
+            rolling_means = [node.key for _, node in plan.steps
+                             if node.key[:1] == ('rolling_mean',)
+                             and node.key[1] == ('column', 'close')
+                             and node.key[2] == 20]
+            self.assertEqual(len(rolling_means), 1)
+            result = plan.execute(self.df.copy())
+            self.assertTrue(np.allclose(
+                result['ma_distance'].dropna(),
+                (result['close'] / result['ma_20'] - 1).dropna()))
+        finally:
+            del INDICATORS['ma_distance']
+
+
+if __name__ == '__main__':
+    unittest.main()
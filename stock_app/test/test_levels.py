@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+import pandas as pd
+from stock_app.benchmark.synthetic import generate_panel
+from stock_app.src.levels import LevelDetector, cluster_levels, swing_points
+
+
+class TestLevels(unittest.TestCase):
+    def setUp(self):
+        # 在 90 與 110 之間震盪的價格，每個高低點都觸及相同價位
+        dates = pd.bdate_range(start='2023-01-02', periods=200)
+        close = 100 + 10 * np.sin(np.arange(200) * 2 * np.pi / 40)
+        self.df = pd.DataFrame({'open': close, 'high': close + 0.5,
+                                'low': close - 0.5, 'close': close,
+                                'volume': 1000}, index=dates)
+
+    def test_swing_points(self):
+        """測試擺動高低點"""
+        highs, lows = swing_points(self.df, 5)
+        self.assertEqual(list(np.flatnonzero(highs)), [10, 50, 90, 130, 170])
+        self.assertEqual(list(np.flatnonzero(lows)), [30, 70, 110, 150, 190])
+
+    def test_flat_top(self):
+        """測試相鄰 K 線的最高價/最低價相同時只算一個擺動點"""
+        df = self.df.copy()
+        df.iloc[11, df.columns.get_loc('high')] = df['high'].iloc[10]
+        df.iloc[31:33, df.columns.get_loc('low')] = df['low'].iloc[30]
+        highs, lows = swing_points(df, 5)
+        self.assertEqual(list(np.flatnonzero(highs)), [10, 50, 90, 130, 170])
+        self.assertEqual(list(np.flatnonzero(lows)), [30, 70, 110, 150, 190])
+
+    def test_cluster_levels(self):
+        """測試價位聚合不會因價格連續分佈而過寬"""
+        prices = np.array([100.0, 100.5, 101.2, 101.9, 102.6, 110.0])
+        levels = cluster_levels(prices, np.arange(6), 0.01)
+        self.assertEqual(list(levels['touches']), [2, 2, 1, 1])
+        self.assertAlmostEqual(levels['level'].iloc[0], 100.25)
+        self.assertEqual(levels['last'].iloc[0], 1)
+
+    def test_detect_and_summarize(self):
+        """測試多次觸及價位與最新支撐阻力"""
+        detector = LevelDetector()
+        levels = detector.detect(self.df)
+        self.assertEqual(len(levels), 2)
+        self.assertEqual(set(levels['touches']), {5})
+
+        summary = detector.summarize(self.df)
+        self.assertAlmostEqual(summary['resistance'][0]['level'], 110.5)
+        self.assertAlmostEqual(summary['support'][0]['level'], 89.5)
+
+    def test_no_swing_points(self):
+        """測試 K 線太少沒有擺動點時返回空價位"""
+        summary = LevelDetector().summarize(self.df.iloc[:5])
+        self.assertEqual(summary, {'history': [], 'support': [],
+                                   'resistance': []})
+
+    def test_scan(self):
+        """測試對股票池批次偵測"""
+        frames = generate_panel(5, 2, seed=1)
+        result = LevelDetector().scan(frames)
+        self.assertEqual(set(result['symbol']), set(frames))
+        self.assertTrue((result['touches'] >= 2).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import queue
+import logging
+import unittest
+import tempfile
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from logging.handlers import QueueListener
+from stock_app.src.utils.logger import _build_handlers, _LazyQueueHandler, \
+    setup_worker_logging
+
+
+def _log_in_worker(symbol: str) -> None:
+    logging.getLogger('stock_analysis.test_worker').warning(
+        "匯入 %s 失敗", symbol)
+
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_config = {
+            'formatters': {'plain': {'format': '%(levelname)s %(message)s'}},
+            'handlers': {
+                'file': {
+                    'class': 'logging.handlers.RotatingFileHandler',
+                    'level': 'WARNING',
+                    'formatter': 'plain',
+                    'maxBytes': 1024,
+                    'backupCount': 1,
+                    'encoding': 'utf-8'
+                }
+            }
+        }
+
+    def test_handlers_from_config(self):
+        """測試依配置建立處理器並寫入默認日誌文件"""
+        log_file = Path(self.temp_dir) / 'test.log'
+        handlers = _build_handlers(self.log_config, ['file'], log_file)
+        self.assertEqual(handlers[0].level, logging.WARNING)
+        self.assertEqual(handlers[0].maxBytes, 1024)
+        self.assertEqual(Path(handlers[0].baseFilename), log_file)
+        handlers[0].close()
+
+    def test_queue_listener_writes_lazily(self):
+        """測試記錄入隊時不格式化，由監聽線程寫出"""
+        log_file = Path(self.temp_dir) / 'test.log'
+        handlers = _build_handlers(self.log_config, ['file'], log_file)
+        log_queue = queue.Queue()
+        listener = QueueListener(log_queue, *handlers,
+                                 respect_handler_level=True)
+
+        logger = logging.getLogger('stock_analysis.test_queue')
+        logger.propagate = False
+        logger.addHandler(_LazyQueueHandler(log_queue))
+
+        logger.warning("價格 %s", 100)
+        record = log_queue.get_nowait()
+        # 入隊的記錄保留原始參數
+        self.assertEqual(record.args, (100,))
+        log_queue.put(record)
+        logger.info("不應寫入")
+
+        listener.start()
+        listener.stop()
+        for handler in handlers:
+            handler.close()
+        self.assertEqual(log_file.read_text(encoding='utf-8'),
+                         "WARNING 價格 100\n")
+
+    def test_worker_process_logging(self):
+        """測試工作進程以 setup_worker_logging 將記錄送回主進程的隊列"""
+        log_queue = multiprocessing.Queue()
+        with ProcessPoolExecutor(max_workers=1,
+                                 initializer=setup_worker_logging,
+                                 initargs=(log_queue,)) as executor:
+            executor.submit(_log_in_worker, '2330').result()
+
+        record = log_queue.get(timeout=5)
+        self.assertEqual(record.name, 'stock_analysis.test_worker')
+        self.assertEqual(record.getMessage(), "匯入 2330 失敗")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
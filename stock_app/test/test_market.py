@@ -0,0 +1,62 @@
+import unittest
+import pandas as pd
+import numpy as np
+from stock_app.src.market import rolling_beta, beta_and_correlation, \
+    to_returns
+
+
+class TestMarket(unittest.TestCase):
+    def setUp(self):
+        # 創建測試數據: 個股報酬率 = beta * 市場報酬率 + 噪音
+        rng = np.random.default_rng(0)
+        dates = pd.bdate_range(start='2023-01-02', periods=300)
+        self.market = pd.Series(rng.normal(0, 0.01, len(dates)), index=dates)
+        self.returns = pd.DataFrame({
+            'a': 1.5 * self.market + rng.normal(0, 0.002, len(dates)),
+            'b': 0.5 * self.market + rng.normal(0, 0.002, len(dates))
+        }, index=dates)
+
+    def test_rolling_beta_matches_pandas(self):
+        """測試滾動貝塔與 pandas 逐窗口計算一致"""
+        window = 60
+        beta, corr = rolling_beta(self.returns, self.market, window)
+
+        for col in self.returns.columns:
+            expected_beta = (
+                self.returns[col].rolling(window).cov(self.market) /
+                self.market.rolling(window).var()
+            )
+            expected_corr = self.returns[col].rolling(window).corr(
+                self.market)
+            np.testing.assert_allclose(beta[col], expected_beta,
+                                       rtol=1e-6, equal_nan=True)
+            np.testing.assert_allclose(corr[col], expected_corr,
+                                       rtol=1e-6, equal_nan=True)
+
+    def test_missing_values(self):
+        """測試窗口內有缺失值時不輸出"""
+        returns = self.returns.copy()
+        returns.iloc[100, 0] = np.nan
+        beta, _ = rolling_beta(returns, self.market, 20)
+        self.assertTrue(beta['a'].iloc[100:120].isna().all())
+        self.assertFalse(np.isnan(beta['a'].iloc[120]))
+        self.assertFalse(beta['b'].iloc[100:120].isna().any())
+
+    def test_full_period_beta(self):
+        """測試全期間貝塔與相關係數"""
+        beta, corr = beta_and_correlation(self.returns['a'], self.market)
+        self.assertAlmostEqual(beta, 1.5, delta=0.05)
+        self.assertGreater(corr, 0.95)
+
+    def test_to_returns_removes_timezone(self):
+        """測試報酬率索引統一為無時區日期"""
+        index = pd.date_range('2023-01-02', periods=5, freq='D',
+                              tz='Asia/Taipei')
+        returns = to_returns(pd.Series([1.0, 2.0, 1.0, 1.0, 2.0],
+                                       index=index))
+        self.assertIsNone(returns.index.tz)
+        self.assertEqual(returns.iloc[1], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
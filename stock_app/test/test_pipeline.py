@@ -0,0 +1,98 @@
+import time
+import threading
+import unittest
+from stock_app.src.pipeline import Stage, StagedPipeline
+
+
+class TestStagedPipeline(unittest.TestCase):
+    def test_stages_in_order(self):
+        """測試項目依序通過所有階段"""
+        pipeline = StagedPipeline([
+            Stage('a', lambda x: [x], workers=2),
+            Stage('b', lambda x: x + ['b'], workers=2),
+            Stage('c', lambda x: x + ['c'])
+        ])
+        seen = []
+        pipeline.stages[-1].func = lambda x: seen.append(x + ['c']) or True
+
+        summary = pipeline.run(['1', '2', '3'],
+                               key_func=lambda x: x if isinstance(x, str)
+                               else x[0])
+
+        self.assertEqual(sorted(seen), [['1', 'b', 'c'], ['2', 'b', 'c'],
+                                        ['3', 'b', 'c']])
+        self.assertEqual(summary['done'], ['1', '2', '3'])
+        self.assertEqual(summary['failed'], [])
+
+    def test_failure_drops_item(self):
+        """測試中間階段失敗或返回 None 的項目不再往下傳遞"""
+        calls = []
+
+        def middle(x):
+            if x == 2:
+                raise ValueError('壞數據')
+            return None if x == 3 else x
+
+        pipeline = StagedPipeline([
+            Stage('collect', lambda x: x),
+            Stage('compute', middle),
+            Stage('render', lambda x: calls.append(x) or True)
+        ])
+        summary = pipeline.run([1, 2, 3, 4])
+
+        self.assertEqual(sorted(calls), [1, 4])
+        self.assertEqual(summary['done'], ['1', '4'])
+        self.assertEqual(summary['failed'], ['2', '3'])
+        self.assertIn('compute', pipeline.failures['2'])
+        self.assertEqual(summary['stages']['compute']['failed'], 2)
+        self.assertEqual(summary['stages']['render']['items'], 2)
+
+    def test_backpressure_bounds_queue(self):
+        """測試下游緩慢時隊列深度不超過隊列長度，上游等待"""
+        release = threading.Event()
+        pipeline = StagedPipeline([
+            Stage('fast', lambda x: x, queue_size=2),
+            Stage('slow', lambda x: release.wait() and x, queue_size=3)
+        ])
+        threading.Timer(0.2, release.set).start()
+        summary = pipeline.run(range(20))
+
+        self.assertEqual(len(summary['done']), 20)
+        for stats in summary['stages'].values():
+            self.assertLessEqual(stats['max_depth'], stats['queue_size'])
+        self.assertGreater(summary['stages']['fast']['blocked'], 0.1)
+
+    def test_stages_overlap(self):
+        """測試各階段同時處理不同項目"""
+        def sleep(x):
+            time.sleep(0.05)
+            return x
+
+        pipeline = StagedPipeline([Stage('io', sleep), Stage('cpu', sleep),
+                                   Stage('out', sleep)])
+        summary = pipeline.run(range(6))
+
+        # 串行需 6 x 3 x 0.05 秒，管線約為 (6 + 2) x 0.05 秒
+        self.assertLess(summary['elapsed'], 0.7)
+        for stats in summary['stages'].values():
+            self.assertEqual(stats['items'], 6)
+            self.assertGreater(stats['utilization'], 0.5)
+            self.assertLessEqual(stats['utilization'], 1.0)
+
+    def test_from_config(self):
+        """測試依配置順序建立階段"""
+        config = {'pipeline': {'stages': {
+            'collect': {'workers': 3, 'queue_size': 5},
+            'render': {'workers': 1, 'queue_size': 2}
+        }}}
+        pipeline = StagedPipeline.from_config(
+            {'render': str, 'collect': str}, config)
+
+        self.assertEqual([s.name for s in pipeline.stages],
+                         ['collect', 'render'])
+        self.assertEqual(pipeline.stages[0].workers, 3)
+        self.assertEqual(pipeline.stages[1].queue_size, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import pandas as pd
+from stock_app.src.portfolio import PortfolioRisk, cholesky_factor, \
+    historical_var, monte_carlo_var, parametric_var
+
+
+class TestPortfolio(unittest.TestCase):
+    def setUp(self):
+        self.weights = np.array([0.5, 0.3, 0.2])
+        self.mean = np.array([0.0005, 0.0003, 0.0001])
+        self.cov = np.array([[4.0, 1.2, 0.6],
+                             [1.2, 2.25, 0.45],
+                             [0.6, 0.45, 1.0]]) * 1e-4
+
+    def test_parametric_components(self):
+        """測試成分風險加總等於組合風險"""
+        result = parametric_var(self.weights, self.mean, self.cov, 0.95)
+        self.assertAlmostEqual(result['component_var'].sum(), result['var'])
+        self.assertAlmostEqual(result['component_volatility'].sum(),
+                               result['volatility'])
+        self.assertGreater(result['cvar'], result['var'])
+
+    def test_monte_carlo_matches_parametric(self):
+        """測試分批蒙地卡羅結果接近常態解析解，且與批次大小無關"""
+        expected = parametric_var(self.weights, self.mean, self.cov, 0.95)
+        result = monte_carlo_var(self.weights, self.mean, self.cov, 0.95,
+                                 200000, 30000, seed=1)
+        self.assertAlmostEqual(result['var'], expected['var'], delta=2e-4)
+        self.assertAlmostEqual(result['cvar'], expected['cvar'], delta=3e-4)
+        self.assertAlmostEqual(result['component_cvar'].sum(),
+                               result['cvar'])
+
+        again = monte_carlo_var(self.weights, self.mean, self.cov, 0.95,
+                                200000, 30000, seed=1)
+        self.assertEqual(result['var'], again['var'])
+
+        rechunked = monte_carlo_var(self.weights, self.mean, self.cov, 0.95,
+                                    200000, 7000, seed=1)
+        self.assertAlmostEqual(rechunked['var'], result['var'], places=12)
+        self.assertAlmostEqual(rechunked['cvar'], result['cvar'], places=12)
+        np.testing.assert_allclose(rechunked['component_cvar'],
+                                   result['component_cvar'], rtol=1e-9)
+
+    def test_singular_covariance(self):
+        """測試非正定共變異數矩陣"""
+        cov = np.array([[1.0, 1.0], [1.0, 1.0]])
+        factor = cholesky_factor(cov)
+        np.testing.assert_allclose(factor @ factor.T, cov, atol=1e-12)
+
+    def test_historical(self):
+        """測試歷史法 VaR 與 CVaR"""
+        returns = np.linspace(-0.05, 0.05, 101)
+        var, cvar = historical_var(returns, 0.95)
+        self.assertAlmostEqual(var, 0.045)
+        self.assertGreater(cvar, var)
+
+    def test_analyze(self):
+        """測試組合風險報告"""
+        rng = np.random.default_rng(0)
+        dates = pd.bdate_range(start='2023-01-02', periods=300)
+        shocks = rng.multivariate_normal(self.mean, self.cov, 300)
+        prices = {symbol: pd.Series(100 * np.cumprod(1 + shocks[:, i]),
+                                    index=dates)
+                  for i, symbol in enumerate(['2330', '2317', '2357'])}
+
+        risk = PortfolioRisk().analyze(
+            prices, {'2330': 5, '2317': 3, '2357': 2, '9999': 1},
+            n_paths=50000)
+        self.assertEqual(list(risk['holdings'].index),
+                         ['2330', '2317', '2357'])
+        self.assertAlmostEqual(risk['holdings']['weight'].sum(), 1.0)
+        self.assertAlmostEqual(
+            risk['holdings']['pct_contribution'].sum(), 1.0)
+        self.assertEqual(risk['observations'], 299)
+
+
+if __name__ == '__main__':
+    unittest.main()
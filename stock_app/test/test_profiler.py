@@ -0,0 +1,82 @@
+import unittest
+import tempfile
+import shutil
+import threading
+import tracemalloc
+from pathlib import Path
+from stock_app.src.utils.profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.profiler = Profiler()
+
+    def test_disabled_records_nothing(self):
+        """測試停用時不記錄"""
+        with self.profiler.span('process') as span:
+            span.rows = 10
+        self.assertEqual(self.profiler.summary(), {})
+
+    def test_nested_spans_aggregate(self):
+        """測試巢狀區段與跨股票累計"""
+        self.profiler.configure(True, trace_memory=True)
+        for _ in range(2):
+            with self.profiler.span('process', rows=100):
+                with self.profiler.span('process.rsi') as span:
+                    data = [0] * 100000
+                    span.rows = len(data)
+                    del data
+
+        summary = self.profiler.summary()
+        self.assertEqual(summary['process']['count'], 2)
+        self.assertEqual(summary['process']['rows_total'], 200)
+        self.assertEqual(summary['process.rsi']['rows_total'], 200000)
+        # 外層峰值至少包含內層峰值
+        self.assertGreaterEqual(summary['process']['peak_memory_max'],
+                                summary['process.rsi']['peak_memory_max'])
+        self.assertGreater(summary['process.rsi']['peak_memory_max'], 0)
+
+    def test_worker_thread_skips_memory(self):
+        """測試非主執行緒的區段不重設進程共用的峰值記憶體"""
+        self.profiler.configure(True, trace_memory=True)
+
+        def worker():
+            with self.profiler.span('worker'):
+                pass
+
+        with self.profiler.span('main'):
+            data = [0] * 100000
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            del data
+
+        summary = self.profiler.summary()
+        self.assertEqual(summary['worker']['count'], 1)
+        self.assertEqual(summary['worker']['memory_samples'], 0)
+        self.assertEqual(summary['main']['memory_samples'], 1)
+        self.assertGreater(summary['main']['peak_memory_max'], 800000)
+
+    def test_export(self):
+        """測試 JSON 與 Prometheus 輸出"""
+        self.profiler.configure(True, trace_memory=False)
+        with self.profiler.span('chart.price'):
+            pass
+        path = Path(self.temp_dir)
+        self.profiler.export_json(path / 'profile.json')
+        self.profiler.export_prometheus(path / 'profile.prom')
+
+        text = (path / 'profile.prom').read_text(encoding='utf-8')
+        self.assertIn('stock_analysis_span_calls_total{span="chart.price"} 1',
+                      text)
+        self.assertIn('# TYPE stock_analysis_span_wall_seconds_total counter',
+                      text)
+
+    def tearDown(self):
+        tracemalloc.stop()
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from stock_app.benchmark.synthetic import generate_panel
+from stock_app.src.ranking import (RelativeStrength, composite_score,
+                                   percentile_ranks)
+from stock_app.src.results_store import ResultStore
+
+
+class TestRanking(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.frames = generate_panel(12, 1, seed=5)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_composite_renormalizes_weights(self):
+        """測試缺少某期間排名時以其餘權重計算綜合分數"""
+        short = percentile_ranks(pd.DataFrame([[1.0, 2.0, 3.0]]))
+        long = pd.DataFrame([[np.nan, np.nan, np.nan]])
+        score = composite_score({'short_term': short, 'long_term': long},
+                                {'short_term': 0.2, 'long_term': 0.8})
+        pd.testing.assert_frame_equal(score, short)
+
+    def test_rank_matches_per_date_sort(self):
+        """測試面板排名與逐日排序一致"""
+        table = RelativeStrength().rank(self.frames)
+        self.assertEqual(table['short_term'].dtype, np.uint8)
+        self.assertEqual(table['composite'].dtype, np.uint16)
+
+        date = table.index.get_level_values('date').max()
+        day = table.xs(date, level='date')
+        medium = {symbol: df['close'].iloc[-1] / df['close'].iloc[-21] - 1
+                  for symbol, df in self.frames.items()}
+        best = max(medium, key=medium.get)
+        self.assertEqual(day['medium_term'].idxmax(), best)
+        self.assertEqual(day['medium_term'].max(), 100)
+        self.assertEqual(len(day), len(self.frames))
+
+    def test_top_lookup(self):
+        """測試寫入後以索引查詢某日前 N 名"""
+        strength = RelativeStrength()
+        table = strength.rank(self.frames, since='1995-06-01')
+        store = ResultStore(f'{self.tmp_dir}/results.db')
+        self.assertEqual(store.write_ranks(table), len(table))
+
+        top = store.top_ranked(3)
+        date = table.index.get_level_values('date').max()
+        expected = strength.top(table, date, 3)
+        self.assertEqual(list(top['symbol']), list(expected.index))
+        self.assertEqual(top['bar_date'].iloc[0], date.strftime('%Y-%m-%d'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import tempfile
+import shutil
+import numpy as np
+from pathlib import Path
+from stock_app.src.results_store import (ResultStore, flatten_results,
+                                         results_frame, trend_direction)
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = ResultStore(db_path=Path(self.temp_dir) / 'results.db')
+
+    def _record(self, symbol, date, rsi):
+        return {
+            'symbol': symbol,
+            'analysis_date': date,
+            'name': symbol,
+            'trend': 'up',
+            'results': {
+                'technical_analysis': {'rsi': rsi, 'rsi_status': 'neutral'},
+                'pattern_analysis': {'doji': True},
+                'risk_analysis': {'beta': np.nan}
+            }
+        }
+
+    def test_flatten_results(self):
+        """測試只保留數值欄位"""
+        flat = flatten_results(self._record('2330', '2024-01-02', 55.0)
+                               ['results'])
+        self.assertEqual(flat['technical_analysis.rsi'], 55.0)
+        self.assertEqual(flat['pattern_analysis.doji'], 1.0)
+        self.assertIsNone(flat['risk_analysis.beta'])
+        self.assertNotIn('technical_analysis.rsi_status', flat)
+
+    def test_trend_direction(self):
+        """測試由配置期間的趨勢分析取出方向"""
+        results = {'trend_analysis': {'20d_trend': {'direction': 'down',
+                                                    'change_percent': -3.0}}}
+        self.assertEqual(trend_direction(results, 20), 'down')
+        self.assertEqual(trend_direction(results, 60), 'Unknown')
+        self.assertEqual(trend_direction({'trend_analysis': None}, 20),
+                         'Unknown')
+
+    def test_results_frame(self):
+        """測試多筆結果轉為每支股票一列的數值表格"""
+        records = [self._record('2330', '2024-01-02', 55.0),
+                   self._record('2317', '2024-01-03', 40.0)]
+        records[1]['results']['volume_analysis'] = {'relative_volume': 1.5}
+        frame = results_frame(records)
+
+        self.assertEqual(list(frame.index), ['2330', '2317'])
+        self.assertEqual(frame.loc['2317', 'technical_analysis.rsi'], 40.0)
+        self.assertTrue(np.isnan(frame.loc['2330',
+                                           'volume_analysis.relative_volume']))
+        self.assertTrue(np.isnan(frame.loc['2330', 'risk_analysis.beta']))
+        self.assertNotIn('technical_analysis.rsi_status', frame.columns)
+        self.assertTrue(all(dtype == float for dtype in frame.dtypes[1:]))
+
+    def test_latest_metric(self):
+        """測試每支股票的最新指標查詢"""
+        self.store.write_many([
+            self._record('2330', '2024-01-02', 40.0),
+            self._record('2330', '2024-01-03', 45.0),
+            self._record('2317', '2024-01-02', 60.0),
+        ])
+        latest = self.store.latest('technical_analysis.rsi')
+        self.assertEqual(list(latest['symbol']), ['2317', '2330'])
+        self.assertEqual(list(latest['value']), [60.0, 45.0])
+
+    def test_rerun_overwrites_same_day(self):
+        """測試同一分析日重跑時覆蓋結果"""
+        self.store.write_many([self._record('2330', '2024-01-02', 40.0)])
+        self.store.write_many([self._record('2330', '2024-01-02', 50.0)])
+        history = self.store.history('2330', ['technical_analysis.rsi'])
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history['technical_analysis.rsi'].iloc[0], 50.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
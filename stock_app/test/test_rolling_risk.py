@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+import pandas as pd
+from stock_app.src.rolling_risk import rolling_max_drawdown, rolling_risk, \
+    rolling_sharpe, rolling_var, rolling_volatility
+
+
+class TestRollingRisk(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        dates = pd.bdate_range(start='2023-01-02', periods=400)
+        self.prices = pd.DataFrame(
+            100 * np.cumprod(1 + rng.normal(0, 0.02, (400, 3)), axis=0),
+            index=dates, columns=['2330', '2317', '2357'])
+        # 第三支股票前段缺值
+        self.prices.iloc[:50, 2] = np.nan
+        self.returns = self.prices.pct_change()
+        self.window = 30
+
+    def test_volatility_and_sharpe(self):
+        """測試滾動波動率與夏普比率與逐窗口計算一致"""
+        vol = rolling_volatility(self.returns, self.window)
+        expected = self.returns.rolling(self.window).std() * np.sqrt(252)
+        pd.testing.assert_frame_equal(vol, expected, atol=1e-10)
+
+        sharpe = rolling_sharpe(self.returns['2330'], self.window, 0.02)
+        r = self.returns['2330']
+        naive = np.sqrt(252) * (r.rolling(self.window).mean() - 0.02 / 252) \
+            / r.rolling(self.window).std()
+        pd.testing.assert_series_equal(sharpe, naive, atol=1e-8,
+                                       check_names=False)
+
+    def test_max_drawdown(self):
+        """測試滾動最大回撤與逐窗口的定義一致"""
+        prices = self.prices['2330']
+        result = rolling_max_drawdown(prices, self.window)
+        values = prices.to_numpy()
+        w = self.window
+        for t in range(w - 1, len(values)):
+            x = values[t - w + 1:t + 1]
+            worst = (x / np.maximum.accumulate(x) - 1).min()
+            self.assertAlmostEqual(result.iloc[t], worst)
+        self.assertTrue(result.iloc[:w - 1].isna().all())
+
+        # 窗口 [50, 60, 70] 內沒有回撤，不應混入窗口外的高點
+        drawdown = rolling_max_drawdown(
+            pd.Series([100.0, 50, 60, 70, 80, 90]), 3)
+        np.testing.assert_allclose(drawdown.to_numpy()[2:],
+                                   [-0.5, 0.0, 0.0, 0.0])
+
+        # 包含缺值的窗口為 NaN
+        panel = rolling_max_drawdown(self.prices, w)
+        self.assertTrue(panel['2357'].iloc[:50 + w - 1].isna().all())
+        self.assertFalse(panel['2357'].iloc[50 + w - 1:].isna().any())
+
+    def test_var_and_panel(self):
+        """測試滾動 VaR 與面板輸出"""
+        var = rolling_var(self.returns, self.window, 0.95)
+        t = 200
+        expected = np.quantile(self.returns['2317'].iloc[t - 29:t + 1], 0.05)
+        self.assertAlmostEqual(var['2317'].iloc[t], expected)
+
+        panel = rolling_risk(self.prices, self.window)
+        self.assertEqual(set(panel), {'volatility', 'sharpe_ratio',
+                                      'max_drawdown', 'var'})
+        self.assertEqual(panel['volatility'].shape, self.prices.shape)
+        single = rolling_risk(self.prices['2330'], self.window)
+        self.assertEqual(list(single.columns), list(panel))
+
+
+if __name__ == '__main__':
+    unittest.main()
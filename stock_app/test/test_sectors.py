@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from stock_app.benchmark.synthetic import generate_ohlcv
+from stock_app.src.analyze import Analyzer
+from stock_app.src.sectors import (SectorIndexer, aggregate_index,
+                                   group_key, group_returns)
+from stock_app.src.store import PriceStore
+
+
+class TestSectors(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = PriceStore(self.tmp_dir)
+        self.frames = {symbol: generate_ohlcv(300, seed=i)
+                       for i, symbol in enumerate(['2330', '2303', '2317'])}
+        for symbol, sector, industry, cap in [
+                ('2330', 'Technology', 'Semiconductors', 3e12),
+                ('2303', 'Technology', 'Semiconductors', 1e12),
+                ('2317', 'Technology', 'Electronic Components', 2e12)]:
+            self.store.save_metadata({'symbol': symbol, 'name': symbol,
+                                      'sector': sector, 'industry': industry,
+                                      'market_cap': cap, 'currency': 'TWD'})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_group_returns(self):
+        """測試分組加權報酬率，缺值時以當天有數據的成分股正規化"""
+        returns = pd.DataFrame({'a': [0.01, np.nan], 'b': [0.03, 0.02],
+                                'c': [0.05, 0.05]})
+        result = group_returns(returns, pd.Series({'a': 1, 'b': 3, 'c': 1}),
+                               pd.Series({'a': 'x', 'b': 'x', 'c': 'y'}))
+        self.assertAlmostEqual(result.loc[0, 'x'], 0.025)
+        self.assertAlmostEqual(result.loc[1, 'x'], 0.02)
+        self.assertAlmostEqual(result.loc[1, 'y'], 0.05)
+
+    def test_aggregate_index(self):
+        """測試指數收盤與成分股市值加權報酬率一致"""
+        labels = pd.Series('g', index=['2330', '2303'])
+        weights = pd.Series({'2330': 3.0, '2303': 1.0})
+        frames = {s: self.frames[s] for s in labels.index}
+        index = aggregate_index(frames, weights, labels)['g']
+
+        expected = (frames['2330']['close'].pct_change() * 0.75 +
+                    frames['2303']['close'].pct_change() * 0.25)
+        np.testing.assert_allclose(index['close'].pct_change().iloc[1:],
+                                   expected.iloc[1:])
+        self.assertEqual(index['close'].iloc[0], 100.0)
+        self.assertTrue((index['high'] >= index[['open', 'close']].max(
+            axis=1)).all())
+
+    def test_incremental_build_matches_full(self):
+        """測試增量更新與完整重建一致"""
+        indexer = SectorIndexer(self.store)
+        indexer.build({s: df.iloc[:200] for s, df in self.frames.items()})
+        incremental = indexer.build(self.frames)
+
+        other = PriceStore(f'{self.tmp_dir}/full')
+        for symbol in self.frames:
+            other.save_metadata(self.store.metadata(symbol))
+        full = SectorIndexer(other).build(self.frames)
+
+        self.assertEqual(set(incremental), {'sector@Technology',
+                                            'industry@Semiconductors'})
+        for key in incremental:
+            np.testing.assert_allclose(incremental[key].to_numpy(),
+                                       full[key].to_numpy(), rtol=1e-9)
+
+    def test_sector_analysis(self):
+        """測試個股只讀取所屬產業指數進行比較"""
+        indexer = SectorIndexer(self.store)
+        indexer.build(self.frames)
+        sector = indexer.load('2330')
+        self.assertEqual(sector.attrs['name'], 'Semiconductors')
+        self.assertTrue(self.store.exists(group_key('industry',
+                                                    'Semiconductors')))
+
+        df = self.frames['2330']
+        metrics = Analyzer()._sector_analysis(df, sector)
+        expected = df['close'].iloc[-1] / df['close'].iloc[-21] - \
+            sector['close'].iloc[-1] / sector['close'].iloc[-21]
+        self.assertAlmostEqual(metrics['excess_return_20d'], expected)
+        self.assertGreater(metrics['correlation'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import pandas as pd
+from stock_app.src.service import StockService
+
+
+class FakeStockAnalyzer:
+    """只返回固定結果的 StockAnalyzer 替身"""
+    def __init__(self):
+        self.calls = 0
+
+    def prepare(self, symbol):
+        self.calls += 1
+        dates = pd.date_range('2024-01-01', periods=3)
+        rsi = {'2330': 25.0, '2317': 65.0}.get(symbol)
+        if rsi is None:
+            return None
+        return {
+            'info': {'name': symbol},
+            'processed': pd.DataFrame({'rsi': [rsi - 2, rsi - 1, rsi]},
+                                      index=dates),
+            'analysis': {'technical_analysis': {'rsi': rsi}},
+            'analyze_key': ()
+        }
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.stock_analyzer = FakeStockAnalyzer()
+        config = {'service': {'host': '127.0.0.1', 'port': 0,
+                              'refresh_minutes': 1}}
+        self.service = StockService(self.stock_analyzer, config)
+
+    def test_results_stay_warm(self):
+        """測試重複請求不重新計算"""
+        self.service.analyze('2330')
+        self.service.indicators('2330', ['rsi'], tail=2)
+        self.assertEqual(self.stock_analyzer.calls, 1)
+
+    def test_screen(self):
+        """測試指標篩選"""
+        result = self.service.screen(['technical_analysis.rsi<30'],
+                                     ['2330', '2317', '9999'])
+        self.assertEqual([m['symbol'] for m in result['matches']], ['2330'])
+
+
+if __name__ == '__main__':
+    unittest.main()
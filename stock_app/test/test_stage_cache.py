@@ -0,0 +1,96 @@
+import os
+import time
+import unittest
+import tempfile
+import shutil
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from stock_app.src.stage_cache import StageCache, fingerprint_frame
+
+
+class TestStageCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = StageCache(cache_dir=self.temp_dir, max_size_mb=1)
+
+    def test_memoize_hit_and_miss(self):
+        """測試相同輸入只計算一次"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'value': 1}
+
+        first = self.cache.memoize('process', ('a', 'b'), compute)
+        second = self.cache.memoize('process', ('a', 'b'), compute)
+        self.cache.memoize('process', ('a', 'c'), compute)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.cache.summary()['process'],
+                         {'hits': 1, 'misses': 2})
+
+    def test_none_not_cached(self):
+        """測試失敗結果不緩存"""
+        self.cache.memoize('analyze', ('x',), lambda: None)
+        self.cache.memoize('analyze', ('x',), lambda: None)
+        self.assertEqual(self.cache.summary()['analyze']['misses'], 2)
+
+    def test_lru_eviction(self):
+        """測試超過容量時淘汰最久未使用的項目"""
+        payload = np.zeros(40000)  # 約 320KB
+        for name in ['a', 'b', 'c']:
+            self.cache.memoize('stage', (name,), lambda: payload)
+            time.sleep(0.01)
+        # 存取 a 使其成為最近使用
+        self.cache.memoize('stage', ('a',), lambda: payload)
+        time.sleep(0.01)
+        self.cache.memoize('stage', ('d',), lambda: payload)
+
+        remaining = {os.path.basename(p)[:-4]
+                     for _, _, files in os.walk(self.temp_dir)
+                     for p in files}
+        self.assertIn(self.cache.key('stage', 'a'), remaining)
+        self.assertNotIn(self.cache.key('stage', 'b'), remaining)
+
+    def test_put_same_key_keeps_size(self):
+        """測試覆寫同一個鍵時累計容量不重複計算"""
+        payload = np.zeros(1000)
+        self.cache.put('key', payload)
+        size = self.cache._total_bytes
+        for _ in range(3):
+            self.cache.put('key', payload)
+        self.assertEqual(self.cache._total_bytes, size)
+        self.assertEqual(self.cache._total_bytes, self.cache._size())
+
+    def test_concurrent_memoize(self):
+        """測試多線程同時讀寫時統計與容量計數一致"""
+        payload = np.zeros(1000)
+
+        def work(worker):
+            for i in range(50):
+                self.cache.memoize('stage', (str(worker), str(i % 10)),
+                                   lambda: payload)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(8)))
+
+        self.assertEqual(self.cache.summary()['stage'],
+                         {'hits': 320, 'misses': 80})
+        self.assertEqual(self.cache._total_bytes, self.cache._size())
+
+    def test_fingerprint_changes_with_data(self):
+        """測試數據變更時指紋不同"""
+        df = pd.DataFrame({'close': [1.0, 2.0, 3.0]})
+        changed = df.copy()
+        changed.iloc[-1, 0] = 3.5
+        self.assertEqual(fingerprint_frame(df), fingerprint_frame(df.copy()))
+        self.assertNotEqual(fingerprint_frame(df), fingerprint_frame(changed))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
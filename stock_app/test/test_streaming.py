@@ -0,0 +1,81 @@
+import unittest
+import asyncio
+import tempfile
+import shutil
+from pathlib import Path
+import numpy as np
+from stock_app.benchmark.synthetic import generate_ohlcv, generate_ticks
+from stock_app.src.process import Processor
+from stock_app.src.streaming import BarAggregator, StreamPipeline, \
+    SymbolState, load_stream_params, parse_record, write_replay
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.processor = Processor()
+
+    def test_incremental_matches_processor(self):
+        """測試增量指標與 Processor 的計算結果一致"""
+        df = generate_ohlcv(300, seed=5)
+        expected = self.processor.process(df)
+        state = SymbolState('9000', load_stream_params(
+            self.processor.config))
+
+        rows = {}
+        for ts, row in df.iterrows():
+            bar = row.to_dict()
+            bar['ts'] = ts
+            state.update(bar)
+            rows[ts] = bar['indicators']
+
+        for column in ('ma_20', 'ma_120', 'macd', 'signal', 'rsi',
+                       'bb_upper', 'atr'):
+            streamed = np.array([rows[ts][column] for ts in expected.index])
+            np.testing.assert_allclose(streamed, expected[column].values,
+                                       rtol=1e-7, err_msg=column)
+
+    def test_bar_aggregation(self):
+        """測試逐筆記錄聚合為分鐘 K 線"""
+        aggregator = BarAggregator(60)
+        records = [parse_record(line) for line in (
+            'symbol,ts,price,volume',
+            'A,0,10,100', 'B,5,20,100', 'A,30,12,50', 'A,59,9,10',
+            'A,61,11,10', '{"symbol": "B", "ts": 130, "price": 21}'
+        )]
+        closed = []
+        for record in filter(None, records):
+            closed.extend(aggregator.add(record))
+
+        bars = {(bar['symbol'], bar['ts']): bar for bar in closed}
+        self.assertEqual(bars[('A', 0)]['high'], 12)
+        self.assertEqual(bars[('A', 0)]['low'], 9)
+        self.assertEqual(bars[('A', 0)]['close'], 9)
+        self.assertEqual(bars[('A', 0)]['volume'], 160)
+        # B 在第一分鐘後沒有記錄，時間推進時仍然收盤
+        self.assertIn(('B', 0), bars)
+        self.assertIn(('A', 60), bars)
+        self.assertEqual(len(aggregator.flush()), 1)
+
+    def test_replay_pipeline(self):
+        """測試回放管線在小隊列下完成並輸出訊號"""
+        path = self.temp_dir / 'ticks.jsonl'
+        count = write_replay(path, generate_ticks(20, 240, seed=1))
+        signals = []
+        pipeline = StreamPipeline(sink=signals.append, queue_size=8)
+
+        summary = asyncio.run(pipeline.run(
+            lambda queue: pipeline.replay(path, queue, 0)))
+        self.assertEqual(summary['records'], count)
+        self.assertEqual(summary['bars'], 20 * 240)
+        self.assertEqual(summary['symbols'], 20)
+        self.assertEqual(summary['signals'], len(signals))
+        self.assertTrue(signals)
+        self.assertIn('latency_p99_ms', summary)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
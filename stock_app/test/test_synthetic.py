@@ -0,0 +1,34 @@
+import unittest
+import numpy as np
+from stock_app.benchmark.synthetic import generate_ohlcv, generate_panel
+
+
+class TestSynthetic(unittest.TestCase):
+    def test_seeded(self):
+        """測試相同種子生成相同數據"""
+        a = generate_ohlcv(500, seed=7)
+        b = generate_ohlcv(500, seed=7)
+        c = generate_ohlcv(500, seed=8)
+        self.assertTrue(a.equals(b))
+        self.assertFalse(a['close'].equals(c['close']))
+
+    def test_ohlc_consistency(self):
+        """測試高低價包住開收盤價"""
+        df = generate_ohlcv(2000, seed=1)
+        self.assertTrue((df['high'] >= np.maximum(df['open'],
+                                                  df['close'])).all())
+        self.assertTrue((df['low'] <= np.minimum(df['open'],
+                                                 df['close'])).all())
+        self.assertTrue((df['volume'] > 0).all())
+        self.assertTrue(df.index.is_monotonic_increasing)
+
+    def test_panel_shape(self):
+        """測試面板的股票數量與年數"""
+        panel = generate_panel(3, years=2, seed=0)
+        self.assertEqual(len(panel), 3)
+        self.assertTrue(all(len(df) == 500 for df in panel.values()))
+        self.assertTrue(all(symbol.isdigit() for symbol in panel))
+
+
+if __name__ == '__main__':
+    unittest.main()
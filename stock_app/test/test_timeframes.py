@@ -0,0 +1,89 @@
+import unittest
+from unittest import mock
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+from stock_app.benchmark.synthetic import generate_ohlcv
+from stock_app.src.store import PriceStore
+from stock_app.src.timeframes import TimeframeStore, aggregate_bars, \
+    update_bars
+
+
+class TestTimeframes(unittest.TestCase):
+    def setUp(self):
+        self.daily = generate_ohlcv(300, seed=3)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def test_aggregate_matches_resample(self):
+        """測試週 K 線與直接重採樣一致"""
+        bars = aggregate_bars(self.daily, 'W-FRI')
+        naive = self.daily.tz_localize(None)
+        expected = naive.resample('W-FRI').agg(
+            {'open': 'first', 'high': 'max', 'low': 'min',
+             'close': 'last', 'volume': 'sum'}).dropna()
+        self.assertEqual(len(bars), len(expected))
+        self.assertTrue((bars['high'].values == expected['high'].values)
+                        .all())
+        self.assertEqual(bars['volume'].sum(), self.daily['volume'].sum())
+        # 以週期內最後一個交易日為索引
+        self.assertEqual(bars.index[-1], self.daily.index[-1])
+
+    def test_incremental_update(self):
+        """測試增量更新與完整聚合相同"""
+        for freq in ('W-FRI', 'M'):
+            bars = aggregate_bars(self.daily.iloc[:203], freq)
+            for end in list(range(204, 300, 7)) + [300]:
+                bars = update_bars(self.daily.iloc[:end], bars, freq)
+            pd.testing.assert_frame_equal(
+                bars, aggregate_bars(self.daily, freq))
+
+    def test_longer_history_rebuilds(self):
+        """測試日 K 線歷史較已存儲的週期 K 線更早時整段重新聚合"""
+        bars = aggregate_bars(self.daily.iloc[100:], 'M')
+        pd.testing.assert_frame_equal(update_bars(self.daily, bars, 'M'),
+                                      aggregate_bars(self.daily, 'M'))
+
+    def test_store_round_trip(self):
+        """測試週期 K 線存儲後再次讀取更新"""
+        store = TimeframeStore(PriceStore(self.temp_dir))
+        store.bars('2330', self.daily.iloc[:250], 'M')
+        bars = store.bars('2330', self.daily, 'M')
+        expected = aggregate_bars(self.daily, 'M')
+        self.assertEqual(len(bars), len(expected))
+        self.assertEqual(bars['close'].iloc[-1], expected['close'].iloc[-1])
+        self.assertIs(store.bars('2330', self.daily, 'D'), self.daily)
+        self.assertIsNone(store.bars('2330', self.daily, 'X'))
+
+    def test_store_rewrites_tail_only(self):
+        """測試未變化時不寫入，有新 K 線時只改寫最後一個週期之後的行"""
+        prices = PriceStore(self.temp_dir)
+        store = TimeframeStore(prices)
+        store.bars('2330', self.daily.iloc[:250], 'W')
+        path = prices.path('2330@W')
+        before = path.read_bytes()
+
+        with mock.patch.object(prices, 'save') as save, \
+                mock.patch.object(prices, 'save_tail') as save_tail:
+            store.bars('2330', self.daily.iloc[:250], 'W')
+        save.assert_not_called()
+        save_tail.assert_not_called()
+
+        bars = store.bars('2330', self.daily, 'W')
+        after = path.read_bytes()
+        head = before[:before.rstrip(b'\n').rfind(b'\n') + 1]
+        self.assertTrue(after.startswith(head))
+        self.assertTrue(prices.verify('2330@W'))
+
+        expected = aggregate_bars(self.daily, 'W-FRI')
+        stored = prices.load('2330@W')
+        self.assertEqual(len(bars), len(expected))
+        self.assertEqual(len(stored), len(expected))
+        self.assertTrue(np.allclose(stored['close'], expected['close']))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from stock_app.src.collect import Collector
+from stock_app.src.store import PriceStore
+from stock_app.src.trading_calendar import TradingCalendar
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = TradingCalendar()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_trading_days(self):
+        """測試週末與休市日不是交易日"""
+        self.assertFalse(self.calendar.is_trading_day('2024-10-10'))
+        self.assertFalse(self.calendar.is_trading_day('2024-10-12'))
+        self.assertTrue(self.calendar.is_trading_day('2024-10-11'))
+        days = self.calendar.trading_days('2024-02-05', '2024-02-16')
+        self.assertEqual([d.day for d in days], [5, 15, 16])
+
+    def test_last_session(self):
+        """測試收盤前與休市日回到前一個交易日"""
+        tz = 'Asia/Taipei'
+        last = self.calendar.last_session
+        self.assertEqual(last(pd.Timestamp('2024-10-11 15:00', tz=tz)),
+                         pd.Timestamp('2024-10-11'))
+        self.assertEqual(last(pd.Timestamp('2024-10-11 10:00', tz=tz)),
+                         pd.Timestamp('2024-10-09'))
+        # 週日與連假都不會期待新的 K 線
+        self.assertEqual(last(pd.Timestamp('2024-02-11 20:00', tz=tz)),
+                         pd.Timestamp('2024-02-05'))
+        self.assertEqual(
+            self.calendar.expected_last_date(
+                '2024-10-14', pd.Timestamp('2024-10-20 09:00', tz=tz)),
+            pd.Timestamp('2024-10-11'))
+
+    def test_manifest(self):
+        """測試保存時記錄最後日期、行數與校驗碼"""
+        store = PriceStore(self.tmp_dir)
+        dates = pd.bdate_range('2024-10-01', '2024-10-09', tz='Asia/Taipei')
+        df = pd.DataFrame({'close': range(len(dates))}, index=dates)
+        store.save('2330', df)
+
+        entry = store.manifest('2330')
+        self.assertEqual(entry['last_date'], '2024-10-09')
+        self.assertEqual(entry['rows'], len(df))
+        self.assertTrue(store.verify('2330'))
+        store.path('2330').write_text('Date,close\n')
+        self.assertFalse(store.verify('2330'))
+
+    def test_stale_symbols(self):
+        """測試以清單判斷整個股票池的新鮮度"""
+        collector = Collector(data_dir=self.tmp_dir)
+        dates = pd.bdate_range('2024-10-01', '2024-10-09', tz='Asia/Taipei')
+        collector.store.save('2330', pd.DataFrame({'close': 1.0},
+                                                  index=dates))
+        collector.store.save('2317', pd.DataFrame({'close': 1.0},
+                                                  index=dates[:-1]))
+
+        # 10/10 國慶日休市，下載到 10/11 (不含) 應有的最後 K 線為 10/9
+        self.assertEqual(
+            collector.stale_symbols(['2330', '2317', '1101'], '2024-10-11'),
+            ['2317', '1101'])
+        self.assertEqual(
+            collector.stale_symbols(['2330', '2317'], '2024-10-09'), [])
+
+    def test_single_key_freshness(self):
+        """測試單一鍵的新鮮度只查詢該鍵的清單記錄"""
+        collector = Collector(data_dir=self.tmp_dir)
+        dates = pd.bdate_range('2024-10-01', '2024-10-09', tz='Asia/Taipei')
+        collector.store.save('2330', pd.DataFrame({'close': 1.0},
+                                                  index=dates))
+
+        with mock.patch.object(collector.store, 'manifest_frame') as frame:
+            self.assertFalse(collector.is_stale('2330', '2024-10-11'))
+            self.assertTrue(collector.is_stale('2330', '2024-10-15'))
+            self.assertTrue(collector.is_stale('1101', '2024-10-11'))
+            self.assertIsNone(collector._check_cache('1101', '2024-10-11'))
+        frame.assert_not_called()
+
+    def test_cache_covers_start_date(self):
+        """測試緩存的歷史晚於要求的起始日時不使用緩存"""
+        collector = Collector(data_dir=self.tmp_dir)
+        dates = pd.bdate_range('2023-01-03', '2024-10-09',
+                               tz='Asia/Taipei')
+        df = pd.DataFrame({'close': 1.0}, index=dates)
+
+        self.assertTrue(collector._covers(df, '2023-01-01'))
+        self.assertFalse(collector._covers(df, '2010-01-01'))
+        self.assertEqual(collector._since(df, '2024-01-01').index[0],
+                         pd.Timestamp('2024-01-01', tz='Asia/Taipei'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from stock_app.src.analyze import Analyzer
+from stock_app.src.process import Processor
+from stock_app.src.visual import Visualizer
+from stock_app.benchmark.synthetic import generate_ohlcv
+
+
+class TestVisualizer(unittest.TestCase):
+    def setUp(self):
+        self.visualizer = Visualizer()
+        self.processed = Processor().process(generate_ohlcv(300, seed=5))
+        self.results = Analyzer().analyze(self.processed)
+
+    def test_dashboard_charts(self):
+        """測試儀表板生成所有圖表"""
+        charts = self.visualizer.create_analysis_dashboard(self.processed,
+                                                           self.results)
+        self.assertIsNotNone(charts)
+        for name in ['price_chart', 'technical_indicators',
+                     'volume_analysis', 'pattern_analysis',
+                     'correlation_matrix']:
+            self.assertIn(name, charts)
+
+
+if __name__ == '__main__':
+    unittest.main()
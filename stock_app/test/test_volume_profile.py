@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+import pandas as pd
+from stock_app.src.volume_profile import VolumeProfile, value_area
+from stock_app.benchmark.synthetic import generate_ohlcv
+
+
+class TestVolumeProfile(unittest.TestCase):
+    def setUp(self):
+        self.df = generate_ohlcv(300, seed=3)
+        self.profile = VolumeProfile(self.df, bins=40)
+
+    def _direct(self, df):
+        """直接以 bincount 計算分佈作為對照"""
+        typical = ((df['high'] + df['low'] + df['close']) / 3).to_numpy()
+        positions = np.clip(np.searchsorted(self.profile.edges, typical,
+                                            side='right') - 1, 0, 39)
+        return np.bincount(positions, weights=df['volume'].to_numpy(),
+                           minlength=40)
+
+    def test_full_range_histogram(self):
+        histogram = self.profile.histogram()
+        np.testing.assert_allclose(histogram, self._direct(self.df))
+        self.assertAlmostEqual(histogram.sum(), self.df['volume'].sum(),
+                               delta=1e-6 * self.df['volume'].sum())
+
+    def test_sub_range_matches_direct(self):
+        """前綴相減的任意日期範圍分佈與直接計算一致"""
+        start, end = self.df.index[50], self.df.index[120]
+        np.testing.assert_allclose(
+            self.profile.histogram(start, end),
+            self._direct(self.df.loc[start:end]), atol=1e-6)
+        np.testing.assert_allclose(
+            self.profile.histogram(start=self.df.index[-60]),
+            self._direct(self.df.iloc[-60:]), atol=1e-6)
+
+    def test_value_area(self):
+        histogram = np.array([1, 2, 10, 4, 3, 0, 5], dtype=float)
+        poc, low, high = value_area(histogram, 0.7)
+        self.assertEqual(poc, 2)
+        # 10 -> +4 -> +3 (上方較大) -> +2 (上方為 0)，涵蓋 19 >= 17.5
+        self.assertEqual((low, high), (1, 4))
+        self.assertGreaterEqual(histogram[low:high + 1].sum(),
+                                0.7 * histogram.sum())
+
+    def test_summary(self):
+        summary = self.profile.summary(fraction=0.7)
+        self.assertLessEqual(summary['value_area_low'], summary['poc'])
+        self.assertGreaterEqual(summary['value_area_high'], summary['poc'])
+        self.assertGreaterEqual(summary['value_area_low'],
+                                self.df['low'].min() - 1e-9)
+        self.assertIsNone(self.profile.summary(
+            start=pd.Timestamp('2100-01-01')))
+
+
+if __name__ == '__main__':
+    unittest.main()